@@ -1,6 +1,7 @@
 from lexer import *
 from error import Error
 from ast_module import *
+from function import BUILTIN_FUNCTIONS
 
 
 class Analyzer():
@@ -40,6 +41,7 @@ class Analyzer():
         """
         token = self.current_token
         value = token.value
+        line_number = self.lexer.line_number
         if token.type == 'KEYWORD':
             if value == 'PROCEDURE':
                 node = self.procedure()
@@ -75,6 +77,12 @@ class Analyzer():
                 node = self.write_file()
             elif value == 'CLOSEFILE':
                 node = self.close_file()
+            elif value == 'SEEK':
+                node = self.seek()
+            elif value == 'GETRECORD':
+                node = self.get_record()
+            elif value == 'PUTRECORD':
+                node = self.put_record()
             elif value == 'TYPE':
                 node = self.declare_type()
         elif token.type == 'EOF':
@@ -84,7 +92,7 @@ class Analyzer():
         else:
             Error().syntax_error(self.current_token.value, self.lexer.line_number)
 
-        return Statement(node)
+        return Statement(node, line_number)
 
     def check_token_type(self, token_type):
         """Checks whether the current token is semantically correct
@@ -208,7 +216,6 @@ class Analyzer():
                     elements.append(self.expression())
 
                 self.check_token_value(']')
-                print(elements)
                 node = AssignArray(elements)
         elif token.type == 'VARIABLE':
             node = self.variable_value()
@@ -351,10 +358,47 @@ class Analyzer():
         left = self.variable_name()
         self.check_token_type('ASSIGNMENT')
         right = self.expression()
+
+        parts = self.appended_parts(left, right)
+        if parts is not None:
+            return StringAppend(left, parts, right)
+
         assignment = Assignment(left, right)
 
         return assignment
 
+    def appended_parts(self, left, right):
+        """Checks whether an assignment only appends to the end of the variable it assigns to,
+        as in variable <- CONCAT(variable, ...) or variable <- variable + ...
+
+        Arguments:
+            left {VariableName/ElementName/TypeName} -- The instance being assigned to
+            right {AST} -- The expression being assigned
+
+        Returns:
+            list{AST} -- The expressions appended to the variable, None if the assignment is not an append
+        """
+        if type(left) is not VariableName:
+            return None
+
+        if isinstance(right, BuiltInFunction) and right.name.value == 'CONCAT':
+            first = right.parameters[0]
+            if type(first) is VariableValue and first.value == left.value:
+                return right.parameters[1:]
+
+            return None
+
+        # variable + a + b is parsed as ((variable + a) + b)
+        parts = []
+        while isinstance(right, BinaryOperation) and right.operator.value == '+':
+            parts.insert(0, right.right)
+            right = right.left
+
+        if parts and type(right) is VariableValue and right.value == left.value:
+            return parts
+
+        return None
+
     def variable_name(self):
         """Verifies the syntax of the name of various types of instances
 
@@ -416,7 +460,7 @@ class Analyzer():
         if self.current_token.value == '.':
             self.check_token_type('PERIOD')
 
-            object_ = TypeValue(VariableName(object_), self.variable_name())
+            object_ = TypeValue(object_, self.variable_name())
 
         return object_
 
@@ -757,9 +801,16 @@ class Analyzer():
             else:
                 break
 
+        line_number = self.lexer.line_number
         self.check_token_value(')')
 
-        return BuiltInFunction(name, parameters)
+        # Resolves the function now so that calls do not look it up by name
+        function = BUILTIN_FUNCTIONS[name.value]
+        error = function.check_count(len(parameters))
+        if error is not None:
+            Error().parameter_error('{}: {}'.format(name.value, error), line_number)
+
+        return BuiltInFunction(name, parameters, function)
 
     # END: Built-in Function
 
@@ -907,31 +958,49 @@ class Analyzer():
         """Verifies the syntax of reading from a file
 
         Returns:
-            ReadFile -- The name and instance for storing line of a file
+            ReadFile -- The name and instance for storing line of a file (and the range of an array to fill)
         """
 
         self.check_token_type('KEYWORD')
-        file_name = VariableValue(self.current_token)
+        file_name = Value(self.current_token)
         self.check_token_type('STRING')
         self.check_token_type('COMMA')
         variable = VariableName(self.current_token)
         self.check_token_type('VARIABLE')
+        first, last = self.array_range()
 
-        return ReadFile(file_name, variable)
+        return ReadFile(file_name, variable, first, last)
 
     def write_file(self):
         """Verifies the syntax of writing to a file
 
         Returns:
-            WriteFile -- The name and value to write to a file
+            WriteFile -- The name and value to write to a file (and the range of an array to write)
         """
         self.check_token_type('KEYWORD')
-        file_name = VariableValue(self.current_token)
+        file_name = Value(self.current_token)
         self.check_token_type('STRING')
         self.check_token_type('COMMA')
         line = self.expression()
+        first, last = self.array_range()
+
+        return WriteFile(file_name, line, first, last)
 
-        return WriteFile(file_name, line)
+    def array_range(self):
+        """Verifies the optional first and last index of an array read from or written to a file
+
+        Returns:
+            tuple -- The expressions of the first and last index, or None for both
+        """
+        if self.current_token.type != 'COMMA':
+            return None, None
+
+        self.check_token_type('COMMA')
+        first = self.expression()
+        self.check_token_type('COMMA')
+        last = self.expression()
+
+        return first, last
 
     def close_file(self):
         """Verifies the syntax of closing file
@@ -940,11 +1009,53 @@ class Analyzer():
             CloseFile -- The name of the file to close
         """
         self.check_token_type('KEYWORD')
-        file_name = VariableValue(self.current_token)
+        file_name = Value(self.current_token)
         self.check_token_type('STRING')
 
         return CloseFile(file_name)
 
+    def seek(self):
+        """Verifies the syntax of moving to a record of a RANDOM file
+
+        Returns:
+            Seek -- The name of the file and the address of the record
+        """
+        self.check_token_type('KEYWORD')
+        file_name = Value(self.current_token)
+        self.check_token_type('STRING')
+        self.check_token_type('COMMA')
+        address = self.expression()
+
+        return Seek(file_name, address)
+
+    def get_record(self):
+        """Verifies the syntax of reading a record from a RANDOM file
+
+        Returns:
+            GetRecord -- The name of the file and the TYPE instance to store the record in
+        """
+        self.check_token_type('KEYWORD')
+        file_name = Value(self.current_token)
+        self.check_token_type('STRING')
+        self.check_token_type('COMMA')
+        variable = self.variable_value()
+
+        return GetRecord(file_name, variable)
+
+    def put_record(self):
+        """Verifies the syntax of writing a record to a RANDOM file
+
+        Returns:
+            PutRecord -- The name of the file and the TYPE instance to write
+        """
+        self.check_token_type('KEYWORD')
+        file_name = Value(self.current_token)
+        self.check_token_type('STRING')
+        self.check_token_type('COMMA')
+        variable = self.variable_value()
+
+        return PutRecord(file_name, variable)
+
     # END: File
 
     # START: Type
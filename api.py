@@ -0,0 +1,590 @@
+from analyzer import Analyzer
+from ast_module import (Assignment, Block, ConstantDeclaration, Declaration, Declarations, ElementName,
+                        ElementValue, File, Function, FunctionCall, GetRecord, Input, Iteration, ReadFile,
+                        StringAppend, TypeDeclaration, VariableName, VariableValue)
+from checkpoint import number_nodes
+from data_types import Array, ArrayType, Record, RecordArray, RecordView, TypeType
+from error import Error
+from file_handler import BUFFER_SIZE, inside_directory
+from function import load_plugins
+from interpreter import Interpreter
+from limits import Limits
+from main import EXIT_OK, error_code, join_lines
+import copy
+import io
+import os
+import shutil
+import tempfile
+import time
+
+# Whether load_plugins() has been called by this module
+PLUGINS_LOADED = [False]
+
+# The statements run by Program.load() unless main=True is given
+DECLARATIONS = (Declaration, Declarations, ConstantDeclaration, TypeDeclaration, Function)
+
+# The statements that write to the instances named in their variable
+WRITES = (Assignment, StringAppend, Input, ReadFile, GetRecord, Iteration, Declaration)
+
+# The Python type of the values of every data type
+PYTHON_TYPES = {'INTEGER': int, 'REAL': float, 'STRING': str, 'CHAR': str, 'BOOLEAN': bool}
+
+
+class RunError():
+    """An error that stopped a program"""
+
+    def __init__(self, error, phase, line_number=None):
+        """Initializes the error of a run
+
+        Arguments:
+            error {Exception} -- The exception raised
+            phase {str} -- The phase it was raised in: parse or execute
+
+        Keyword Arguments:
+            line_number {int} -- The line of the statement that raised it, or None if it is not known (default: {None})
+        """
+        self.type = type(error).__name__
+        self.message = str(error)
+        self.phase = phase
+        self.line_number = line_number
+        self.exception = error
+
+    def __str__(self):
+        if self.line_number is None:
+            return '{}: {}'.format(self.type, self.message)
+
+        return '{}: {} (line {})'.format(self.type, self.message, self.line_number)
+
+    def __repr__(self):
+        return '<RunError {}>'.format(self)
+
+
+class Result():
+    """What a run of a Program did"""
+
+    def __init__(self, output, error, files, seconds):
+        """Initializes the result of a run
+
+        Arguments:
+            output {str} -- Everything written by OUTPUT and the prompts of INPUT
+            error {RunError} -- The error that stopped the program, or None if it ran to the end
+            files {dict} -- The contents of every file in the directory of the run once it ended, by name. Text
+                files are str and files that are not UTF-8 (such as RANDOM files) are bytes
+            seconds {float} -- The seconds the program ran for, without writing the given files and setting up the run
+        """
+        self.output = output
+        self.error = error
+        self.files = files
+        self.seconds = seconds
+        self.exit_code = error_code(error.phase, error.exception) if error is not None else EXIT_OK
+
+    @property
+    def ok(self):
+        """Whether the program ran to the end without an error"""
+        return self.error is None
+
+    def __repr__(self):
+        return '<Result {} in {:.6f}s>'.format('ok' if self.ok else self.error, self.seconds)
+
+
+class Program():
+    """A parsed program, which can be run any number of times, from any number of threads at once, without being
+    parsed again. Every run has an Interpreter, output and files of its own, and only reads the tree"""
+
+    def __init__(self, tree, source):
+        """Initializes a Program. Use compile() to make one
+
+        Arguments:
+            tree {Block} -- The tree made by Analyzer.block(), or None for an empty program
+            source {str} -- The source of the program
+        """
+        self.tree = tree
+        self.source = source
+
+        # Runs of programs without OPENFILE only get a directory if they are given files
+        self.opens_files = tree is not None and any(isinstance(node, File) for node in number_nodes(tree))
+
+    def run(self, stdin='', files=None, limits=None, directory=None, buffer_size=BUFFER_SIZE, memory_map=False,
+            write_behind=False):
+        """Runs the program. Errors of the program are returned in the Result, not raised
+
+        Keyword Arguments:
+            stdin {str/list{str}} -- What INPUT reads, as text or as a list of lines (default: {''})
+            files {dict} -- Files to create before the program runs, as str or bytes by name (default: {None})
+            limits {Limits/dict} -- The limits of the run, as Limits or as a dict of the arguments of Limits. A
+                Limits is copied, so one can be shared by runs in several threads. A memory limit is refused, since
+                the limit is set for the whole process and runs in other threads would share it: programs that need
+                one are run in a process of their own, with main.py --max-memory or a worker of batch.py
+                (default: {None})
+            directory {str} -- The directory files are opened in. By default every run that opens or is given files
+                has a temporary directory of its own, which is removed once the run has ended (default: {None})
+            buffer_size {int} -- The buffer size (in bytes) of every file opened (default: {BUFFER_SIZE})
+            memory_map {bool} -- Whether files opened for READ are read through mmap (default: {False})
+            write_behind {bool} -- Whether files opened for WRITE or APPEND are written by a thread (default: {False})
+
+        Returns:
+            Result -- The output, error, files and time of the run
+        """
+        if not isinstance(stdin, str):
+            stdin = ''.join(line + '\n' for line in stdin)
+
+        if isinstance(limits, dict):
+            limits = Limits(**limits)
+        elif limits is not None:
+            # Limits count the steps of the run they are installed in
+            limits = copy.copy(limits)
+
+        if limits is not None and limits.memory is not None:
+            Error().value_error('A memory limit is set for the whole process, so runs cannot have one of their own')
+
+        for name in (files or {}):
+            if inside_directory(directory or '.', name) is None:
+                Error().value_error('{} is not a name of a file in the directory of the run'.format(name))
+
+        temporary = directory is None and (self.opens_files or bool(files))
+        if temporary:
+            directory = tempfile.mkdtemp(prefix='pseudocode-run-')
+
+        stdout = io.StringIO()
+        error = None
+        seconds = 0.0
+        try:
+            for name, contents in (files or {}).items():
+                with open(inside_directory(directory, name), 'wb' if isinstance(contents, bytes) else 'w') as file:
+                    file.write(contents)
+
+            interpreter = Interpreter(
+                buffer_size=buffer_size,
+                memory_map=memory_map,
+                write_behind=write_behind,
+                stdin=io.StringIO(stdin),
+                stdout=stdout,
+                limits=limits,
+                directory=directory
+            )
+
+            # Only the program is timed, not writing the given files or building the Interpreter
+            start = time.perf_counter()
+            try:
+                if self.tree is not None:
+                    interpreter.execute(self.tree)
+            finally:
+                seconds = time.perf_counter() - start
+        except Exception as exception:
+            error = RunError(exception, 'execute', error_line(exception))
+
+        try:
+            return Result(stdout.getvalue(), error, read_files(directory) if directory is not None else {}, seconds)
+        finally:
+            if temporary:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def load(self, main=False, stdin='', steps=None, directory=None):
+        """Runs the declarations of the program, so that its procedures and functions can be called from Python
+
+        Keyword Arguments:
+            main {bool} -- Whether every statement of the program is run, rather than only its DECLARE, CONSTANT,
+                TYPE, PROCEDURE and FUNCTION statements (default: {False})
+            stdin {str} -- What INPUT reads, as text (default: {''})
+            steps {int} -- The most steps every call may take, or None for no limit (default: {None})
+            directory {str} -- The directory files are opened in, or None for the working directory (default: {None})
+
+        Returns:
+            Module -- The procedures and functions of the program
+        """
+        return Module(self, main, stdin, steps, directory)
+
+
+class Module():
+    """A program whose declarations have run, with every procedure and function it declares as a Routine
+
+    Routines are found as attributes or by name, so module.IsPrime(7) and module['IsPrime'](7) are the same call.
+    Calls share one Interpreter, so a Module is used by one thread at a time. Make a Module per thread to call from
+    several
+    """
+
+    def __init__(self, program, main=False, stdin='', steps=None, directory=None):
+        """Runs the declarations of a program. Use Program.load() to make one
+
+        Arguments:
+            program {Program} -- The program
+
+        Keyword Arguments:
+            main {bool} -- Whether every statement of the program is run (default: {False})
+            stdin {str} -- What INPUT reads, as text (default: {''})
+            steps {int} -- The most steps every call may take, or None for no limit (default: {None})
+            directory {str} -- The directory files are opened in, or None for the working directory (default: {None})
+        """
+        self.stdout = io.StringIO()
+        self.limits = Limits(steps) if steps is not None else None
+        self.interpreter = Interpreter(stdin=io.StringIO(stdin), stdout=self.stdout, limits=self.limits,
+                                       directory=directory)
+
+        # Calls copy the instances the procedure or function writes to, and share the rest
+        self.interpreter.call_scope = self.call_scope
+        self.shared = {}
+
+        statements = program.tree.block if program.tree is not None else []
+        if not main:
+            statements = [statement for statement in statements if isinstance(statement.statement, DECLARATIONS)]
+
+        self.interpreter.execute(Block(statements))
+
+        self.routines = {}
+        for statement in statements:
+            if isinstance(statement.statement, Function):
+                routine = Routine(self, statement.statement)
+                self.routines[routine.name] = routine
+
+    @property
+    def output(self):
+        """Everything written by OUTPUT so far, by the declarations and by every call"""
+        return self.stdout.getvalue()
+
+    def __getitem__(self, name):
+        routine = self.routines.get(name)
+        if routine is None:
+            raise KeyError('{} is not a PROCEDURE or FUNCTION of the program'.format(name))
+
+        return routine
+
+    def __getattr__(self, name):
+        routine = self.__dict__.get('routines', {}).get(name)
+        if routine is None:
+            raise AttributeError('{} is not a PROCEDURE or FUNCTION of the program'.format(name))
+
+        return routine
+
+    def call_scope(self, name):
+        """Copies the scope of a procedure or function for one call to it, like Interpreter.call_scope(), but only
+        copies the instances the procedure or function can write to. The scope of a procedure or function holds a
+        copy of every instance declared before it, which Interpreter.call_scope() copies again on every call
+
+        Arguments:
+            name {str} -- The name of the procedure or function
+
+        Returns:
+            Scope -- The copy, or None if nothing called name has been declared
+        """
+        scope = self.interpreter.SCOPES.get(name)
+        if scope is None:
+            return None
+
+        cached = self.shared.get(name)
+        if cached is None or cached[0] is not scope:
+            written = written_names(scope.block) | set(parameter for _, parameter, _ in scope.parameters)
+            shared = set(name for name, value in scope.VALUES.items()
+                         if name not in written and not isinstance(value, Array))
+            cached = self.shared[name] = [scope, shared]
+
+        return scope.call_copy(cached[1])
+
+
+class Routine():
+    """A procedure or function of a Module, called with Python values
+
+    Arguments are converted to the types of the parameters: int, float, str and bool for the built-in types (an int is
+    taken for a REAL), a list (of lists, for every further dimension) for an ARRAY and a dict of fields for a TYPE.
+    What a call returns is converted back the same way. A FUNCTION returns its value, and a procedure returns None.
+    When there are BYREF parameters, the values they hold once the call ends are returned as a tuple, after the value
+    of a FUNCTION
+    """
+
+    def __init__(self, module, node):
+        """Initializes a Routine
+
+        Arguments:
+            module {Module} -- The Module whose Interpreter declared the procedure or function
+            node {Function} -- The declaration of the procedure or function
+        """
+        self.module = module
+        self.name = module.interpreter.visit(node.name)
+        self.is_function = node.return_type is not None
+
+        # The data type of every parameter, as the node that names it
+        self.data_types = [parameter.data_type for parameter in node.parameters]
+
+    def __repr__(self):
+        return '<Routine {} {}>'.format('FUNCTION' if self.is_function else 'PROCEDURE', self.name)
+
+    def __call__(self, *arguments):
+        interpreter = self.module.interpreter
+        limits = self.module.limits
+        global_scope = interpreter.SCOPES['GLOBAL']
+
+        scope = interpreter.call_scope(self.name)
+        if scope is None:
+            Error().name_error('{} does not exist'.format(self.name))
+
+        if len(arguments) != len(scope.parameters):
+            Error().type_error('{} takes {} argument(s), not {}'.format(self.name, len(scope.parameters),
+                                                                          len(arguments)))
+
+        references = []
+        for (reference_type, name, _), data_type, argument in zip(scope.parameters, self.data_types, arguments):
+            metadata = scope.SYMBOL_TABLE.lookup(name)
+            value = to_pseudocode(argument, data_type, metadata, name)
+
+            if isinstance(metadata, (ArrayType, TypeType)):
+                scope.VALUES[name] = value
+            elif reference_type == 'BYREF':
+                scope.VALUES[name] = metadata.declare()
+                scope.VALUES[name].assign([value])
+            else:
+                scope.assign(name, value)
+
+            if reference_type == 'BYREF':
+                references.append(scope.VALUES[name])
+
+        scope.PARENT_SCOPE = global_scope
+        interpreter.CURRENT_SCOPE = scope
+        interpreter.PARENT_SCOPE = global_scope
+
+        if limits is not None:
+            limits.start()
+
+        value = None
+        try:
+            value = interpreter.visit(scope.block)
+            if scope.return_type is not None:
+                interpreter.check_type(scope.return_type, value, self.name)
+
+            results = [from_pseudocode(reference.value) for reference in references]
+        finally:
+            if limits is not None:
+                limits.stop()
+
+            interpreter.CURRENT_SCOPE = global_scope
+            interpreter.PARENT_SCOPE = global_scope.PARENT_SCOPE
+            scope.clear(keep=value)
+
+        if self.is_function:
+            value = from_pseudocode(value)
+            return tuple([value] + results) if references else value
+
+        return tuple(results) if references else None
+
+
+def written_names(block):
+    """Finds the names of the instances a block can write to: the targets of assignments, INPUT, READFILE,
+    GETRECORD, FOR and DECLARE, and everything passed to a procedure or function, which may take it BYREF. Names used
+    in indexes are found too, which only means a few more instances are copied
+
+    Arguments:
+        block {Block} -- The block of a procedure or function
+
+    Returns:
+        set{str} -- The names
+    """
+    names = set()
+    for node in number_nodes(block):
+        if isinstance(node, WRITES):
+            targets = node.variable
+        elif isinstance(node, FunctionCall):
+            targets = node.parameters
+        else:
+            continue
+
+        for target in number_nodes(targets):
+            if isinstance(target, (VariableName, VariableValue, ElementName, ElementValue)):
+                names.add(target.value)
+
+    return names
+
+
+def to_pseudocode(value, data_type, metadata, name):
+    """Converts a Python value to the value of a parameter
+
+    Arguments:
+        value {object} -- The Python value
+        data_type {DataType/Array} -- The node naming the data type of the parameter
+        metadata {DataType} -- The metadata of the parameter
+        name {str} -- The name of the parameter, for errors
+
+    Returns:
+        object -- The value, or a new Array or record for an ARRAY or TYPE
+    """
+    if isinstance(metadata, ArrayType):
+        array = metadata.declare()
+        fill_array(array, value, metadata.dimensions, [], data_type.data_type.value, name)
+        return array
+    elif isinstance(metadata, TypeType):
+        return make_record_value(metadata.record, value, name)
+
+    return to_scalar(value, data_type.value, name)
+
+
+def to_scalar(value, data_type, name):
+    """Checks that a Python value is of a built-in data type, taking an int for a REAL
+
+    Arguments:
+        value {object} -- The Python value
+        data_type {str} -- INTEGER, REAL, STRING, CHAR or BOOLEAN
+        name {str} -- The name of the parameter or field, for errors
+
+    Returns:
+        int, float, str, bool -- The value
+    """
+    if data_type == 'REAL' and type(value) is int:
+        value = float(value)
+
+    if type(value) is not PYTHON_TYPES[data_type] or (data_type == 'CHAR' and len(value) != 1):
+        Error().type_error('{} must be {}, not {}'.format(name, data_type, repr(value)))
+
+    return value
+
+
+def make_record_value(record, value, name):
+    """Makes a record from a dict of its fields
+
+    Arguments:
+        record {type(Record)} -- The class made from the TYPE declaration
+        value {dict} -- The value of every field, by name
+        name {str} -- The name of the parameter, for errors
+
+    Returns:
+        Record -- The record
+    """
+    if not isinstance(value, dict):
+        Error().type_error('{} must be a dict of the fields of {}'.format(name, record.__name__))
+
+    instance = record()
+    for field, item in value.items():
+        metadata = record.FIELDS.get(field)
+        if metadata is None:
+            Error().name_error('{}.{}'.format(record.__name__, field))
+
+        instance.assign((to_scalar(item, metadata.data_type, '{}.{}'.format(name, field)), field))
+
+    return instance
+
+
+def fill_array(array, value, dimensions, indexes, data_type, name):
+    """Assigns the elements of an array from nested lists, one list for every dimension
+
+    Arguments:
+        array {Array} -- The array
+        value {list} -- The elements of the dimension
+        dimensions {list{list{int}}} -- The bounds of every dimension
+        indexes {list{int}} -- The indexes of the dimensions outside this one
+        data_type {str} -- The data type of the elements
+        name {str} -- The name of the parameter, for errors
+    """
+    lower_bound, upper_bound = dimensions[len(indexes)]
+    if not isinstance(value, (list, tuple)) or len(value) != upper_bound - lower_bound + 1:
+        Error().index_error('{} must be a list of {} elements'.format(name, upper_bound - lower_bound + 1))
+
+    for index, item in enumerate(value, lower_bound):
+        position = indexes + [index]
+        if len(position) < len(dimensions):
+            fill_array(array, item, dimensions, position, data_type, name)
+        elif isinstance(array, RecordArray):
+            record = make_record_value(array.record, item, name)
+            for field in array.record.FIELDS:
+                array.assign((record.get(field), position, field))
+        else:
+            array.assign((to_scalar(item, data_type, name), position))
+
+
+def from_pseudocode(value):
+    """Converts a value of the Interpreter to a Python value
+
+    Arguments:
+        value {object} -- The value
+
+    Returns:
+        object -- The value, with arrays as lists (of lists) and records as dicts of their fields
+    """
+    if isinstance(value, Array):
+        return array_to_list(value, [])
+    elif isinstance(value, (Record, RecordView)):
+        return {field: from_pseudocode(value.get(field)) for field in value.FIELDS}
+
+    return value
+
+
+def array_to_list(array, indexes):
+    """Converts a dimension of an array to a list
+
+    Arguments:
+        array {Array} -- The array
+        indexes {list{int}} -- The indexes of the dimensions outside this one
+
+    Returns:
+        list -- The elements of the dimension
+    """
+    lower_bound, upper_bound = array.dimensions[len(indexes)]
+    if len(indexes) + 1 == len(array.dimensions):
+        return [from_pseudocode(array.get(indexes + [index])) for index in range(lower_bound, upper_bound + 1)]
+
+    return [array_to_list(array, indexes + [index]) for index in range(lower_bound, upper_bound + 1)]
+
+
+def compile(source):
+    """Parses a program once, so that it can be run many times
+
+    Arguments:
+        source {str} -- The pseudocode, with its lines separated by line breaks
+
+    Raises:
+        SyntaxError -- When the program does not parse, with the line in the message
+
+    Returns:
+        Program -- The program
+    """
+    if not PLUGINS_LOADED[0]:
+        load_plugins()
+        PLUGINS_LOADED[0] = True
+
+    code = join_lines(source)
+    tree = Analyzer(code).block(['EOF']) if code else None
+
+    return Program(tree, source)
+
+
+def error_line(error):
+    """Finds the line of the statement that raised an error, from the visit_Statement() calls in its traceback
+
+    Arguments:
+        error {Exception} -- The error, as it was raised by an Interpreter
+
+    Returns:
+        int -- The line of the innermost statement, or None if the error was not raised by a statement
+    """
+    line_number = None
+    traceback = error.__traceback__
+    while traceback is not None:
+        frame = traceback.tb_frame
+        if frame.f_code.co_name == 'visit_Statement':
+            node = frame.f_locals.get('node')
+            line_number = getattr(node, 'line_number', line_number)
+
+        traceback = traceback.tb_next
+
+    return line_number
+
+
+def read_files(directory):
+    """Reads every file in a directory
+
+    Arguments:
+        directory {str} -- The directory of a run
+
+    Returns:
+        dict -- The contents of every file by name, as str if it is UTF-8 and bytes if not
+    """
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            continue
+
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        try:
+            files[name] = data.decode('utf-8')
+        except UnicodeDecodeError:
+            files[name] = data
+
+    return files
@@ -8,8 +8,9 @@ class Block(AST):
 
 
 class Statement(AST):
-    def __init__(self, statement):
+    def __init__(self, statement, line_number=None):
         self.statement = statement
+        self.line_number = line_number
 
 
 class Operator(AST):
@@ -102,6 +103,13 @@ class Assignment(AST):
         self.expression = expression
 
 
+class StringAppend(AST):
+    def __init__(self, variable, parts, expression):
+        self.variable = variable
+        self.parts = parts
+        self.expression = expression
+
+
 class VariableValue(AST):
     def __init__(self, token):
         self.token = token
@@ -251,10 +259,10 @@ class Loop(AST):
 
 
 class BuiltInFunction(AST):
-    def __init__(self, name, parameters):
+    def __init__(self, name, parameters, function):
         self.name = name
         self.parameters = parameters
-        self.parsed_parameters = None
+        self.function = function
 
 # END: Built-in Function
 
@@ -298,21 +306,43 @@ class FileMode(AST):
 
 
 class ReadFile(AST):
-    def __init__(self, file_name, variable):
+    def __init__(self, file_name, variable, first=None, last=None):
         self.file_name = file_name
         self.variable = variable
+        self.first = first
+        self.last = last
 
 
 class WriteFile(AST):
-    def __init__(self, file_name, line):
+    def __init__(self, file_name, line, first=None, last=None):
         self.file_name = file_name
         self.line = line
+        self.first = first
+        self.last = last
 
 
 class CloseFile(AST):
     def __init__(self, file_name):
         self.file_name = file_name
 
+
+class Seek(AST):
+    def __init__(self, file_name, address):
+        self.file_name = file_name
+        self.address = address
+
+
+class GetRecord(AST):
+    def __init__(self, file_name, variable):
+        self.file_name = file_name
+        self.variable = variable
+
+
+class PutRecord(AST):
+    def __init__(self, file_name, variable):
+        self.file_name = file_name
+        self.variable = variable
+
 # START: Type
 
 
@@ -0,0 +1,387 @@
+from analyzer import Analyzer
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from error import LimitError
+from function import load_plugins
+from interpreter import Interpreter
+from main import add_limit_arguments, make_limits, read_source
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# The seconds a run may take unless --timeout is given
+TIMEOUT = 10
+
+# The number of parsed programs every worker keeps, so that runs of the same program are only parsed once
+CACHE_SIZE = 256
+
+# The parsed programs of this worker, by path
+TREES = {}
+
+
+# Whether the run in this worker has gone over its timeout
+TIMED_OUT = [False]
+
+# The queue this worker puts the number of every job it starts on, so that the job running in a worker that dies is
+# known
+STARTED = [None]
+
+
+class JobTimeout(BaseException):
+    """Raised inside a worker when a run goes over its timeout. Not an Exception, so that it is not caught as an error
+    of the program"""
+    pass
+
+
+def read_manifest(path):
+    """Reads a manifest of runs, one JSON object per line
+
+    Every line has a "program" and optionally an "id", an "input" file (read by INPUT) and an "expected" output
+    file. Relative paths are relative to the manifest
+
+    Arguments:
+        path {str} -- The path of the manifest
+
+    Returns:
+        list{dict} -- The runs, in order
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    jobs = []
+
+    with open(path, 'r') as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+
+            try:
+                job = json.loads(line)
+                program = job['program']
+            except (ValueError, KeyError, TypeError):
+                raise ValueError('{}: line {} needs a JSON object with a "program"'.format(path, number))
+
+            jobs.append({
+                'id': job.get('id', len(jobs)),
+                'program': os.path.join(directory, program),
+                'input': os.path.join(directory, job['input']) if job.get('input') else None,
+                'expected': os.path.join(directory, job['expected']) if job.get('expected') else None
+            })
+
+    return jobs
+
+
+def start_worker(memory_limit, started):
+    """Sets up a worker process of the pool
+
+    Arguments:
+        memory_limit {int} -- The most memory (in MB) the worker may use, or None for no limit
+        started {SimpleQueue} -- Where the number of every job is put when the worker starts it
+    """
+    STARTED[0] = started
+
+    # Interrupting the batch only stops the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if memory_limit is not None and resource is not None:
+        limit = memory_limit * (1 << 20)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    load_plugins()
+
+
+def parse(path):
+    """Parses a program, reusing the tree if this worker has already parsed it
+
+    Arguments:
+        path {str} -- The path of the .psc file
+
+    Returns:
+        Block -- The tree of the program, or None if the file is empty
+    """
+    key = (path, os.stat(path).st_mtime_ns)
+    if key not in TREES:
+        if len(TREES) >= CACHE_SIZE:
+            del TREES[next(iter(TREES))]
+
+        code = read_source(path)
+        TREES[key] = Analyzer(code).block(['EOF']) if code else None
+
+    return TREES[key]
+
+
+def stop_job(signum, frame):
+    """Stops the run in this worker. The timer goes off again until the run stops, in case the exception is caught"""
+    TIMED_OUT[0] = True
+    signal.setitimer(signal.ITIMER_REAL, 0.1)
+    raise JobTimeout()
+
+
+def run_job(job, timeout, limits=None):
+    """Runs one program against its input and compares what it outputs with the expected output. Runs in a worker
+
+    Arguments:
+        job {dict} -- The run, from read_manifest()
+        timeout {float} -- The seconds the run may take
+
+    Keyword Arguments:
+        limits {Limits} -- The limits the program is run with (default: {None})
+
+    Returns:
+        dict -- The result of the run
+    """
+    result = {'id': job['id'], 'program': job['program'], 'input': job['input']}
+    stdout = io.StringIO()
+    start = time.perf_counter()
+
+    # Only stops the run on platforms with SIGALRM
+    alarm = hasattr(signal, 'setitimer')
+    if alarm:
+        TIMED_OUT[0] = False
+        signal.signal(signal.SIGALRM, stop_job)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    # Every run opens its files in a directory of its own, so runs in other workers never see them
+    directory = tempfile.mkdtemp(prefix='pseudocode-batch-')
+    try:
+        tree = parse(job['program'])
+        stdin = open(job['input'], 'r') if job['input'] else io.StringIO()
+        try:
+            interpreter = Interpreter(stdin=stdin, stdout=stdout, limits=limits, directory=directory)
+            if tree is not None:
+                interpreter.execute(tree)
+        finally:
+            stdin.close()
+
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+        if TIMED_OUT[0]:
+            raise JobTimeout()
+
+        if job['expected'] is None:
+            result['status'] = 'ran'
+        else:
+            with open(job['expected'], 'r') as file:
+                expected = file.read()
+
+            result['status'] = 'pass' if same_output(stdout.getvalue(), expected) else 'fail'
+    except (JobTimeout, Exception) as error:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+        if TIMED_OUT[0]:
+            # The timeout may have surfaced as an error of the program
+            result['status'] = 'timeout'
+            result['error'] = 'Took longer than {}s'.format(timeout)
+        else:
+            result['status'] = 'limit' if isinstance(error, LimitError) else 'error'
+            result['error'] = '{}: {}'.format(type(error).__name__, error)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    if result['status'] != 'pass':
+        result['output'] = stdout.getvalue()
+
+    return result
+
+
+def same_output(output, expected):
+    """Compares outputs line by line, ignoring whitespace at the end of lines and of the output
+
+    Arguments:
+        output {str} -- What the program output
+        expected {str} -- The expected output
+
+    Returns:
+        bool -- Whether the outputs are the same
+    """
+    return [line.rstrip() for line in output.rstrip().split('\n')] == \
+        [line.rstrip() for line in expected.rstrip().split('\n')]
+
+
+def run_started(number, job, timeout, limits=None):
+    """Runs a job in a worker of the pool, first saying which job the worker is running
+
+    Arguments:
+        number {int} -- The number of the job in the batch
+        job {dict} -- The run, from read_manifest()
+        timeout {float} -- The seconds the run may take
+
+    Keyword Arguments:
+        limits {Limits} -- The limits the program is run with (default: {None})
+
+    Returns:
+        dict -- The result of the run
+    """
+    STARTED[0].put(number)
+    return run_job(job, timeout, limits)
+
+
+def run_pool(jobs, workers, timeout, memory_limit, limits, write):
+    """Runs jobs over one pool of processes, until they have all finished or a worker dies and takes the pool down
+
+    Arguments:
+        jobs {dict} -- The runs, by their number in the batch
+        workers {int} -- The number of worker processes
+        timeout {float} -- The seconds every run may take
+        memory_limit {int} -- The most memory (in MB) a worker may use, or None for no limit
+        limits {Limits} -- The limits every program is run with
+        write {function} -- Called with the result of every job that finished
+
+    Returns:
+        list{int}, list{int} -- The numbers of the jobs lost with the pool that had been started, and of those that
+            had not
+    """
+    started = multiprocessing.SimpleQueue()
+    lost = []
+
+    with ProcessPoolExecutor(workers, initializer=start_worker, initargs=(memory_limit, started)) as executor:
+        futures = {executor.submit(run_started, number, job, timeout, limits): number for number, job in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                lost.append(futures[future])
+                continue
+
+            write(result)
+
+    running = set()
+    while not started.empty():
+        running.add(started.get())
+
+    lost.sort()
+    return [number for number in lost if number in running], [number for number in lost if number not in running]
+
+
+def run_batch(jobs, workers, timeout, memory_limit, results, limits=None):
+    """Runs every job over a pool of processes, writing every result as soon as it finishes
+
+    A worker that dies takes down the pool. The jobs that had not been started are run again in a new pool, and each
+    of those that were running when the pool went down is run again in a pool of its own, so that only the jobs that
+    kill their worker are blamed
+
+    Arguments:
+        jobs {list{dict}} -- The runs, from read_manifest()
+        workers {int} -- The number of worker processes
+        timeout {float} -- The seconds every run may take
+        memory_limit {int} -- The most memory (in MB) a worker may use, or None for no limit
+        results {file} -- Where the results are written as JSON Lines
+
+    Keyword Arguments:
+        limits {Limits} -- The limits every program is run with (default: {None})
+
+    Returns:
+        dict -- The number of results of every status
+    """
+    counts = {}
+
+    def write(result):
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        results.write(json.dumps(result) + '\n')
+        results.flush()
+
+    pending = list(range(len(jobs)))
+    while pending:
+        running, pending = run_pool({number: jobs[number] for number in pending}, workers, timeout, memory_limit,
+                                    limits, write)
+
+        if not running:
+            # The pool went down before any job started, so every job is run on its own
+            running, pending = pending, []
+
+        for number in running:
+            if any(run_pool({number: jobs[number]}, 1, timeout, memory_limit, limits, write)):
+                job = jobs[number]
+                write({'id': job['id'], 'program': job['program'], 'input': job['input'],
+                       'status': 'crashed', 'error': 'The worker running this job died'})
+
+    return counts
+
+
+def parse_arguments(argv):
+    """Parses the command-line arguments
+
+    Arguments:
+        argv {list{str}} -- The arguments, without the name of the program
+
+    Returns:
+        argparse.Namespace -- The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog='pseudocode-batch',
+        description='Runs pseudocode programs against input files over a pool of processes',
+        epilog='Every line of the manifest is a JSON object like '
+               '{"id": "s1", "program": "s1.psc", "input": "t1.in", "expected": "t1.out"}. '
+               'Results are written as JSON Lines in the order the runs finish. '
+               'Exits with 0 when every run passed (or ran, when nothing is expected) and 1 otherwise')
+    parser.add_argument('manifest', help='the manifest of runs')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='the number of worker processes (default: the number of cores, %(default)s)')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, metavar='SECONDS',
+                        help='the seconds every run may take (default: %(default)s)')
+    parser.add_argument('--memory-limit', type=int, default=None, metavar='MB',
+                        help='the most memory every worker may use (default: no limit)')
+    parser.add_argument('-o', '--output', default=None, metavar='FILE',
+                        help='write the results to FILE instead of stdout')
+
+    add_limit_arguments(parser)
+
+    arguments = parser.parse_args(argv)
+    if arguments.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if arguments.timeout <= 0:
+        parser.error('--timeout must be more than 0')
+
+    return arguments
+
+
+def main(argv=None):
+    """Runs the batch given on the command line
+
+    Keyword Arguments:
+        argv {list{str}} -- The arguments, or None to use sys.argv (default: {None})
+
+    Returns:
+        int -- The exit code
+    """
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+
+    try:
+        jobs = read_manifest(arguments.manifest)
+    except (OSError, ValueError) as error:
+        print('{}: {}'.format(type(error).__name__, error), file=sys.stderr)
+        return 4
+
+    results = open(arguments.output, 'w') if arguments.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        counts = run_batch(jobs, arguments.jobs, arguments.timeout, arguments.memory_limit, results,
+                           make_limits(arguments))
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if results is not sys.stdout:
+            results.close()
+
+    print('{} runs in {:.2f}s: {}'.format(len(jobs), time.perf_counter() - start, ', '.join(
+        '{} {}'.format(count, status) for status, count in sorted(counts.items()))), file=sys.stderr)
+
+    return 0 if set(counts) <= {'pass', 'ran'} else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,359 @@
+from analyzer import Analyzer
+from function import load_plugins
+from interpreter import Interpreter
+from main import count_tokens, join_lines
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# The directory of the benchmark programs, one .psc file per workload
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+
+# The results compared against unless --baseline is given
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# The runs of every benchmark that are not timed, and the runs that are
+WARMUPS = 1
+REPEATS = 10
+
+# How much slower than the baseline (0.1 is 10%) a phase may be before it counts as a regression
+THRESHOLD = 0.1
+
+# How many seconds slower than the baseline a phase must also be to count as a regression, since phases that take
+# well under a millisecond change by more than THRESHOLD from noise alone
+MIN_DIFFERENCE = 0.005
+
+# The phases timed, in the order they run
+PHASES = ('lex', 'parse', 'execute')
+
+# Lexing and parsing a benchmark take far less time than running it, so they are repeated until they have taken at
+# least this many seconds and the time of one pass is used
+MIN_SECONDS = 0.02
+
+
+def find_benchmarks(names=None):
+    """Finds the benchmark programs
+
+    Keyword Arguments:
+        names {list{str}} -- The names of the benchmarks to run (without .psc), or None for all of them
+            (default: {None})
+
+    Returns:
+        list{str} -- The paths of the programs, sorted by name
+    """
+    paths = sorted(os.path.join(BENCHMARK_DIR, name) for name in os.listdir(BENCHMARK_DIR) if name.endswith('.psc'))
+    if names is None:
+        return paths
+
+    known = {benchmark_name(path): path for path in paths}
+    for name in names:
+        if name not in known:
+            raise FileNotFoundError('There is no benchmark called {}. The benchmarks are {}'.format(
+                name, ', '.join(sorted(known))))
+
+    return [known[name] for name in names]
+
+
+def benchmark_name(path):
+    """Returns the name of a benchmark, which is its file name without .psc"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def time_passes(function, minimum=MIN_SECONDS):
+    """Calls a function until the calls have taken at least minimum seconds
+
+    Arguments:
+        function {function} -- Called without arguments
+
+    Keyword Arguments:
+        minimum {float} -- The least CPU seconds the calls take in all (default: {MIN_SECONDS})
+
+    Returns:
+        tuple{float, object} -- The CPU seconds of one call, and what the last call returned
+    """
+    passes = 0
+    start = time.process_time()
+    while True:
+        value = function()
+        passes += 1
+        elapsed = time.process_time() - start
+        if elapsed >= minimum:
+            return elapsed / passes, value
+
+
+def run_once(code, directory):
+    """Runs a program through every phase once
+
+    The Analyzer lexes as it goes, so the parse phase is the time of the Lexer and the Analyzer together, and the lex
+    phase is the time of the Lexer in a pass of its own
+
+    Arguments:
+        code {str} -- The code, with EOL between every line
+        directory {str} -- The directory the files of the program are opened in
+
+    Returns:
+        tuple{dict, str} -- The CPU seconds of every phase, and the output of the program
+    """
+    timings = {}
+
+    timings['lex'], _ = time_passes(lambda: count_tokens(code))
+    timings['parse'], tree = time_passes(lambda: Analyzer(code).block(['EOF']))
+
+    stdout = io.StringIO()
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        start = time.process_time()
+        Interpreter(stdout=stdout).execute(tree)
+        timings['execute'] = time.process_time() - start
+    finally:
+        os.chdir(cwd)
+
+    return timings, stdout.getvalue()
+
+
+def summarize(times, output):
+    """Summarizes the timed runs of a benchmark
+
+    Arguments:
+        times {dict} -- The CPU seconds of every timed run, by phase
+        output {str} -- The output of the program
+
+    Returns:
+        dict -- For every phase the "min", "median" and every one of the "times", and the "output" of the program
+    """
+    result = {phase: {
+        'min': min(times[phase]),
+        'median': statistics.median(times[phase]),
+        'times': times[phase]
+    } for phase in PHASES}
+    result['output'] = output
+
+    return result
+
+
+def run_benchmarks(paths, warmups=WARMUPS, repeats=REPEATS, file=None):
+    """Times every phase of every benchmark
+
+    The benchmarks take turns, one run each per round, so that a spell of load on the machine slows one run of
+    several benchmarks rather than every run of one
+
+    Arguments:
+        paths {list{str}} -- The paths of the .psc files
+
+    Keyword Arguments:
+        warmups {int} -- The rounds that are not timed (default: {WARMUPS})
+        repeats {int} -- The rounds that are timed (default: {REPEATS})
+        file {file} -- Where the results of every benchmark are written as they finish, or None (default: {None})
+
+    Returns:
+        dict -- The results, with the "machine" they were taken on and the results of every benchmark by name
+    """
+    codes = {}
+    for path in paths:
+        with open(path, 'r') as file_handle:
+            codes[benchmark_name(path)] = join_lines(file_handle.read())
+
+    times = {name: {phase: [] for phase in PHASES} for name in codes}
+    outputs = {}
+
+    for run in range(0, warmups + repeats):
+        for name, code in codes.items():
+            # Every run gets a directory of its own, so that the files one run leaves behind cannot change the next
+            directory = tempfile.mkdtemp(prefix='pseudocode-benchmark-')
+            try:
+                timings, outputs[name] = run_once(code, directory)
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+
+            if run >= warmups:
+                for phase in PHASES:
+                    times[name][phase].append(timings[phase])
+
+    results = {
+        'machine': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform()
+        },
+        'warmups': warmups,
+        'repeats': repeats,
+        'benchmarks': {}
+    }
+
+    for name in codes:
+        result = results['benchmarks'][name] = summarize(times[name], outputs[name])
+        if file is not None:
+            print('{:<16} {}'.format(name, '  '.join(
+                '{} {:.6f}s'.format(phase, result[phase]['min']) for phase in PHASES)), file=file)
+
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD, min_difference=MIN_DIFFERENCE):
+    """Compares results with a baseline, phase by phase, using the fastest run of each
+
+    Arguments:
+        results {dict} -- The results, as returned by run_benchmarks()
+        baseline {dict} -- Earlier results of the same benchmarks
+
+    Keyword Arguments:
+        threshold {float} -- How much slower a phase may be before it is a regression (default: {THRESHOLD})
+        min_difference {float} -- How many seconds slower a phase must also be to be a regression
+            (default: {MIN_DIFFERENCE})
+
+    Returns:
+        list{dict} -- Every phase of every benchmark found in both, with its "benchmark", "phase", "baseline" and
+            "current" times, their "change" as a fraction and whether it is a "regression". Benchmarks whose output
+            differs from the baseline are regressions whatever their times
+    """
+    comparisons = []
+
+    for name, result in results['benchmarks'].items():
+        before = baseline['benchmarks'].get(name)
+        if before is None:
+            continue
+
+        if before.get('output') is not None and result['output'] != before['output']:
+            comparisons.append({'benchmark': name, 'phase': 'output', 'baseline': None, 'current': None,
+                                'change': None, 'regression': True})
+
+        for phase in PHASES:
+            old = before[phase]['min']
+            new = result[phase]['min']
+            change = new / old - 1
+            comparisons.append({'benchmark': name, 'phase': phase, 'baseline': old, 'current': new,
+                                'change': change, 'regression': change > threshold and new - old > min_difference})
+
+    return comparisons
+
+
+def report(comparisons, file):
+    """Writes a comparison with a baseline as a table
+
+    Arguments:
+        comparisons {list{dict}} -- As returned by compare()
+        file {file} -- Where the table is written
+    """
+    print('{:<16} {:<8} {:>12} {:>12} {:>8}'.format('Benchmark', 'Phase', 'Baseline', 'Current', 'Change'),
+          file=file)
+    for comparison in comparisons:
+        if comparison['phase'] == 'output':
+            print('{:<16} {:<8} {:>45}'.format(comparison['benchmark'], 'output', 'DIFFERS  REGRESSION'), file=file)
+            continue
+
+        print('{:<16} {:<8} {:>11.6f}s {:>11.6f}s {:>+7.1f}%{}'.format(
+            comparison['benchmark'], comparison['phase'], comparison['baseline'], comparison['current'],
+            comparison['change'] * 100, '  REGRESSION' if comparison['regression'] else ''), file=file)
+
+
+def parse_arguments(argv):
+    """Parses the command-line arguments
+
+    Arguments:
+        argv {list{str}} -- The arguments, without the name of the program
+
+    Returns:
+        argparse.Namespace -- The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog='pseudocode-benchmark',
+        description='Times the lexer, analyzer and interpreter on the programs in benchmarks/ and compares the '
+                    'times with a stored baseline',
+        epilog='Times are CPU seconds, so that other processes on the machine count as little as possible, and the '
+               'fastest timed run of every phase is compared. Baselines only compare on the machine they were '
+               'taken on. Exits with 1 if any phase is slower than the threshold or any output has changed')
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help='the benchmarks to run, by file name without .psc (default: all of them)')
+    parser.add_argument('--warmups', type=int, default=WARMUPS,
+                        help='the runs of every benchmark that are not timed (default: %(default)s)')
+    parser.add_argument('--repeats', type=int, default=REPEATS,
+                        help='the runs of every benchmark that are timed (default: %(default)s)')
+    parser.add_argument('--output', default=None, metavar='FILE',
+                        help='write the results to FILE as JSON')
+    parser.add_argument('--baseline', default=BASELINE_PATH, metavar='FILE',
+                        help='the results to compare against (default: benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write the results to the baseline instead of comparing against it')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, metavar='FRACTION',
+                        help='how much slower a phase may be before it is a regression, 0.1 being 10%% '
+                             '(default: %(default)s)')
+    parser.add_argument('--min-difference', type=float, default=MIN_DIFFERENCE, metavar='SECONDS',
+                        help='how many seconds slower a phase must also be to be a regression, so that phases too '
+                             'short to time steadily are not (default: %(default)s)')
+
+    arguments = parser.parse_args(argv)
+    if arguments.warmups < 0:
+        parser.error('--warmups must be at least 0')
+    if arguments.repeats < 1:
+        parser.error('--repeats must be at least 1')
+    if arguments.threshold < 0:
+        parser.error('--threshold must be at least 0')
+    if arguments.min_difference < 0:
+        parser.error('--min-difference must be at least 0')
+
+    return arguments
+
+
+def write_results(path, results):
+    """Writes results as JSON
+
+    Arguments:
+        path {str} -- The path of the file
+        results {dict} -- The results, as returned by run_benchmarks()
+    """
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def main(argv=None):
+    """Runs the benchmarks given on the command line
+
+    Keyword Arguments:
+        argv {list{str}} -- The arguments, or None to use sys.argv (default: {None})
+
+    Returns:
+        int -- The exit code
+    """
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    load_plugins()
+
+    try:
+        paths = find_benchmarks(arguments.names or None)
+        results = run_benchmarks(paths, arguments.warmups, arguments.repeats, sys.stderr)
+    except Exception as error:
+        print('{}: {}'.format(type(error).__name__, error), file=sys.stderr)
+        return 1
+
+    if arguments.output:
+        write_results(arguments.output, results)
+
+    if arguments.save_baseline:
+        write_results(arguments.baseline, results)
+        print('Saved the baseline to {}'.format(arguments.baseline), file=sys.stderr)
+        return 0
+
+    if not os.path.exists(arguments.baseline):
+        print('There is no baseline at {}. Save one with --save-baseline'.format(arguments.baseline), file=sys.stderr)
+        return 0
+
+    with open(arguments.baseline, 'r') as file:
+        baseline = json.load(file)
+
+    comparisons = compare(results, baseline, arguments.threshold, arguments.min_difference)
+    print(file=sys.stderr)
+    report(comparisons, sys.stderr)
+
+    return 1 if any(comparison['regression'] for comparison in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
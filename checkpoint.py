@@ -0,0 +1,370 @@
+from ast_module import AST
+from data_types import Record, make_record
+from error import Error
+import hashlib
+import os
+import pickle
+import signal
+import sys
+import time
+
+# Written into every checkpoint, and bumped when what a checkpoint holds changes, so that older checkpoints are not
+# resumed by an interpreter that would read them wrongly
+VERSION = 2
+
+# The signal that asks a running program to save a checkpoint, where there is one (not on Windows)
+CHECKPOINT_SIGNAL = getattr(signal, 'SIGUSR1', None)
+
+
+def number_nodes(tree):
+    """Numbers every node of a tree in the order they are reached from its root. Parsing the same source always
+    gives the same numbers, which is how a checkpoint refers to the code of procedures and functions
+
+    Arguments:
+        tree {Block} -- The tree made by Analyzer.block()
+
+    Returns:
+        list{AST} -- The nodes, by number
+    """
+    nodes = []
+    seen = set()
+    pending = [tree]
+
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(reversed(node))
+            continue
+
+        if not isinstance(node, AST) or id(node) in seen:
+            continue
+
+        seen.add(id(node))
+        nodes.append(node)
+        pending.extend(reversed(list(vars(node).values())))
+
+    return nodes
+
+
+class CheckpointPickler(pickle.Pickler):
+    """Pickles the state of an Interpreter. Nodes of the tree are written as their number, and the classes made
+    from TYPE declarations as their name and fields, so that they are made again when the checkpoint is read"""
+
+    def __init__(self, file, nodes):
+        """Initializes a pickler
+
+        Arguments:
+            file {file} -- The binary file the checkpoint is written to
+            nodes {list{AST}} -- The nodes of the tree, as numbered by number_nodes()
+        """
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.numbers = {id(node): number for number, node in enumerate(nodes)}
+
+    def persistent_id(self, obj):
+        return self.numbers.get(id(obj))
+
+    def reducer_override(self, obj):
+        if isinstance(obj, type) and issubclass(obj, Record) and obj is not Record:
+            return make_record, (obj.__name__, obj.FIELDS)
+
+        return NotImplemented
+
+
+class CheckpointUnpickler(pickle.Unpickler):
+    """Reads a checkpoint written by CheckpointPickler, using the nodes of the tree the program was parsed into"""
+
+    def __init__(self, file, nodes):
+        """Initializes an unpickler
+
+        Arguments:
+            file {file} -- The binary file the checkpoint is read from
+            nodes {list{AST}} -- The nodes of the tree, as numbered by number_nodes()
+        """
+        super().__init__(file)
+        self.nodes = nodes
+
+    def persistent_load(self, number):
+        return self.nodes[number]
+
+
+def source_hash(code):
+    """Returns the hash of a program, so that a checkpoint is only resumed by the program it was taken of"""
+    return hashlib.sha1(code.encode('utf-8')).hexdigest()
+
+
+def read_checkpoint(path, tree, code):
+    """Reads a checkpoint
+
+    Arguments:
+        path {str} -- The path of the checkpoint
+        tree {Block} -- The tree of the program, parsed from code
+        code {str} -- The code of the program, with EOL between every line
+
+    Returns:
+        dict -- The state written by Checkpointer.save(), once its header has been checked
+    """
+    with open(path, 'rb') as file:
+        unpickler = CheckpointUnpickler(file, number_nodes(tree))
+
+        # The header is read first, since the nodes of another program do not match the numbers in the state
+        header = unpickler.load()
+        if not isinstance(header, dict) or header.get('version') != VERSION:
+            Error().value_error('{} was written by another version of the interpreter'.format(path))
+
+        if header.get('source') != source_hash(code):
+            Error().value_error('{} is a checkpoint of another program'.format(path))
+
+        state = unpickler.load()
+
+    return state
+
+
+class Checkpointer():
+    """Saves the state of a running program to a file at safe points, when asked to by request() (on a signal, for
+    example) or every so many statements, and resumes a program from such a file
+
+    A safe point is the start of a statement outside every procedure and function. The state saved is every scope
+    with its variables, arrays and records, the open files and where they are, and the position of the statement in
+    the program: the statement of every block being run, the branch taken by every IF and CASE, and the end and step
+    of every FOR loop. Call frames are not saved, so a request made while a procedure or function runs is saved once
+    it has returned, and a program that runs inside one call (such as CALL Main()) is never checkpointed
+    """
+
+    def __init__(self, path=None, tree=None, code='', every=None, log=None):
+        """Initializes a Checkpointer
+
+        Keyword Arguments:
+            path {str} -- Where checkpoints are saved, or None to only resume (default: {None})
+            tree {Block} -- The tree of the program (default: {None})
+            code {str} -- The code of the program, with EOL between every line (default: {''})
+            every {int} -- Saves a checkpoint every so many statements, or None to only save on request
+                (default: {None})
+            log {file} -- Where a line is written for every checkpoint saved or put off, or None (default: {None})
+        """
+        self.path = path
+        self.nodes = number_nodes(tree) if tree is not None else []
+        self.source = source_hash(code)
+        self.every = every
+        self.log = log
+
+        self.requested = False
+        self.statements = 0
+        self.depth = 0
+
+        # Whether the checkpoint due has been put off because a procedure or function is running
+        self.put_off = False
+
+        # The frames of the position being run: ['block', statement], ['for', end, step], ['loop'] and
+        # ['branch', branch], outermost first
+        self.position = []
+
+        # The frames still to be gone into while resuming, outermost first
+        self.resume_position = None
+
+        # [line number, bytes, seconds] of every checkpoint saved
+        self.checkpoints = []
+
+    def request(self, signum=None, frame=None):
+        """Saves a checkpoint at the next safe point. Can be used as a signal handler"""
+        self.requested = True
+
+    def install(self, interpreter):
+        """Makes an Interpreter keep track of its position and save checkpoints at safe points. The statements of
+        procedures and functions run as before, and an Interpreter without a Checkpointer runs exactly as before
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to checkpoint
+        """
+        visit_statement = interpreter.visit_Statement
+        visit_block = interpreter.visit_Block
+        visit_iteration = interpreter.visit_Iteration
+        visit_loop = interpreter.visit_Loop
+        visit_selection = interpreter.visit_Selection
+        visit_case = interpreter.visit_Case
+        visit_function_call = interpreter.visit_FunctionCall
+        position = self.position
+
+        def visit_Statement(node):
+            self.statements += 1
+            due = self.requested or (self.every is not None and self.statements >= self.every)
+            if due and self.path is not None:
+                if self.depth == 0 and interpreter.CURRENT_SCOPE is interpreter.SCOPES['GLOBAL']:
+                    self.save(interpreter, node.line_number)
+                elif not self.put_off:
+                    self.put_off = True
+                    if self.log is not None:
+                        print('Checkpoint put off at line {}: a procedure or function is running, and checkpoints are '
+                              'only saved outside them'.format(node.line_number), file=self.log)
+                        self.log.flush()
+
+            return visit_statement(node)
+
+        def visit_Block(node):
+            if self.depth:
+                return visit_block(node)
+
+            start = self.resume_position.pop(0)[1] if self.resume_position else 0
+            frame = ['block', start]
+            position.append(frame)
+            try:
+                statements = node.block
+                for index in range(start, len(statements)):
+                    frame[1] = index
+                    result = interpreter.visit(statements[index])
+                    if result is not None:
+                        return result
+            finally:
+                position.pop()
+
+        def visit_Iteration(node):
+            if self.depth:
+                return visit_iteration(node)
+
+            # The same as Interpreter.visit_Iteration(), except that a resumed loop carries on with its body
+            resumed = bool(self.resume_position)
+            if resumed:
+                _, end, step = self.resume_position.pop(0)
+                name = interpreter.visit(node.variable)
+            else:
+                interpreter.visit(node.assignment)
+                name = interpreter.visit(node.variable)
+                end = interpreter.visit(node.end)
+                step = interpreter.visit(node.step)
+
+            value = interpreter.CURRENT_SCOPE.get(name)
+            position.append(['for', end, step])
+            try:
+                while resumed or value <= end:
+                    resumed = False
+                    interpreter.visit(node.block)
+                    value = interpreter.CURRENT_SCOPE.get(name) + step
+                    interpreter.CURRENT_SCOPE.assign(name, value)
+            finally:
+                position.pop()
+
+        def visit_Loop(node):
+            if self.depth:
+                return visit_loop(node)
+
+            # The same as Interpreter.visit_Loop(), except that a resumed loop carries on with its body
+            resumed = bool(self.resume_position)
+            condition = None
+            if resumed:
+                self.resume_position.pop(0)
+            elif node.loop_while == False:
+                condition = False
+            else:
+                condition = interpreter.visit(node.condition)
+
+            position.append(['loop'])
+            try:
+                while resumed or condition == node.loop_while:
+                    resumed = False
+                    interpreter.visit(node.block)
+                    condition = interpreter.visit(node.condition)
+            finally:
+                position.pop()
+
+        def visit_branches(branches):
+            # A resumed IF or CASE carries on with the branch it took, without checking the conditions again
+            if self.resume_position:
+                index = self.resume_position.pop(0)[1]
+                position.append(['branch', index])
+                try:
+                    return interpreter.visit(branches[index].block)
+                finally:
+                    position.pop()
+
+            frame = ['branch', 0]
+            position.append(frame)
+            try:
+                for index, branch in enumerate(branches):
+                    frame[1] = index
+                    result, is_true = interpreter.visit(branch)
+                    if is_true == True:
+                        return result
+            finally:
+                position.pop()
+
+        def visit_Selection(node):
+            if self.depth:
+                return visit_selection(node)
+
+            return visit_branches(node.selection_list)
+
+        def visit_Case(node):
+            if self.depth:
+                return visit_case(node)
+
+            return visit_branches(node.case_list)
+
+        def visit_FunctionCall(node):
+            self.depth += 1
+            try:
+                return visit_function_call(node)
+            finally:
+                self.depth -= 1
+
+        # Found by Interpreter.visit() before the methods of the class
+        interpreter.visit_Statement = visit_Statement
+        interpreter.visit_Block = visit_Block
+        interpreter.visit_Iteration = visit_Iteration
+        interpreter.visit_Loop = visit_Loop
+        interpreter.visit_Selection = visit_Selection
+        interpreter.visit_Case = visit_Case
+        interpreter.visit_FunctionCall = visit_FunctionCall
+
+    def save(self, interpreter, line_number):
+        """Saves a checkpoint. The file is replaced in one go, so a crash while saving leaves the last checkpoint
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter, at a safe point
+            line_number {int} -- The line of the statement about to run
+        """
+        start = time.perf_counter()
+        self.requested = False
+        self.statements = 0
+        self.put_off = False
+
+        # Everything the program has written so far is written before the checkpoint that follows it
+        stdout = interpreter.STDOUT if interpreter.STDOUT is not None else sys.stdout
+        stdout.flush()
+
+        header = {'version': VERSION, 'source': self.source}
+        state = {
+            'line': line_number,
+            'position': [list(frame) for frame in self.position],
+            'scopes': interpreter.SCOPES,
+            'files': interpreter.FILES.checkpoint()
+        }
+
+        temporary = '{}.tmp'.format(self.path)
+        with open(temporary, 'wb') as file:
+            pickler = CheckpointPickler(file, self.nodes)
+            pickler.dump(header)
+            pickler.dump(state)
+            size = file.tell()
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, self.path)
+
+        seconds = time.perf_counter() - start
+        self.checkpoints.append([line_number, size, seconds])
+        if self.log is not None:
+            print('Checkpoint at line {} saved to {}: {:.1f} KB in {:.1f} ms'.format(
+                line_number, self.path, size / 1024, seconds * 1000), file=self.log)
+            self.log.flush()
+
+    def restore(self, interpreter, state):
+        """Gives an Interpreter the state of a checkpoint. The next execute() of the tree carries on from the
+        statement the checkpoint was saved before
+
+        Arguments:
+            interpreter {Interpreter} -- A new Interpreter, with this Checkpointer installed
+            state {dict} -- As returned by read_checkpoint()
+        """
+        interpreter.SCOPES = state['scopes']
+        interpreter.CURRENT_SCOPE = interpreter.SCOPES['GLOBAL']
+        interpreter.FILES.restore(state['files'])
+        self.resume_position = [list(frame) for frame in state['position']]
@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+
+# The client only imports the standard library, so that it starts as fast as python can. The socket and exit codes
+# are the same as server.py and main.py, which import the whole interpreter
+
+# The socket the server listens on unless --socket is given
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'pseudocode-{}.sock'.format(os.getuid()))
+
+# The exit codes of main.py, plus one for when there is no server to run the files
+EXIT_OK = 0
+EXIT_RUNTIME_ERROR = 1
+EXIT_USAGE_ERROR = 2
+EXIT_FILE_ERROR = 4
+EXIT_NO_SERVER = 6
+EXIT_INTERRUPTED = 130
+
+# The buffer size of files opened by programs, the same as file_handler.BUFFER_SIZE
+BUFFER_SIZE = 1 << 16
+
+
+def request_run(path, request):
+    """Sends a run to the server and waits for its response
+
+    Arguments:
+        path {str} -- The path of the socket of the server
+        request {dict} -- The request (see server.run_request())
+
+    Returns:
+        dict -- The response
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        with connection.makefile('rwb') as file:
+            file.write(json.dumps(request).encode('utf-8') + b'\n')
+            file.flush()
+            line = file.readline()
+
+    if not line:
+        raise ConnectionError('The worker running the file died')
+
+    return json.loads(line.decode('utf-8'))
+
+
+def make_request(source, stdin, arguments):
+    """Makes the request of one file
+
+    Arguments:
+        source {str} -- The text of the .psc file
+        stdin {str} -- What INPUT reads
+        arguments {argparse.Namespace} -- The parsed command-line arguments
+
+    Returns:
+        dict -- The request
+    """
+    limits = {
+        'steps': arguments.max_steps,
+        'seconds': arguments.max_seconds,
+        'elements': arguments.max_elements,
+        'memory': arguments.max_memory
+    }
+
+    return {
+        'source': source,
+        'stdin': stdin,
+        'cwd': os.getcwd(),
+        'limits': {name: limit for name, limit in limits.items() if limit is not None},
+        'options': {'buffer_size': arguments.buffer_size, 'mmap': arguments.mmap,
+                    'write_behind': arguments.write_behind},
+        'traceback': arguments.traceback,
+        'stats': arguments.stats
+    }
+
+
+def run(path, stdin, arguments):
+    """Runs one pseudocode file on the server, reporting errors and statistics to stderr like main.py
+
+    Arguments:
+        path {str} -- The path of the .psc file
+        stdin {str} -- What INPUT reads
+        arguments {argparse.Namespace} -- The parsed command-line arguments
+
+    Returns:
+        int -- The exit code of the file
+    """
+    try:
+        start = time.perf_counter()
+        with open(path, 'r') as file:
+            source = file.read()
+        read = time.perf_counter() - start
+    except OSError as error:
+        print('{}: {}: {}'.format(path, type(error).__name__, error), file=sys.stderr)
+        return EXIT_FILE_ERROR
+
+    try:
+        start = time.perf_counter()
+        response = request_run(arguments.socket, make_request(source, stdin, arguments))
+        total = time.perf_counter() - start
+    except (FileNotFoundError, ConnectionRefusedError):
+        print('{}: No server is listening on {}. Start one with python server.py'.format(path, arguments.socket),
+              file=sys.stderr)
+        return EXIT_NO_SERVER
+    except (OSError, ValueError) as error:
+        print('{}: {}: {}'.format(path, type(error).__name__, error), file=sys.stderr)
+        return EXIT_RUNTIME_ERROR
+
+    sys.stdout.write(response['stdout'])
+    sys.stdout.flush()
+
+    if response['error'] is not None:
+        if arguments.traceback and response.get('traceback'):
+            print(response['traceback'], end='', file=sys.stderr)
+        else:
+            print('{}: {}'.format(path, response['error']), file=sys.stderr)
+
+    if arguments.time:
+        timings = dict(read=read, **response['timings'])
+        phases = ', '.join('{} {:.3f}s'.format(phase, seconds) for phase, seconds in timings.items())
+        print('{}: {}{} (round trip {:.3f}s)'.format(
+            path, phases, ' (cached)' if response.get('cached') else '', total), file=sys.stderr)
+
+    if arguments.stats:
+        tokens = response.get('tokens')
+        peak = response.get('peak_memory')
+        print('{}: {} tokens, peak memory of the worker {}'.format(
+            path, tokens if tokens is not None else '?', '{:.1f} MB'.format(peak) if peak is not None else 'unknown'),
+            file=sys.stderr)
+
+    return response['exit_code']
+
+
+def parse_arguments(argv):
+    """Parses the command-line arguments, which are the same as main.py's
+
+    Arguments:
+        argv {list{str}} -- The arguments, without the name of the program
+
+    Returns:
+        argparse.Namespace -- The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog='pseudocode-client',
+        description='Runs CAIE pseudocode files on a server started with server.py',
+        epilog='Exit codes: 0 success, 1 runtime error, 2 usage error, 3 syntax error, 4 file cannot be read, '
+               '5 a limit was reached, 6 no server is running. '
+               'When several files are run, the highest code is returned. '
+               'Files are opened from the current directory. INPUT reads stdin, which is read in full before the '
+               'first file is sent, so programs cannot be used interactively')
+    parser.add_argument('paths', nargs='*', default=['console.psc'], metavar='FILE',
+                        help='the .psc files to run, in order (default: console.psc)')
+    parser.add_argument('--socket', default=SOCKET_PATH, metavar='PATH',
+                        help='the socket of the server (default: %(default)s)')
+    parser.add_argument('--time', action='store_true',
+                        help='print the time taken to read, parse and execute every file to stderr')
+    parser.add_argument('--stats', action='store_true',
+                        help='print the number of tokens of every file and the peak memory of the worker to stderr')
+    parser.add_argument('--traceback', action='store_true',
+                        help='print the full python traceback of errors')
+    parser.add_argument('--stop-on-error', action='store_true',
+                        help='do not run the remaining files after a file fails')
+
+    files = parser.add_argument_group('file modes')
+    files.add_argument('--buffer-size', type=int, default=BUFFER_SIZE, metavar='BYTES',
+                       help='the buffer size of every file opened (default: %(default)s)')
+    files.add_argument('--mmap', action='store_true',
+                       help='read files opened for READ through mmap')
+    files.add_argument('--write-behind', action='store_true',
+                       help='write files opened for WRITE or APPEND from a background thread')
+
+    limits = parser.add_argument_group('limits', 'A program that goes over a limit stops with a LimitError. '
+                                       'Limits not given are the ones the server was started with')
+    limits.add_argument('--max-steps', type=int, default=None, metavar='STEPS',
+                        help='the most statements and loop iterations a program may run')
+    limits.add_argument('--max-seconds', type=float, default=None, metavar='SECONDS',
+                        help='the most seconds a program may run for')
+    limits.add_argument('--max-elements', type=int, default=None, metavar='ELEMENTS',
+                        help='the most elements a single array may be declared with')
+    limits.add_argument('--max-memory', type=int, default=None, metavar='MB',
+                        help='the most memory (address space) the worker may use while a program runs')
+
+    arguments = parser.parse_args(argv)
+    if arguments.buffer_size < 1:
+        parser.error('--buffer-size must be at least 1')
+
+    return arguments
+
+
+def main(argv=None):
+    """Runs every file given on the command line on the server
+
+    Keyword Arguments:
+        argv {list{str}} -- The arguments, or None to use sys.argv (default: {None})
+
+    Returns:
+        int -- The exit code
+    """
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+
+    try:
+        # Every file is sent the whole of stdin
+        stdin = '' if sys.stdin is None or sys.stdin.isatty() else sys.stdin.read()
+
+        exit_code = EXIT_OK
+        for path in arguments.paths:
+            code = run(path, stdin, arguments)
+            exit_code = max(exit_code, code)
+
+            if code == EXIT_NO_SERVER or (code != EXIT_OK and arguments.stop_on_error):
+                break
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
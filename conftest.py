@@ -0,0 +1,20 @@
+# Makes the modules of the repository importable from tests/, which run from any directory
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption('--run-slow', action='store_true', help='also run the tests marked slow')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'slow: takes minutes or a lot of disk, only run with --run-slow')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--run-slow'):
+        return
+
+    skip = pytest.mark.skip(reason='needs --run-slow')
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip)
@@ -1,4 +1,5 @@
-from copy import copy
+from array import array
+from copy import deepcopy
 from error import Error
 
 
@@ -38,6 +39,9 @@ class VariableType(DataType):
         Returns:
             Variable -- The value of the instance encapsulated inside the Variable class
         """
+        if self.data_type == 'STRING':
+            return StringVariable(self.default)
+
         return Variable(self.default)
 
 
@@ -58,6 +62,42 @@ class Variable():
         # [0] is being used here because value is a list
         self.value = value[0]
 
+
+
+class StringVariable(Variable):
+    """Variable for STRING which collects appended strings and only joins them when the value is read
+
+    This keeps building a string through repeated appends linear in its length
+    """
+
+    def __init__(self, default):
+        self.parts = None
+        super().__init__(default)
+
+    @property
+    def value(self):
+        if self.parts is not None:
+            self.string = ''.join(self.parts)
+            self.parts = None
+
+        return self.string
+
+    @value.setter
+    def value(self, value):
+        self.string = value
+        self.parts = None
+
+    def append(self, strings):
+        """Appends strings to the end of the value without joining them
+
+        Arguments:
+            strings {list{str}} -- The strings to be appended
+        """
+        if self.parts is None:
+            self.parts = [self.string]
+
+        self.parts.extend(strings)
+
 # END: Variable
 
 # START: Constant
@@ -112,7 +152,7 @@ class ArrayType(DataType):
         DataType {DataType} -- This class inherits its __init__() function from it
     """
 
-    def __init__(self, dimensions, data_type, referee_name=None, reference_type='BYVAL', default=None):
+    def __init__(self, dimensions, data_type, referee_name=None, reference_type='BYVAL', default=None, record=None):
         """Initializes an array
 
         Arguments:
@@ -122,9 +162,11 @@ class ArrayType(DataType):
         Keyword Arguments:
             referee_name {str} -- The name of the variable this instance is being copied from in the parent scope (default: {None})
             reference_type {str} -- The type of reference being used when passing this instance as a parameter (default: {'BYVAL'})
+            record {type(Record)} -- The class of the elements when data_type is a TYPE (default: {None})
         """
         super().__init__(data_type, referee_name, reference_type, default)
         self.dimensions = dimensions
+        self.record = record
 
     def declare(self):
         """Declares an array
@@ -132,60 +174,514 @@ class ArrayType(DataType):
         Returns:
             Array -- The value of the instance encapsulated inside the Array class
         """
-        layers = len(self.dimensions)
-        deep_layer_indexes = {}      # The array/index at the current index
-        shallow_layer_indexes = {}     # The array/index at the previous index
+        if self.record is not None:
+            # Arrays of records are stored with one column per field
+            return RecordArray(self.record, self.dimensions)
 
-        # Start from the deepest layer and work up till the first layer
-        for i in range(layers - 1, -1, -1):
-            # Checks if its the deepest layer
-            if i + 1 == layers:
-                for j in range(self.dimensions[i][0], self.dimensions[i][1] + 1):
-                    deep_layer_indexes[j] = self.default
-            else:
-                # Append deep layer to the shallow layer
-                shallow_layer_indexes = copy(deep_layer_indexes)
-                deep_layer_indexes = {}
+        return Array(self.make_layer(0), self.dimensions)
+
+    def make_layer(self, layer):
+        """Makes the indexes of one dimension, giving every index its own copy of the deeper layers
+
+        Arguments:
+            layer {int} -- The position of the dimension within dimensions
+
+        Returns:
+            dict -- The indexes of the dimension mapped to their elements
+        """
+        lower_bound, upper_bound = self.dimensions[layer]
 
-                for j in range(self.dimensions[i][0], self.dimensions[i][1] + 1):
-                    deep_layer_indexes[j] = shallow_layer_indexes
+        # Checks if its the deepest layer
+        if layer + 1 == len(self.dimensions):
+            return dict.fromkeys(range(lower_bound, upper_bound + 1), self.default)
 
-        return Array(deep_layer_indexes)
+        return {index: self.make_layer(layer + 1) for index in range(lower_bound, upper_bound + 1)}
 
 
 class Array():
-    def __init__(self, value):
+    def __init__(self, data, dimensions):
         """Decalares and assigns a value to an array
 
+        The data of an array is shared copy-on-write: copying an Array (BYVAL parameters, whole array
+        assignment, deepcopy of a Scope) only shares the data, which is copied on the first write
+
         Arguments:
-            value {int, str, bool, float} -- Assign a value to Array
+            data {dict} -- The elements of the array nested by dimension
+            dimensions {list{list{int}}} -- The upper and lower bounds of every dimension
         """
-        self.value = value
+        self.data = data
+        self.dimensions = dimensions
+
+        # The number of Array instances sharing data, kept in a list so that all of them see the same count
+        self.references = [1]
+
+    @property
+    def value(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        array = self.__class__.__new__(self.__class__)
+        array.__dict__.update(self.__dict__)
+        array.share(self)
+
+        return array
+
+    def __str__(self):
+        return str(self.data)
+
+    def share(self, array):
+        """Starts sharing the data of another array
+
+        Arguments:
+            array {Array} -- The array whose data will be shared
+        """
+        self.data = array.data
+        self.references = array.references
+        self.references[0] += 1
+
+    def release(self):
+        """Stops sharing data, so that the remaining arrays do not need to copy it on their next write. The array
+        no longer holds the data, so it must be given new data before it is used again"""
+        self.references[0] -= 1
+        self.references = [1]
+        self.data = None
+
+    def detach(self):
+        """Copies the data if it is being shared, making this array its only owner"""
+        if self.references[0] > 1:
+            self.references[0] -= 1
+            self.references = [1]
+            self.data = self.copy_data()
+
+    def copy_data(self):
+        return self.copy_layer(self.data, len(self.dimensions))
+
+    def copy_layer(self, layer, depth):
+        """Copies one dimension of data and all the dimensions within it
+
+        Arguments:
+            layer {dict} -- The indexes of the dimension mapped to their elements
+            depth {int} -- The number of dimensions left, including this one
+
+        Returns:
+            dict -- The copy of the dimension
+        """
+        if depth == 1:
+            return layer.copy()
+
+        return {index: self.copy_layer(element, depth - 1) for index, element in layer.items()}
+
+    def get(self, indexes):
+        """Fetches the element at indexes
+
+        Arguments:
+            indexes {list{int}} -- The index of the element in every dimension
+
+        Returns:
+            int, str, float, bool -- The element
+        """
+        element = self.data
+        try:
+            for index in indexes:
+                element = element[index]
+        except (KeyError, TypeError):
+            # TODO November 07, 2019: Find a way to output the name of the array
+            Error().index_error('Index out of bounds')
+
+        return element
 
     def assign(self, data):
-        """Assigns a value to a Variable
+        """Assigns a value to an Array
 
         Arguments:
-            data {tuple} -- The data to be stored in an Array
+            data {tuple} -- The data to be stored in an Array (and the indexes to store it at)
         """
         value = data[0]
-        if type(value) is not list:
-            print(value)
-            print(data)
+        if isinstance(value, Array):
+            if type(value) is not type(self) or value.dimensions != self.dimensions:
+                Error().index_error('Cannot assign an ARRAY{} to an ARRAY{}'.format(
+                    value.dimensions, self.dimensions))
+
+            if value.data is not self.data:
+                self.release()
+                self.share(value)
+        elif type(value) is list:
+            data = self.from_list(value, 0)
+            self.release()
+            self.data = data
+        else:
             indexes = data[1]
-            array_indexes = self.value
+            if len(indexes) != len(self.dimensions):
+                Error().index_error('Expected {} index(es). Got {}'.format(len(self.dimensions), len(indexes)))
+
+            self.detach()
+            array_indexes = self.data
 
             for i in range(len(indexes) - 1):
-                try:
-                    array_indexes = array_indexes.get(indexes[i])
-                except:
-                    # TODO November 07, 2019: Find a way to output the name of the array
+                array_indexes = array_indexes.get(indexes[i])
+
+                if array_indexes is None:
                     Error().index_error('Index out of bounds')
 
+            if indexes[-1] not in array_indexes:
+                Error().index_error('Index out of bounds')
+
             array_indexes[indexes[-1]] = value
+
+    def get_range(self, first, last):
+        """Fetches the elements from first to last of a one-dimensional array
+
+        Arguments:
+            first {int} -- The index of the first element
+            last {int} -- The index of the last element
+
+        Returns:
+            list -- The elements, in order
+        """
+        self.check_range(first, last)
+        data = self.data
+
+        return [data[index] for index in range(first, last + 1)]
+
+    def set_range(self, first, elements):
+        """Assigns elements to a one-dimensional array, starting at index first
+
+        Arguments:
+            first {int} -- The index of the first element
+            elements {list} -- The elements, in order
+        """
+        self.check_range(first, first + len(elements) - 1)
+        self.detach()
+        self.data.update(zip(range(first, first + len(elements)), elements))
+
+    def check_range(self, first, last):
+        """Checks that first to last are indexes of a one-dimensional array
+
+        Arguments:
+            first {int} -- The index of the first element
+            last {int} -- The index of the last element
+        """
+        if len(self.dimensions) != 1:
+            Error().index_error('Expected an ARRAY with 1 dimension. Got {} dimensions'.format(len(self.dimensions)))
+
+        lower_bound, upper_bound = self.dimensions[0]
+        if first < lower_bound or last > upper_bound or first > last + 1:
+            Error().index_error('Index out of bounds')
+
+    def from_list(self, elements, layer):
+        """Lays out a (nested) list over the indexes of one dimension
+
+        Arguments:
+            elements {list} -- The elements of the dimension
+            layer {int} -- The position of the dimension within dimensions
+
+        Returns:
+            dict -- The indexes of the dimension mapped to their elements
+        """
+        lower_bound, upper_bound = self.dimensions[layer]
+
+        if type(elements) is not list or len(elements) != upper_bound - lower_bound + 1:
+            Error().index_error('Expected {} element(s) in dimension {}'.format(
+                upper_bound - lower_bound + 1, layer + 1))
+
+        if layer + 1 == len(self.dimensions):
+            return dict(zip(range(lower_bound, upper_bound + 1), elements))
+
+        return {index: self.from_list(element, layer + 1) for index, element in zip(range(lower_bound, upper_bound + 1), elements)}
+
+
+class ElementReference():
+    """Refers to an element of an Array so that it can be passed into a BYREF parameter"""
+
+    def __init__(self, array, indexes):
+        """Initializes a reference to an element
+
+        Arguments:
+            array {Array} -- The array the element belongs to
+            indexes {list{int}} -- The index of the element in every dimension
+        """
+        self.array = array
+        self.indexes = indexes
+
+    @property
+    def value(self):
+        return self.array.get(self.indexes)
+
+    def assign(self, value):
+        """Assigns a value to the element in the Array
+
+        Arguments:
+            value {list} -- The value to be stored in the element (and the field to store it in)
+        """
+        self.array.assign((value[0], self.indexes) + tuple(value[1:]))
+
+
+class RecordArray(Array):
+    """Stores an array of records as one Column per field rather than one record per element"""
+
+    def __init__(self, record, dimensions):
+        """Declares an array of records
+
+        Arguments:
+            record {type(Record)} -- The class of the records
+            dimensions {list{list{int}}} -- The upper and lower bounds of every dimension
+        """
+        length = 1
+        for lower_bound, upper_bound in dimensions:
+            length *= upper_bound - lower_bound + 1
+
+        columns = {}
+        for field, metadata in record.FIELDS.items():
+            columns[field] = Column(metadata, length)
+
+        super().__init__(columns, dimensions)
+        self.record = record
+        self.length = length
+
+    def __str__(self):
+        return str([str(RecordView(self, offset)) for offset in range(self.length)])
+
+    def copy_data(self):
+        columns = {}
+        for field, column in self.data.items():
+            columns[field] = column.copy()
+
+        return columns
+
+    def offset(self, indexes):
+        """Finds the position of a record within the columns
+
+        Arguments:
+            indexes {list{int}} -- The index of the record in every dimension
+
+        Returns:
+            int -- The position of the record in every Column
+        """
+        if len(indexes) != len(self.dimensions):
+            Error().index_error('Expected {} index(es). Got {}'.format(len(self.dimensions), len(indexes)))
+
+        offset = 0
+        for index, (lower_bound, upper_bound) in zip(indexes, self.dimensions):
+            if not lower_bound <= index <= upper_bound:
+                Error().index_error('Index out of bounds')
+
+            offset = offset * (upper_bound - lower_bound + 1) + index - lower_bound
+
+        return offset
+
+    def get(self, indexes):
+        """Fetches the record at indexes
+
+        Arguments:
+            indexes {list{int}} -- The index of the record in every dimension
+
+        Returns:
+            RecordView -- The record, which reads and writes the columns of this array
+        """
+        return RecordView(self, self.offset(indexes))
+
+    def get_field(self, indexes, field):
+        """Fetches a field of the record at indexes without making a RecordView
+
+        Arguments:
+            indexes {list{int}} -- The index of the record in every dimension
+            field {str} -- The name of the field
+
+        Returns:
+            int, str, float, bool, Array, Record -- The value of the field
+        """
+        if field not in self.data:
+            Error().name_error('{}.{}'.format(self.record.__name__, field))
+
+        return self.data[field].get(self.offset(indexes))
+
+    def write(self, offset, value, field=None):
+        """Writes a field, or every field, of the record at offset
+
+        Arguments:
+            offset {int} -- The position of the record in every Column
+            value {int, str, float, bool, Record, RecordView} -- The value of the field, or the whole record
+
+        Keyword Arguments:
+            field {str} -- The name of the field, None when the whole record is written (default: {None})
+        """
+        self.detach()
+
+        if field is not None:
+            if field not in self.data:
+                Error().name_error('{}.{}'.format(self.record.__name__, field))
+
+            self.data[field].set(offset, value)
+        elif isinstance(value, (Record, RecordView)) and value.FIELDS is self.record.FIELDS:
+            for field, column in self.data.items():
+                column.set(offset, deepcopy(value.get(field)))
+        else:
+            Error().type_error('Cannot assign {} to a {}'.format(value, self.record.__name__))
+
+    def assign(self, data):
+        """Assigns a value to an array of records
+
+        Arguments:
+            data {tuple} -- The data to be stored (and the indexes, and field of the record, to store it at)
+        """
+        value = data[0]
+        if isinstance(value, Array):
+            if type(value) is not type(self) or value.record is not self.record or value.dimensions != self.dimensions:
+                Error().index_error('Cannot assign an ARRAY{} to an ARRAY{} OF {}'.format(
+                    value.dimensions, self.dimensions, self.record.__name__))
+
+            if value.data is not self.data:
+                self.release()
+                self.share(value)
+        elif type(value) is list:
+            records = self.from_list(value, 0)
+            self.release()
+            self.data = RecordArray(self.record, self.dimensions).data
+
+            for offset in range(self.length):
+                self.write(offset, records[offset])
+        else:
+            offset = self.offset(data[1])
+            self.write(offset, value, data[2] if len(data) > 2 else None)
+
+    def from_list(self, elements, layer):
+        """Flattens a (nested) list of records in the order of the columns
+
+        Arguments:
+            elements {list} -- The elements of the dimension
+            layer {int} -- The position of the dimension within dimensions
+
+        Returns:
+            list -- The records of the dimension and all the dimensions within it
+        """
+        lower_bound, upper_bound = self.dimensions[layer]
+
+        if type(elements) is not list or len(elements) != upper_bound - lower_bound + 1:
+            Error().index_error('Expected {} element(s) in dimension {}'.format(
+                upper_bound - lower_bound + 1, layer + 1))
+
+        if layer + 1 == len(self.dimensions):
+            return elements
+
+        records = []
+        for element in elements:
+            records.extend(self.from_list(element, layer + 1))
+
+        return records
+
+
+class Column():
+    """The values of one field for every record in a RecordArray
+
+    INTEGER and REAL fields are packed into an array.array with a bytearray marking the assigned values.
+    The column falls back to a list as soon as a value does not fit, so values read back exactly as assigned
+    """
+
+    # The array.array type code for the data types that can be packed
+    TYPECODES = {'INTEGER': ('q', int), 'REAL': ('d', float)}
+
+    def __init__(self, metadata, length):
+        """Initializes a column with every value unassigned
+
+        Arguments:
+            metadata {DataType} -- The metadata of the field
+            length {int} -- The number of records
+        """
+        self.metadata = metadata
+        self.packed = None
+        self.assigned = None
+
+        if isinstance(metadata, VariableType):
+            if metadata.data_type in self.TYPECODES:
+                typecode, self.packed = self.TYPECODES[metadata.data_type]
+                self.values = array(typecode, bytes(length * array(typecode).itemsize))
+                self.assigned = bytearray(length)
+            else:
+                self.values = [None] * length
+        else:
+            # ARRAY and TYPE fields need an instance in every record
+            self.values = [metadata.declare() for i in range(length)]
+
+    def copy(self):
+        column = Column.__new__(Column)
+        column.__dict__.update(self.__dict__)
+
+        if isinstance(self.metadata, VariableType):
+            column.values = self.values[:]
+            column.assigned = self.assigned[:] if self.assigned is not None else None
+        else:
+            column.values = [deepcopy(value) for value in self.values]
+
+        return column
+
+    def get(self, offset):
+        if self.assigned is not None and not self.assigned[offset]:
+            return None
+
+        return self.values[offset]
+
+    def set(self, offset, value):
+        if isinstance(self.metadata, VariableType):
+            if self.packed is not None:
+                # An INTEGER expression assigned to a REAL field would otherwise unpack the column
+                if self.packed is float and type(value) is int:
+                    try:
+                        value = float(value)
+                    except OverflowError:
+                        pass
+
+                if type(value) is self.packed:
+                    try:
+                        self.values[offset] = value
+                        self.assigned[offset] = 1
+                        return
+                    except OverflowError:
+                        pass
+
+                self.unpack()
+
+            self.values[offset] = value
         else:
-            # TODO November 09, 2019: Compare both arrays and see if their ranks and length match up
-            self.value = value
+            # ARRAY and TYPE fields copy the value into their own instance
+            self.values[offset].assign((value,))
+
+    def unpack(self):
+        """Moves the values into a list, which can hold any value"""
+        self.values = [value if assigned else None for value, assigned in zip(self.values, self.assigned)]
+        self.packed = None
+        self.assigned = None
+
+
+class RecordView():
+    """A record of a RecordArray, reading and writing the columns of the array"""
+
+    def __init__(self, array, offset):
+        """Initializes a view of a record
+
+        Arguments:
+            array {RecordArray} -- The array the record belongs to
+            offset {int} -- The position of the record in every Column
+        """
+        self.array = array
+        self.offset = offset
+        self.FIELDS = array.record.FIELDS
+
+    @property
+    def value(self):
+        return self
+
+    def __str__(self):
+        return '{}({})'.format(self.array.record.__name__, ', '.join(
+            '{}: {}'.format(field, self.get(field)) for field in self.FIELDS))
+
+    def get(self, field):
+        if field not in self.FIELDS:
+            Error().name_error('{}.{}'.format(self.array.record.__name__, field))
+
+        return self.array.data[field].get(self.offset)
+
+    def assign(self, data):
+        self.array.write(self.offset, data[0], data[1] if len(data) > 1 else None)
 
 # END: Array
 
@@ -193,45 +689,163 @@ class Array():
 
 
 class TypeType(DataType):
-    def __init__(self, fields, data_type, referee_name=None, reference_type='BYVAL'):
+    def __init__(self, record, data_type, referee_name=None, reference_type='BYVAL'):
         """Initializes a type
 
         Arguments:
-            scope {Scope} -- The scope where the fields of the type were declared
+            record {type(Record)} -- The class made from the TYPE declaration by make_record()
             data_type {str} -- The data type of the object being initialized
 
         Keyword Arguments:
             referee_name {str} -- The name of the variable this instance is being copied from in the parent scope (default: {None})
             reference_type {str} -- The type of reference being used when passing this instance as a parameter (default: {'BYVAL'})
         """
-        self.fields = fields
-        default = {}
-        for field in fields.keys():
-            default[field] = fields[field].declare()
+        self.record = record
+        self.fields = record.FIELDS
 
-        super().__init__(data_type, referee_name, reference_type, default)
+        super().__init__(data_type, referee_name, reference_type)
 
     def declare(self):
-        """Declares an array
+        """Declares a type
 
         Returns:
-            Type -- The value of the instance encapsulated inside the Type class
+            Record -- An instance of the class made from the TYPE declaration
         """
-        field_values = {}
-        for field in self.fields.items():
-            field_values[field[0]] = field[1].declare()
+        return self.record()
 
-        return Type(field_values)
 
+# Put in front of the name of every field to make the name of its slot in a record
+SLOT_PREFIX = 'field_'
 
-class Type():
-    def __init__(self, name, value):
-        self.value = value
+
+class Record():
+    """Super class for the classes made from TYPE declarations, with one slot per field
+
+    The slot of a field is its name after SLOT_PREFIX, so that every name a field can have is kept apart from the
+    methods and attributes of the class
+    """
+    __slots__ = ()
+
+    # The metadata of every field, set by make_record()
+    FIELDS = {}
+
+    # The slot of every field, by the name of the field, set by make_record()
+    SLOTS = {}
+
+    @property
+    def value(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        record = self.__class__.__new__(self.__class__)
+        for slot in self.__slots__:
+            setattr(record, slot, deepcopy(getattr(self, slot), memo))
+
+        return record
+
+    def __str__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}: {}'.format(field, getattr(self, slot)) for field, slot in self.SLOTS.items()))
+
+    def get(self, field):
+        """Fetches the value of a field
+
+        Arguments:
+            field {str} -- The name of the field
+
+        Returns:
+            int, str, float, bool, Array -- The value of the field
+        """
+        slot = self.SLOTS.get(field)
+        if slot is None:
+            Error().name_error('{}.{}'.format(type(self).__name__, field))
+
+        return getattr(self, slot)
 
     def assign(self, data):
+        """Assigns to a field, or to every field when a whole record is assigned
+
+        Arguments:
+            data {tuple} -- The value (and the field to store it in)
+        """
         value = data[0]
-        field = data[1]
+        if len(data) > 1:
+            field = data[1]
+            slot = self.SLOTS.get(field)
+            if slot is None:
+                Error().name_error('{}.{}'.format(type(self).__name__, field))
+
+            if isinstance(self.FIELDS[field], VariableType):
+                setattr(self, slot, value)
+            else:
+                # ARRAY and TYPE fields copy the value into their own instance
+                getattr(self, slot).assign((value,))
+        elif type(value) is type(self) or (isinstance(value, RecordView) and value.FIELDS is self.FIELDS):
+            for field, slot in self.SLOTS.items():
+                setattr(self, slot, deepcopy(value.get(field)))
+        else:
+            Error().type_error('Cannot assign {} to a {}'.format(value, type(self).__name__))
+
+
+class FieldReference():
+    """Refers to a field of a record so that it can be passed into a BYREF parameter"""
+
+    def __init__(self, record, field):
+        """Initializes a reference to a field
+
+        Arguments:
+            record {Record} -- The record the field belongs to
+            field {str} -- The name of the field
+        """
+        self.record = record
+        self.field = field
+
+    @property
+    def value(self):
+        return self.record.get(self.field)
+
+    def assign(self, value):
+        """Assigns a value to the field of the record
+
+        Arguments:
+            value {list} -- The value to be stored in the field
+        """
+        self.record.assign((value[0], self.field))
+
+
+def make_record(name, fields):
+    """Compiles a TYPE declaration into a class with one slot per field
+
+    Arguments:
+        name {str} -- The name of the TYPE
+        fields {dict} -- The names of the fields mapped to their metadata
+
+    Returns:
+        type(Record) -- The class, called with the values of the fields (in order) to make a record
+    """
+    slots = {field: SLOT_PREFIX + field for field in fields}
+
+    # The generated code only uses names of its own (value0, declare0, ...), so fields can be called anything.
+    # Fields holding an ARRAY or TYPE get their own instance every time a record is made
+    namespace = {}
+    parameters = []
+    body = []
+    for i, (field, metadata) in enumerate(fields.items()):
+        parameters.append('value{}=None'.format(i))
+        if isinstance(metadata, VariableType):
+            body.append('    self.{} = value{}'.format(slots[field], i))
+        else:
+            namespace['declare{}'.format(i)] = metadata.declare
+            body.append('    self.{0} = declare{1}() if value{1} is None else value{1}'.format(slots[field], i))
+
+    source = 'def __init__(self, {}):\n{}\n'.format(', '.join(parameters), '\n'.join(body) or '    pass')
+    exec(source, namespace)
 
-        self.value[field].value = value
+    return type(name, (Record,), {
+        '__slots__': tuple(slots.values()),
+        '__init__': namespace['__init__'],
+        'FIELDS': fields,
+        'SLOTS': slots
+    })
 
-    # END: Type
+# END: Type
@@ -0,0 +1,542 @@
+from analyzer import Analyzer
+from data_types import Array
+from error import Error
+from function import load_plugins
+from interpreter import Interpreter
+from main import join_lines
+import argparse
+import os
+import socket
+import sys
+
+# Written when the debugger waits for a command. A client of --socket knows a response has ended when it ends with
+# the prompt
+PROMPT = '(debug) '
+
+# The name of the outermost frame, which runs the statements outside every procedure and function
+MAIN_FRAME = '(main)'
+
+# The lines shown before and after the current line by list
+LIST_CONTEXT = 5
+
+HELP = '''Commands (the short form is in brackets):
+  break LINE [IF condition]  (b)  stop at LINE, only when the pseudocode condition is TRUE if one is given
+  break                           list the breakpoints
+  delete LINE                (d)  remove the breakpoint at LINE
+  step                       (s)  run to the next statement, going into procedures and functions
+  next                       (n)  run to the next statement in this procedure or function or the one that called it
+  out                        (o)  run until this procedure or function returns
+  continue                   (c)  run to the next breakpoint
+  print expression           (p)  show the value of a pseudocode expression, such as Total, A[i, 2] or S.Name
+  vars                       (v)  show every variable, array and record of this procedure or function
+  where                      (w)  show the procedures and functions being run, innermost last
+  list                       (l)  show the source around the current line
+  quit                       (q)  stop the program
+  help                       (h)  show this help'''
+
+
+class Quit(BaseException):
+    """Raised when the program is stopped from the debugger. Not an Exception, so that it is not caught as an error
+    of the program"""
+    pass
+
+
+def parse_expression(text, condition=False):
+    """Parses a pseudocode expression typed into the debugger
+
+    Arguments:
+        text {str} -- The expression
+
+    Keyword Arguments:
+        condition {bool} -- Whether the expression is a condition, such as x > 3 AND NOT Done (default: {False})
+
+    Returns:
+        AST -- The tree of the expression, run with Interpreter.visit()
+    """
+    if not condition:
+        analyzer = Analyzer(text)
+        node = analyzer.expression()
+        if analyzer.current_token.type == 'EOF':
+            return node
+
+    # Anything with a comparison or a logical operator is parsed as a condition
+    analyzer = Analyzer(text)
+    node = analyzer.logical_expression()
+    if analyzer.current_token.type != 'EOF':
+        Error().syntax_error(analyzer.current_token.value, 1)
+
+    return node
+
+
+def parse_breakpoint(text):
+    """Parses a breakpoint written as LINE or LINE IF condition
+
+    Arguments:
+        text {str} -- The breakpoint
+
+    Returns:
+        tuple{int, str, AST} -- The line, the text of the condition and its tree (both None without a condition)
+    """
+    line, _, condition = text.strip().partition(' ')
+    condition = condition.strip()
+
+    try:
+        line_number = int(line)
+    except ValueError:
+        Error().value_error('{} is not a line number'.format(line))
+
+    if not condition:
+        return line_number, None, None
+
+    keyword, _, condition = condition.partition(' ')
+    if keyword.upper() != 'IF' or not condition.strip():
+        Error().value_error('Expected LINE or LINE IF condition. Got {}'.format(text.strip()))
+
+    return line_number, condition.strip(), parse_expression(condition, condition=True)
+
+
+def show(value):
+    """Writes a value the way OUTPUT would, with the elements of arrays and the fields of records
+
+    Arguments:
+        value {object} -- The value
+
+    Returns:
+        str -- The value as text
+    """
+    if isinstance(value, Array):
+        return '{} {}'.format(
+            'ARRAY[{}]'.format(', '.join('{}:{}'.format(lower, upper) for lower, upper in value.dimensions)),
+            value)
+    elif isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    elif isinstance(value, str):
+        return '"{}"'.format(value)
+
+    return str(value)
+
+
+class Debugger():
+    """Stops a program at breakpoints and steps through it a statement at a time, reading commands from one file and
+    writing what it shows to another (see HELP)
+
+    Nothing is checked while a program runs unless a Debugger is attached with Interpreter(debugger=...), and an
+    attached Debugger only checks the line of every statement against its breakpoints
+    """
+
+    def __init__(self, commands=None, output=None, source=None, stop_on_entry=True):
+        """Initializes a Debugger
+
+        Keyword Arguments:
+            commands {file} -- Where commands are read from, or None for stdin (default: {None})
+            output {file} -- Where the debugger writes, or None for stderr (default: {None})
+            source {str} -- The text of the program, to show its lines (default: {None})
+            stop_on_entry {bool} -- Whether to stop before the first statement (default: {True})
+        """
+        self.commands = commands
+        self.output = output
+        self.source_lines = source.split('\n') if source is not None else []
+
+        # Line number: [condition, tree of the condition]
+        self.breakpoints = {}
+
+        # 'step', 'next' or 'out' while stepping, otherwise None
+        self.mode = 'step' if stop_on_entry else None
+        self.target_depth = 0
+
+        # [name, line the call was made from] of every call being run
+        self.stack = [[MAIN_FRAME, None]]
+        self.line_number = None
+        self.interpreter = None
+
+    def install(self, interpreter):
+        """Makes an Interpreter check every statement against the breakpoints and the step being run
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to debug
+        """
+        self.interpreter = interpreter
+        visit_statement = interpreter.visit_Statement
+        visit_function_call = interpreter.visit_FunctionCall
+        breakpoints = self.breakpoints
+        stack = self.stack
+
+        def visit_Statement(node):
+            if self.mode is not None or node.line_number in breakpoints:
+                self.check(node.line_number)
+
+            self.line_number = node.line_number
+            return visit_statement(node)
+
+        def visit_FunctionCall(node):
+            stack.append([interpreter.visit(node.name), self.line_number])
+            try:
+                return visit_function_call(node)
+            finally:
+                stack.pop()
+                if self.mode == 'out' and len(stack) <= self.target_depth:
+                    # Stops at the next statement of the caller
+                    self.mode = 'step'
+
+        # Found by Interpreter.visit() before the methods of the class
+        interpreter.visit_Statement = visit_Statement
+        interpreter.visit_FunctionCall = visit_FunctionCall
+
+    def write(self, text=''):
+        """Writes a line"""
+        output = self.output if self.output is not None else sys.stderr
+        output.write(text + '\n')
+        output.flush()
+
+    def read_command(self):
+        """Writes the prompt and reads a command
+
+        Returns:
+            str -- The command, or None at the end of input
+        """
+        output = self.output if self.output is not None else sys.stderr
+        output.write(PROMPT)
+        output.flush()
+
+        line = (self.commands if self.commands is not None else sys.stdin).readline()
+        if not line:
+            return None
+
+        return line.strip()
+
+    def check(self, line_number):
+        """Stops before the statement at line_number if it is the end of a step or a breakpoint whose condition is
+        TRUE
+
+        Arguments:
+            line_number {int} -- The line of the statement about to run
+        """
+        depth = len(self.stack)
+        if self.mode == 'step' or (self.mode == 'next' and depth <= self.target_depth):
+            self.stop(line_number, 'step')
+            return
+
+        if line_number not in self.breakpoints:
+            return
+
+        condition, tree = self.breakpoints[line_number]
+        if tree is not None:
+            try:
+                if self.interpreter.visit(tree) is not True:
+                    return
+            except Exception as error:
+                self.write('The condition of the breakpoint at line {} failed: {}: {}'.format(
+                    line_number, type(error).__name__, error))
+
+        self.stop(line_number, 'breakpoint')
+
+    def stop(self, line_number, reason):
+        """Reads and runs commands until one of them carries on running the program
+
+        Arguments:
+            line_number {int} -- The line of the statement about to run
+            reason {str} -- Why the program stopped
+        """
+        self.line_number = line_number
+        self.mode = None
+        self.write('Stopped at line {} in {} ({})'.format(line_number, self.stack[-1][0], reason))
+        self.write_line(line_number, current=True)
+
+        while True:
+            command = self.read_command()
+            if command is None:
+                # Nothing more will be typed, so the program runs to its end
+                self.breakpoints.clear()
+                return
+
+            name, _, argument = command.partition(' ')
+            method = COMMANDS.get(name.lower())
+            if method is None:
+                if command:
+                    self.write('Unknown command {}. Type help for the commands'.format(name))
+                continue
+
+            try:
+                if method(self, argument.strip()):
+                    return
+            except Quit:
+                raise
+            except Exception as error:
+                self.write('{}: {}'.format(type(error).__name__, error))
+
+    def write_line(self, line_number, current=False):
+        """Writes a line of the source with its number"""
+        if line_number is not None and 0 < line_number <= len(self.source_lines):
+            self.write('{}{:>5}  {}'.format('->' if current else '  ', line_number,
+                                            self.source_lines[line_number - 1]))
+
+    # START: Commands
+    # Every command returns True when the program should carry on running
+
+    def command_break(self, argument):
+        if not argument:
+            if not self.breakpoints:
+                self.write('No breakpoints')
+
+            for line_number, (condition, _) in sorted(self.breakpoints.items()):
+                self.write('Breakpoint at line {}{}'.format(
+                    line_number, ' IF {}'.format(condition) if condition else ''))
+            return False
+
+        line_number, condition, tree = parse_breakpoint(argument)
+        self.breakpoints[line_number] = [condition, tree]
+        self.write('Breakpoint at line {}{}'.format(line_number, ' IF {}'.format(condition) if condition else ''))
+        return False
+
+    def command_delete(self, argument):
+        line_number, _, _ = parse_breakpoint(argument)
+        if self.breakpoints.pop(line_number, None) is None:
+            self.write('No breakpoint at line {}'.format(line_number))
+        else:
+            self.write('Deleted the breakpoint at line {}'.format(line_number))
+        return False
+
+    def command_step(self, argument):
+        self.mode = 'step'
+        return True
+
+    def command_next(self, argument):
+        self.mode = 'next'
+        self.target_depth = len(self.stack)
+        return True
+
+    def command_out(self, argument):
+        if len(self.stack) == 1:
+            self.write('Not in a procedure or function')
+            return False
+
+        self.mode = 'out'
+        self.target_depth = len(self.stack) - 1
+        return True
+
+    def command_continue(self, argument):
+        return True
+
+    def command_print(self, argument):
+        self.write(show(self.interpreter.visit(parse_expression(argument))))
+        return False
+
+    def command_vars(self, argument):
+        scope = self.interpreter.CURRENT_SCOPE
+        names = [name for name in scope.VALUES if scope.SYMBOL_TABLE.lookup(name) is not None]
+        if not names:
+            self.write('No variables')
+
+        for name in names:
+            # Declaring a variable makes an instance without a value
+            value = scope.VALUES[name]
+            value = value.value if value is not None else None
+            self.write('{} = {}'.format(name, show(value) if value is not None else '(not assigned)'))
+        return False
+
+    def command_where(self, argument):
+        for depth, (name, line_number) in enumerate(self.stack):
+            # Every frame is at the line of the call made by the frame after it
+            current = self.stack[depth + 1][1] if depth + 1 < len(self.stack) else self.line_number
+            self.write('{}{} at line {}'.format('  ' * depth, name, current))
+        return False
+
+    def command_list(self, argument):
+        first = max(self.line_number - LIST_CONTEXT, 1)
+        for line_number in range(first, min(self.line_number + LIST_CONTEXT, len(self.source_lines)) + 1):
+            self.write_line(line_number, current=line_number == self.line_number)
+        return False
+
+    def command_quit(self, argument):
+        raise Quit()
+
+    def command_help(self, argument):
+        self.write(HELP)
+        return False
+
+    # END: Commands
+
+
+COMMANDS = {
+    'break': Debugger.command_break, 'b': Debugger.command_break,
+    'delete': Debugger.command_delete, 'd': Debugger.command_delete,
+    'step': Debugger.command_step, 's': Debugger.command_step,
+    'next': Debugger.command_next, 'n': Debugger.command_next,
+    'out': Debugger.command_out, 'o': Debugger.command_out,
+    'continue': Debugger.command_continue, 'c': Debugger.command_continue,
+    'print': Debugger.command_print, 'p': Debugger.command_print,
+    'vars': Debugger.command_vars, 'v': Debugger.command_vars,
+    'where': Debugger.command_where, 'w': Debugger.command_where,
+    'list': Debugger.command_list, 'l': Debugger.command_list,
+    'quit': Debugger.command_quit, 'q': Debugger.command_quit,
+    'help': Debugger.command_help, 'h': Debugger.command_help
+}
+
+
+def debug(path, debugger):
+    """Runs a pseudocode file under a Debugger
+
+    Arguments:
+        path {str} -- The path of the .psc file
+        debugger {Debugger} -- The Debugger, which has the source of the file
+
+    Returns:
+        int -- The exit code
+    """
+    try:
+        code = join_lines('\n'.join(debugger.source_lines))
+        tree = Analyzer(code).block(['EOF']) if code else None
+        interpreter = Interpreter(debugger=debugger)
+        if tree is not None:
+            interpreter.execute(tree)
+    except Quit:
+        debugger.write('Stopped')
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    except Exception as error:
+        sys.stdout.flush()
+        debugger.write('{}: {}: {}'.format(path, type(error).__name__, error))
+        return 1
+
+    sys.stdout.flush()
+    debugger.write('Finished')
+    return 0
+
+
+def attach(path):
+    """Types commands into a debugger listening on a socket, showing what it writes, until it closes the socket
+
+    Arguments:
+        path {str} -- The path of the socket
+
+    Returns:
+        int -- The exit code
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        received = ''
+        while True:
+            data = connection.recv(1 << 16)
+            if not data:
+                return 0
+
+            text = data.decode('utf-8')
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+            received = (received + text)[-len(PROMPT):]
+            if received == PROMPT:
+                line = sys.stdin.readline()
+                connection.sendall((line if line else 'continue\n').encode('utf-8'))
+
+
+def parse_arguments(argv):
+    """Parses the command-line arguments
+
+    Arguments:
+        argv {list{str}} -- The arguments, without the name of the program
+
+    Returns:
+        argparse.Namespace -- The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog='pseudocode-debug',
+        description='Runs a CAIE pseudocode file a statement at a time, stopping at breakpoints',
+        epilog='The debugger reads commands from the terminal, or from one client of --socket at a time, such as '
+               'python debugger.py --attach PATH. Type help at the (debug) prompt for the commands')
+    parser.add_argument('path', nargs='?', default=None, metavar='FILE',
+                        help='the .psc file to debug')
+    parser.add_argument('-b', '--break', dest='breakpoints', action='append', default=[], metavar='BREAKPOINT',
+                        help='stop at a line, written as LINE or "LINE IF condition". Can be given more than once')
+    parser.add_argument('--run', action='store_true',
+                        help='run to the first breakpoint instead of stopping before the first statement')
+    parser.add_argument('--socket', default=None, metavar='PATH',
+                        help='read commands from a client of a Unix socket at PATH instead of the terminal')
+    parser.add_argument('--attach', default=None, metavar='PATH',
+                        help='type commands into a debugger started with --socket PATH')
+
+    arguments = parser.parse_args(argv)
+    if (arguments.path is None) == (arguments.attach is None):
+        parser.error('give either a FILE to debug or --attach PATH')
+
+    return arguments
+
+
+def main(argv=None):
+    """Runs the debugger given on the command line
+
+    Keyword Arguments:
+        argv {list{str}} -- The arguments, or None to use sys.argv (default: {None})
+
+    Returns:
+        int -- The exit code
+    """
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+
+    if arguments.attach is not None:
+        try:
+            return attach(arguments.attach)
+        except OSError as error:
+            print('{}: {}'.format(type(error).__name__, error), file=sys.stderr)
+            return 6
+        except KeyboardInterrupt:
+            return 130
+
+    load_plugins()
+
+    try:
+        with open(arguments.path, 'r') as file:
+            source = file.read()
+    except OSError as error:
+        print('{}: {}: {}'.format(arguments.path, type(error).__name__, error), file=sys.stderr)
+        return 4
+
+    if arguments.socket is None:
+        debugger = Debugger(source=source, stop_on_entry=not arguments.run)
+        return run_with_breakpoints(arguments, debugger)
+
+    from server import listen
+
+    try:
+        listener = listen(arguments.socket)
+    except OSError as error:
+        print('{}: {}'.format(type(error).__name__, error), file=sys.stderr)
+        return 4
+
+    try:
+        print('Waiting for a debugger to attach to {}'.format(arguments.socket), file=sys.stderr)
+        connection, _ = listener.accept()
+        with connection, connection.makefile('r') as commands, connection.makefile('w') as output:
+            debugger = Debugger(commands, output, source, stop_on_entry=not arguments.run)
+            return run_with_breakpoints(arguments, debugger)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        listener.close()
+        if os.path.exists(arguments.socket):
+            os.unlink(arguments.socket)
+
+
+def run_with_breakpoints(arguments, debugger):
+    """Adds the breakpoints given on the command line and debugs the file
+
+    Arguments:
+        arguments {argparse.Namespace} -- The parsed command-line arguments
+        debugger {Debugger} -- The Debugger
+
+    Returns:
+        int -- The exit code
+    """
+    for breakpoint in arguments.breakpoints:
+        try:
+            debugger.command_break(breakpoint)
+        except Exception as error:
+            debugger.write('{}: {}'.format(type(error).__name__, error))
+            return 2
+
+    return debug(arguments.path, debugger)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,8 @@
+class LimitError(Exception):
+    """Raised when a program goes over one of the limits it is run with (see limits.py)"""
+    pass
+
+
 class Error():
     """Passes all errors coming from lexer.py, interpreter.py or syntax_analysis.py to the console window
 
@@ -11,6 +16,9 @@ class Error():
         IndexError: When Array is out of bounds
         UnboundLocalError: When an instance has been declared but its value is None
         ReferenceError: An instance to be passed into BYREF parameter is not an instance
+        IOError: When a file cannot be opened, or is used in a way its file mode does not allow
+        LimitError: When a program goes over its step budget, time, array size or memory
+        ValueError: When a debugger command is given something other than a line number or condition
     """
 
     def exception(self, text):
@@ -53,6 +61,15 @@ class Error():
             raise SyntaxError('Unexpected {} at line {}. Expected {}'.format(
                 current_char, line_number, expected_char))
 
+    def parameter_error(self, text, line_number):
+        """Raises a syntax error when a function is called with the wrong number of parameters
+
+        Arguments:
+            text {str} -- The text to display on the console window
+            line_number {int} -- The line the function is called on
+        """
+        raise SyntaxError('{} at line {}'.format(text, line_number))
+
     def type_error(self, text):
         raise TypeError(repr(text))
 
@@ -73,3 +90,12 @@ class Error():
 
     def eof_error(self, text):
         raise EOFError(repr(text))
+
+    def file_error(self, text):
+        raise IOError(repr(text))
+
+    def limit_error(self, text):
+        raise LimitError(repr(text))
+
+    def value_error(self, text):
+        raise ValueError(repr(text))
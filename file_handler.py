@@ -0,0 +1,894 @@
+from data_types import Record, VariableType
+from error import Error
+from itertools import islice
+from locale import getpreferredencoding
+from operator import attrgetter
+from queue import Queue
+from threading import Thread
+import mmap
+import os
+import struct
+
+# The buffer size (in bytes) of every file opened, unless another is given to FileTable
+BUFFER_SIZE = 1 << 16
+
+# The number of bytes a MappedFileReader splits into lines at a time
+CHUNK_SIZE = 1 << 20
+
+# The number of bytes a MappedFileReader reads past before handing those pages back to the OS
+RELEASE_SIZE = 1 << 24
+
+# The number of lines an AsyncFileWriter collects before handing them to its thread in one batch
+BATCH_SIZE = 4096
+
+# The number of batches an AsyncFileWriter queues before WRITEFILE waits for its thread to catch up
+QUEUE_SIZE = 64
+
+# The number of bytes a STRING field takes up in a record of a RANDOM file
+STRING_SIZE = 255
+
+# The struct format of every data type a field of a record in a RANDOM file can have
+RECORD_FORMATS = {
+    'INTEGER': 'q',
+    'REAL': 'd',
+    'BOOLEAN': '?',
+    'CHAR': '4s',
+    'STRING': '{}s'.format(STRING_SIZE)
+}
+
+# The first bytes of every RANDOM file, followed by the length and the text of the layout of its records
+RECORD_MAGIC = b'PSRF'
+RECORD_HEADER = struct.Struct('<4sI')
+
+# The function that parses a line of a file for every data type of array READFILE can fill
+LINE_TYPES = {
+    'STRING': str,
+    'INTEGER': int,
+    'REAL': float
+}
+
+# The python mode used to open a file for every FILE_MODE token
+FILE_MODES = {
+    'READ': 'r',
+    'WRITE': 'w',
+    'APPEND': 'a'
+}
+
+
+class FileHandle():
+    """A file opened by OPENFILE. Every operation not allowed by the file mode raises an error"""
+
+    def __init__(self, name, mode):
+        self.name = name
+        self.mode = mode
+        self.file = None
+
+    def read_line(self):
+        Error().file_error('{} is opened for {}, not READ'.format(self.name, self.mode))
+
+    def read_lines(self, count):
+        Error().file_error('{} is opened for {}, not READ'.format(self.name, self.mode))
+
+    def write_line(self, line):
+        Error().file_error('{} is opened for {}, not WRITE or APPEND'.format(self.name, self.mode))
+
+    def write_lines(self, lines):
+        Error().file_error('{} is opened for {}, not WRITE or APPEND'.format(self.name, self.mode))
+
+    def eof(self):
+        Error().file_error('{} is opened for {}, not READ or RANDOM'.format(self.name, self.mode))
+
+    def seek(self, address):
+        Error().file_error('{} is opened for {}, not RANDOM'.format(self.name, self.mode))
+
+    def get_record(self, record):
+        Error().file_error('{} is opened for {}, not RANDOM'.format(self.name, self.mode))
+
+    def put_record(self, record):
+        Error().file_error('{} is opened for {}, not RANDOM'.format(self.name, self.mode))
+
+    def checkpoint(self):
+        """Returns what restore() needs to carry on from where the file is now (see FileTable.checkpoint())"""
+        return None
+
+    def restore(self, state):
+        """Carries on from where the file was when checkpoint() returned state"""
+        pass
+
+    def close(self):
+        self.file.close()
+
+
+class FileReader(FileHandle):
+    """A file opened for READ, which always holds the next line so that EOF does not touch the file"""
+
+    def __init__(self, name, buffer_size=BUFFER_SIZE):
+        """Opens a file for READ and reads its first line
+
+        Arguments:
+            name {str} -- The name of the file
+
+        Keyword Arguments:
+            buffer_size {int} -- The number of bytes read from the file at a time (default: {BUFFER_SIZE})
+        """
+        super().__init__(name, 'READ')
+        self.file = open(name, 'r', buffering=buffer_size)
+        self.next_line = self.file.readline()
+        self.lines_read = 0
+
+    def read_line(self):
+        """Returns the next line of the file and reads the one after it
+
+        Returns:
+            str -- The next line, without its line break
+        """
+        line = self.next_line
+        if not line:
+            Error().eof_error('No lines left to read in {}'.format(self.name))
+
+        self.next_line = self.file.readline()
+        self.lines_read += 1
+
+        if line[-1] == '\n':
+            return line[:-1]
+
+        return line
+
+    def read_lines(self, count):
+        """Returns up to count of the next lines of the file, fewer if the end of the file is reached
+
+        Arguments:
+            count {int} -- The number of lines to read
+
+        Returns:
+            list{str} -- The lines, without their line breaks
+        """
+        if count < 1 or not self.next_line:
+            return []
+
+        text = self.next_line + ''.join(islice(self.file, count - 1))
+        self.next_line = self.file.readline()
+
+        if text[-1] == '\n':
+            text = text[:-1]
+
+        lines = text.split('\n')
+        self.lines_read += len(lines)
+
+        return lines
+
+    def eof(self):
+        """Checks whether every line of the file has been read
+
+        Returns:
+            bool -- Whether there are no lines left to read
+        """
+        return not self.next_line
+
+    def checkpoint(self):
+        return self.lines_read
+
+    def restore(self, lines_read):
+        self.read_lines(lines_read)
+
+
+class MappedFileReader(FileHandle):
+    """A file opened for READ through mmap. Lines are split out of the mapped bytes a chunk at a time and only
+    decoded when they are read
+
+    Pages that have been read past are handed back to the OS, so memory use does not grow with the size of the file
+    """
+
+    def __init__(self, name):
+        """Maps a file for READ
+
+        Arguments:
+            name {str} -- The name of the file
+        """
+        super().__init__(name, 'READ')
+        self.file = open(name, 'rb')
+        self.encoding = getpreferredencoding(False)
+        self.lines = []
+        self.count = 0
+        self.index = 0
+        self.position = 0
+        self.released = 0
+        self.lines_read = 0
+
+        self.size = self.file.seek(0, 2)
+        if self.size > 0:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self.buffer, 'madvise'):
+                self.buffer.madvise(mmap.MADV_SEQUENTIAL)
+        else:
+            # Empty files cannot be mapped
+            self.buffer = b''
+
+    def read_line(self):
+        """Returns the next line of the file
+
+        Returns:
+            str -- The next line, without its line break
+        """
+        if self.index == self.count:
+            if self.position >= self.size:
+                Error().eof_error('No lines left to read in {}'.format(self.name))
+
+            self.split_chunk()
+
+        line = self.lines[self.index]
+        self.index += 1
+        self.lines_read += 1
+
+        return line.decode(self.encoding)
+
+    def read_lines(self, count):
+        """Returns up to count of the next lines of the file, fewer if the end of the file is reached
+
+        Arguments:
+            count {int} -- The number of lines to read
+
+        Returns:
+            list{str} -- The lines, without their line breaks
+        """
+        lines = []
+        while len(lines) < count and not self.eof():
+            if self.index == self.count:
+                self.split_chunk()
+
+            end = self.index + count - len(lines)
+            lines.extend(self.lines[self.index:end])
+            self.index = min(end, self.count)
+
+        if not lines:
+            return []
+
+        self.lines_read += len(lines)
+        return b'\n'.join(lines).decode(self.encoding).split('\n')
+
+    def eof(self):
+        """Checks whether every line of the file has been read
+
+        Returns:
+            bool -- Whether there are no lines left to read
+        """
+        return self.index == self.count and self.position >= self.size
+
+    def checkpoint(self):
+        return self.lines_read
+
+    def restore(self, lines_read):
+        self.read_lines(lines_read)
+
+    def split_chunk(self):
+        """Splits the lines in the next CHUNK_SIZE bytes of the file (or up to the end of a longer line)"""
+        start = self.position
+        end = self.buffer.rfind(b'\n', start, start + CHUNK_SIZE)
+        if end == -1:
+            end = self.buffer.find(b'\n', start + CHUNK_SIZE)
+            if end == -1:
+                # The last line does not end with a line break
+                end = self.size
+
+        chunk = self.buffer[start:end]
+        self.lines = chunk.split(b'\n')
+        if b'\r' in chunk:
+            # Lines ending with \r\n are read the same as in text mode
+            self.lines = [line[:-1] if line.endswith(b'\r') else line for line in self.lines]
+
+        self.count = len(self.lines)
+        self.index = 0
+        self.position = end + 1
+
+        if self.position - self.released > RELEASE_SIZE:
+            self.release()
+
+    def release(self):
+        """Hands the pages before the current chunk back to the OS. They are read from the file again if needed"""
+        end = min(self.position, self.size) // mmap.PAGESIZE * mmap.PAGESIZE
+        if hasattr(self.buffer, 'madvise') and end > self.released:
+            self.buffer.madvise(mmap.MADV_DONTNEED, self.released, end - self.released)
+
+        self.released = end
+
+    def close(self):
+        if self.size > 0:
+            self.buffer.close()
+
+        self.file.close()
+
+
+class FileWriter(FileHandle):
+    """A file opened for WRITE or APPEND, which is only written to once its buffer is full"""
+
+    def __init__(self, name, mode, buffer_size=BUFFER_SIZE):
+        """Opens a file for WRITE or APPEND
+
+        Arguments:
+            name {str} -- The name of the file
+            mode {str} -- WRITE or APPEND
+
+        Keyword Arguments:
+            buffer_size {int} -- The number of bytes held before they are written to the file (default: {BUFFER_SIZE})
+        """
+        super().__init__(name, mode)
+        self.file = open(name, FILE_MODES[mode], buffering=buffer_size)
+
+    def write_line(self, line):
+        """Writes a line to the end of the file
+
+        Arguments:
+            line {str} -- The line to write, without its line break
+        """
+        self.file.write(line + '\n')
+
+    def write_lines(self, lines):
+        """Writes lines to the end of the file
+
+        Arguments:
+            lines {list{str}} -- The lines to write, without their line breaks
+        """
+        if lines:
+            self.file.write('\n'.join(lines) + '\n')
+
+    def checkpoint(self):
+        """Writes the buffer to the file
+
+        Returns:
+            int -- The size of the file in bytes
+        """
+        self.file.flush()
+        return os.fstat(self.file.fileno()).st_size
+
+
+class AsyncFileWriter(FileHandle):
+    """A file opened for WRITE or APPEND, which is written to by a thread of its own
+
+    Lines are collected into batches that are written with one write() each. Errors in the thread are raised at the
+    next WRITEFILE or CLOSEFILE of the file, or at the next operation on any file of its FileTable
+    """
+
+    def __init__(self, name, mode, buffer_size=BUFFER_SIZE, table=None):
+        """Opens a file for WRITE or APPEND and starts its thread
+
+        Arguments:
+            name {str} -- The name of the file
+            mode {str} -- WRITE or APPEND
+
+        Keyword Arguments:
+            buffer_size {int} -- The number of bytes held before they are written to the file (default: {BUFFER_SIZE})
+            table {FileTable} -- The FileTable told about errors in the thread, or None (default: {None})
+        """
+        super().__init__(name, mode)
+        self.table = table
+        self.file = open(name, FILE_MODES[mode], buffering=buffer_size)
+        self.batch = []
+        self.error = None
+        self.reported = False
+        self.queue = Queue(QUEUE_SIZE)
+        self.thread = Thread(target=self.write_batches, name='WRITEFILE ' + name, daemon=True)
+        self.thread.start()
+
+    def write_line(self, line):
+        """Adds a line to the batch, queueing the batch once it is full
+
+        Arguments:
+            line {str} -- The line to write, without its line break
+        """
+        if self.error is not None:
+            self.raise_error()
+
+        self.batch.append(line)
+        if len(self.batch) >= BATCH_SIZE:
+            # Waits while the queue is full
+            self.queue.put(self.batch)
+            self.batch = []
+
+    def write_lines(self, lines):
+        """Adds lines to the batch, queueing the batch once it is full
+
+        Arguments:
+            lines {list{str}} -- The lines to write, without their line breaks
+        """
+        if self.error is not None:
+            self.raise_error()
+
+        self.batch.extend(lines)
+        if len(self.batch) >= BATCH_SIZE:
+            self.queue.put(self.batch)
+            self.batch = []
+
+    def write_batches(self):
+        """Writes every queued batch to the file until None is queued. Runs in the thread of the file"""
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                self.queue.task_done()
+                break
+
+            if self.error is None:
+                try:
+                    batch.append('')
+                    self.file.write('\n'.join(batch))
+                except Exception as error:
+                    # Later batches are still taken off the queue so that WRITEFILE never waits forever
+                    self.error = error
+                    if self.table is not None:
+                        self.table.failed = self
+
+            self.queue.task_done()
+
+    def checkpoint(self):
+        """Waits for the thread to write every line so far and writes the buffer to the file
+
+        Returns:
+            int -- The size of the file in bytes
+        """
+        if self.batch:
+            self.queue.put(self.batch)
+            self.batch = []
+
+        self.queue.join()
+        if self.error is not None:
+            self.raise_error()
+
+        self.file.flush()
+        return os.fstat(self.file.fileno()).st_size
+
+    def close(self):
+        """Queues the last batch, waits for the thread to write everything and closes the file"""
+        if self.batch:
+            self.queue.put(self.batch)
+            self.batch = []
+
+        self.queue.put(None)
+        self.thread.join()
+
+        try:
+            self.file.close()
+        except Exception as error:
+            self.error = self.error or error
+
+        if self.error is not None and not self.reported:
+            self.raise_error()
+
+    def raise_error(self):
+        error = self.error
+        self.reported = True
+        message = error.strerror if isinstance(error, OSError) and error.strerror else str(error)
+        Error().file_error('Cannot write to {}: {}'.format(self.name, message))
+
+
+class RecordLayout():
+    """The binary layout of a TYPE in a RANDOM file. Every field is stored with a fixed size, so every record is too
+
+    STRING and CHAR fields are stored as UTF-8, padded with zero bytes
+    """
+
+    def __init__(self, record):
+        """Works out the layout of a TYPE
+
+        Arguments:
+            record {type(Record)} -- The class made from the TYPE declaration
+        """
+        self.record = record
+        self.fields = tuple(record.FIELDS)
+        self.strings = []
+        self.widths = []
+
+        formats = []
+        for i in range(0, len(self.fields)):
+            metadata = record.FIELDS[self.fields[i]]
+            if not isinstance(metadata, VariableType) or metadata.data_type not in RECORD_FORMATS:
+                Error().type_error('{}.{} cannot be stored in a RANDOM file'.format(record.__name__, self.fields[i]))
+
+            formats.append(RECORD_FORMATS[metadata.data_type])
+            if metadata.data_type in ('STRING', 'CHAR'):
+                self.strings.append(i)
+                self.widths.append(struct.calcsize(formats[-1]))
+
+        self.struct = struct.Struct('<' + ''.join(formats))
+        self.size = self.struct.size
+
+        # The fields and their formats, written at the start of a RANDOM file so that its records are only read
+        # into a TYPE they were written from
+        self.signature = ';'.join(
+            '{}:{}'.format(field, fmt) for field, fmt in zip(self.fields, formats)).encode('utf-8')
+        slots = [record.SLOTS[field] for field in self.fields]
+        self.getter = attrgetter(*slots) if slots else (lambda record: ())
+
+    def pack(self, record):
+        """Turns a record into bytes
+
+        Arguments:
+            record {Record/RecordView} -- The record
+
+        Returns:
+            bytes -- The record in the layout
+        """
+        if isinstance(record, Record):
+            values = self.getter(record)
+            values = [values] if len(self.fields) == 1 else list(values)
+        else:
+            values = [record.get(field) for field in self.fields]
+
+        for i in range(0, len(values)):
+            if values[i] is None:
+                Error().unbound_local_error('{}.{}'.format(self.record.__name__, self.fields[i]))
+
+        for i, width in zip(self.strings, self.widths):
+            values[i] = values[i].encode('utf-8')
+            if len(values[i]) > width:
+                Error().type_error('{}.{} is longer than {} bytes'.format(self.record.__name__, self.fields[i], width))
+
+        try:
+            return self.struct.pack(*values)
+        except struct.error:
+            Error().type_error('Cannot store {} in a RANDOM file'.format(self.record.__name__))
+
+    def unpack(self, data):
+        """Turns bytes into the values of the fields of a record
+
+        Arguments:
+            data {bytes} -- The record in the layout
+
+        Returns:
+            list -- The value of every field, in order
+        """
+        values = list(self.struct.unpack(data))
+        for i in self.strings:
+            values[i] = values[i].rstrip(b'\0').decode('utf-8')
+
+        return values
+
+
+class RecordFile(FileHandle):
+    """A file opened for RANDOM, holding fixed-size records. Records are numbered from 1
+
+    GETRECORD and PUTRECORD read or write the record at the current address and move on to the next one, so records
+    can be updated in place or read one after another
+
+    The file starts with a header naming the fields of its records and their formats, written with the first record,
+    so that the size of its records is known before one has been read and they are only read into the TYPE they
+    were written from (or one with the same fields)
+    """
+
+    def __init__(self, name, buffer_size=BUFFER_SIZE):
+        """Opens a file for RANDOM, making it if it does not exist
+
+        Arguments:
+            name {str} -- The name of the file
+
+        Keyword Arguments:
+            buffer_size {int} -- The number of bytes read from or held for the file at a time (default: {BUFFER_SIZE})
+        """
+        super().__init__(name, 'RANDOM')
+        try:
+            self.file = open(name, 'r+b', buffering=buffer_size)
+        except FileNotFoundError:
+            self.file = open(name, 'w+b', buffering=buffer_size)
+
+        # The record GETRECORD and PUTRECORD use next, counting from 0
+        self.address = 0
+        self.layout = None
+
+        # The signature and size of the records of the file, and where they start, once the header has been written
+        self.signature = None
+        self.record_size = None
+        self.start = 0
+
+        # The size of the file and the position of the python file object, in bytes
+        self.size = self.file.seek(0, 2)
+        self.position = self.size
+        if self.size:
+            self.read_header()
+
+    def read_header(self):
+        """Reads the layout of the records from the start of the file"""
+        self.file.seek(0)
+        header = self.file.read(RECORD_HEADER.size)
+        magic, length = RECORD_HEADER.unpack(header) if len(header) == RECORD_HEADER.size else (None, 0)
+        signature = self.file.read(length)
+        if magic != RECORD_MAGIC or len(signature) != length:
+            self.file.close()
+            Error().file_error('{} is not a RANDOM file'.format(self.name))
+
+        self.signature = signature
+        self.record_size = struct.calcsize('<' + ''.join(
+            field.rsplit(b':', 1)[1].decode('ascii') for field in signature.split(b';') if field))
+        self.start = RECORD_HEADER.size + length
+        self.position = self.start
+
+    def write_header(self, layout):
+        """Writes the layout of the records at the start of an empty file
+
+        Arguments:
+            layout {RecordLayout} -- The layout of the first record written
+        """
+        self.file.seek(0)
+        self.file.write(RECORD_HEADER.pack(RECORD_MAGIC, len(layout.signature)) + layout.signature)
+        self.signature = layout.signature
+        self.record_size = layout.size
+        self.start = RECORD_HEADER.size + len(layout.signature)
+        self.size = self.position = self.start
+
+    def seek(self, address):
+        """Moves to a record
+
+        Arguments:
+            address {int} -- The number of the record, counting from 1
+        """
+        if type(address) is not int or address < 1:
+            Error().index_error('{} is not a record address of {}'.format(address, self.name))
+
+        self.address = address - 1
+
+    def get_record(self, record):
+        """Reads the record at the current address and moves to the next one
+
+        Arguments:
+            record {type(Record)} -- The class made from the TYPE declaration of the record
+
+        Returns:
+            list -- The value of every field, in order
+        """
+        layout = self.record_layout(record)
+        start = self.start + self.address * layout.size
+        if self.signature is None or start + layout.size > self.size:
+            Error().eof_error('{} has no record at address {}'.format(self.name, self.address + 1))
+
+        if start != self.position:
+            self.file.seek(start)
+
+        data = self.file.read(layout.size)
+        self.position = start + layout.size
+        self.address += 1
+
+        return layout.unpack(data)
+
+    def put_record(self, record):
+        """Writes a record at the current address and moves to the next one
+
+        Arguments:
+            record {Record/RecordView} -- The record to write
+        """
+        layout = self.record_layout(type(record) if isinstance(record, Record) else record.array.record)
+        data = layout.pack(record)
+        if self.signature is None:
+            self.write_header(layout)
+
+        start = self.start + self.address * layout.size
+        if start != self.position:
+            self.file.seek(start)
+
+        self.file.write(data)
+        self.position = start + layout.size
+        self.address += 1
+
+        if self.position > self.size:
+            self.size = self.position
+
+    def eof(self):
+        """Checks whether the current address is past the last record
+
+        Returns:
+            bool -- Whether there is no record at the current address
+        """
+        if self.record_size is None:
+            return True
+
+        return self.start + (self.address + 1) * self.record_size > self.size
+
+    def checkpoint(self):
+        """Records in place can be written again after the checkpoint, so the whole file is kept
+
+        Returns:
+            dict -- The "data" of the file, the current "address" and the "record" class its layout is for
+        """
+        self.file.flush()
+        self.file.seek(0)
+        data = self.file.read()
+        self.position = self.file.tell()
+
+        record = self.layout.record if self.layout is not None else None
+        return {'data': data, 'address': self.address, 'record': record}
+
+    def restore(self, state):
+        self.address = state['address']
+        if state['record'] is not None:
+            self.record_layout(state['record'])
+
+    def record_layout(self, record):
+        """Fetches the layout of a TYPE, checking that its fields are those of the records of the file
+
+        Arguments:
+            record {type(Record)} -- The class made from the TYPE declaration
+
+        Returns:
+            RecordLayout -- The layout of the TYPE
+        """
+        if self.layout is not None and self.layout.record is record:
+            return self.layout
+
+        layout = RecordLayout(record)
+        if self.signature is not None and self.signature != layout.signature:
+            Error().file_error('{} holds records of {}, not of {} ({})'.format(
+                self.name, self.signature.decode('utf-8'), record.__name__, layout.signature.decode('utf-8')))
+
+        self.layout = layout
+        return layout
+
+
+def inside_directory(directory, name):
+    """Returns the path of a file in a directory, or None if the name leads out of the directory (through an
+    absolute path, .. or a symbolic link)
+
+    Arguments:
+        directory {str} -- The directory
+        name {str} -- The name of the file
+
+    Returns:
+        str -- The path of the file, with every symbolic link followed
+    """
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        return None
+
+    return path
+
+
+class FileTable():
+    """Every file opened by the program, by name. Files are closed by CLOSEFILE, or all at once by close_all()"""
+
+    def __init__(self, buffer_size=BUFFER_SIZE, memory_map=False, write_behind=False, directory=None):
+        """Initializes an empty FileTable
+
+        Keyword Arguments:
+            buffer_size {int} -- The buffer size (in bytes) of every file opened (default: {BUFFER_SIZE})
+            memory_map {bool} -- Whether files opened for READ are read through mmap (default: {False})
+            write_behind {bool} -- Whether files opened for WRITE or APPEND are written by a thread (default: {False})
+            directory {str} -- The directory the names of files are relative to, or None for the working directory
+                (default: {None})
+        """
+        self.buffer_size = buffer_size
+        self.memory_map = memory_map
+        self.write_behind = write_behind
+        self.directory = directory
+        self.handles = {}
+        # An AsyncFileWriter whose thread failed to write, set by the thread itself
+        self.failed = None
+
+    def check(self):
+        """Raises the error of a file written by a thread that has not been raised yet, whichever file is used next"""
+        handle = self.failed
+        if handle is not None:
+            self.failed = None
+            if not handle.reported:
+                handle.raise_error()
+
+    def path(self, name):
+        """Returns the path of the file a program calls name. With a directory, only the files in it can be opened"""
+        if self.directory is None:
+            return name
+
+        path = inside_directory(self.directory, name)
+        if path is None:
+            Error().file_error('{} is not in the directory of the program'.format(name))
+
+        return path
+
+    def open(self, name, mode):
+        """Opens a file
+
+        Arguments:
+            name {str} -- The name of the file
+            mode {str} -- READ, WRITE, APPEND or RANDOM
+
+        Returns:
+            FileHandle -- The file opened
+        """
+        self.check()
+        if name in self.handles:
+            Error().file_error('{} is already open'.format(name))
+
+        path = self.path(name)
+        try:
+            if mode == 'READ' and self.memory_map:
+                handle = MappedFileReader(path)
+            elif mode == 'READ':
+                handle = FileReader(path, self.buffer_size)
+            elif mode == 'RANDOM':
+                handle = RecordFile(path, self.buffer_size)
+            elif self.write_behind:
+                handle = AsyncFileWriter(path, mode, self.buffer_size, self)
+            else:
+                handle = FileWriter(path, mode, self.buffer_size)
+        except OSError as error:
+            Error().file_error('Cannot open {}: {}'.format(name, error.strerror))
+
+        # Errors name the file the way the program does
+        handle.name = name
+
+        self.handles[name] = handle
+        return handle
+
+    def get(self, name):
+        """Fetches an open file
+
+        Arguments:
+            name {str} -- The name of the file
+
+        Returns:
+            FileHandle -- The file opened with name
+        """
+        self.check()
+        handle = self.handles.get(name)
+        if handle is None:
+            Error().file_error('{} is not open'.format(name))
+
+        return handle
+
+    def close(self, name):
+        """Closes an open file, writing whatever is left in its buffer
+
+        Arguments:
+            name {str} -- The name of the file
+        """
+        self.get(name).close()
+        del self.handles[name]
+
+    def checkpoint(self):
+        """Records where every open file is, so that restore() can open them again at the same place
+
+        Returns:
+            list{list} -- The name, mode and state of every open file
+        """
+        self.check()
+        return [[name, handle.mode, handle.checkpoint()] for name, handle in self.handles.items()]
+
+    def restore(self, files):
+        """Opens the files that were open when checkpoint() returned files, where they were
+
+        Arguments:
+            files {list{list}} -- As returned by checkpoint()
+        """
+        for name, mode, state in files:
+            if mode in ('WRITE', 'APPEND'):
+                # Lines written after the checkpoint are taken off before the file is written to again
+                try:
+                    os.truncate(self.path(name), state)
+                except OSError as error:
+                    Error().file_error('Cannot open {}: {}'.format(name, error.strerror))
+
+                handle = self.open(name, 'APPEND')
+                handle.mode = mode
+            elif mode == 'RANDOM':
+                with open(self.path(name), 'wb') as file:
+                    file.write(state['data'])
+
+                handle = self.open(name, mode)
+            else:
+                handle = self.open(name, mode)
+
+            handle.restore(state)
+
+    def close_all(self):
+        """Closes every open file, even if closing one of them fails"""
+        handles = list(self.handles.values())
+        self.handles = {}
+
+        error = None
+        try:
+            self.check()
+        except OSError as exception:
+            error = exception
+
+        for handle in handles:
+            try:
+                handle.close()
+            except OSError as exception:
+                error = error or exception
+
+        if error is not None:
+            raise error
@@ -1,133 +1,277 @@
+from importlib.metadata import entry_points
+from error import Error
+from lexer import Lexer
+
+
+# All built-in functions by name, filled in by register_builtin()
+BUILTIN_FUNCTIONS = {}
+
+# The entry point group searched by load_plugins()
+PLUGIN_GROUP = 'pseudocode.builtins'
+
+# The python types that the data types of parameters are checked against
+PARAMETER_TYPES = {
+    'INTEGER': int,
+    'REAL': float,
+    'STRING': str,
+    'CHAR': str,
+    'BOOLEAN': bool
+}
+
+
 class BuiltInFunction():
-    def __init__(self, CURRENT_SCOPE):
-        self.CURRENT_SCOPE = CURRENT_SCOPE
-
-    def check_function(self, function, parameters, count, types):
-        if len(parameters) == count:
-            for i in range(0, len(parameters)):
-                if not isinstance(parameters[i], types[i]):
-                    raise TypeError(function + ': Parameter ' + str(i + 1))
-        else:
-            raise SyntaxError('Expected ' + str(count) + ' parameter(s).' +
-                              ' Got ' + str(len(parameters)) + ' parameter(s)')
-
-        return True
-
-    def check_char(self, parameter):
-        if len(parameter) == 1:
-            return True
-        else:
-            return False
-
-    def CHR(self, parameters):
-        # CHR(x : INTEGER) RETURNS CHAR
-        if self.check_function('CHR', parameters, 1, [int]):
-            return chr(parameters[0])
-
-    def ASC(self, parameters):
-        # ASC(ThisChar : CHAR) RETURNS INTEGER
-        if self.check_function('ASC', parameters, 1, [str]) and self.check_char(parameters[0]):
-            return ord(parameters[0])
-        else:
-            raise TypeError('ASC(CHAR) expects a parameter of type CHAR')
-
-    def LENGTH(self, parameters):
-        # LENGTH(ThisString : STRING) RETURNS INTEGER
-        if self.check_function('LENGTH', parameters, 1, [str]):
-            return len(parameters[0])
-
-    def LEFT(self, parameters):
-        # LEFT(ThisString : STRING, x : INTEGER) RETURNS STRING
-        if self.check_function('LEFT', parameters, 2, [str, int]):
-            return parameters[0][0:parameters[1]]
-
-    def RIGHT(self, parameters):
-        # RIGHT(ThisString : STRING, x : INTEGER) RETURNS STRING
-        if self.check_function('RIGHT', parameters, 2, [str, int]):
-            return parameters[0][-parameters[1]:]
-
-    def MID(self, parameters):
-        # MID(ThisString : STRING, x : INTEGER, y : INTEGER) RETURNS STRING
-        if self.check_function('MID', parameters, 3, [str, int, int]):
-            return parameters[0][parameters[1]:parameters[1] + parameters[2]]
-
-    def CONCAT(self, parameters):
-        # CONCAT(String1 : STRING, String2 : STRING [, String3 : STRING]) RETURNS STRING
-        if self.check_function('RIGHT', parameters, len(parameters), [str] * len(parameters)) and len(parameters) >= 2:
-            concat = ''
-            for parameter in parameters:
-                concat += parameter
-            return concat
-        else:
-            raise SyntaxError('Expected 2 or more parameters.' +
-                              ' Got ' + str(len(parameters)) + ' parameter')
-
-    def INT(self, parameters):
-        # INT(x : REAL) RETURNS INTEGER
-        if self.check_function('INT', parameters, 1, [float]):
-            return int(parameters[0])
-
-    # FIXME October 25, 2019: Causing problems with operations DIV and MOD
-
-    # def MOD(self, parameters):
-    #     # MOD(ThisNum : INTEGER, ThisDiv : INTEGER) RETURNS INTEGER
-    #     if self.check_function('MOD', parameters, 2, [int, int]):
-    #         return parameters[0] % parameters[1]
-
-    # def DIV(self, parameters):
-    #     # DIV(ThisNum : INTEGER, ThisDiv : INTEGER) RETURNS INTEGER
-    #     if self.check_function('DIV', parameters, 2, [int, int]):
-    #         return parameters[0] // parameters[1]
-
-    def LCASE(self, parameters):
-        # LCASE(x : CHAR) RETURNS CHAR
-        if self.check_function('LCASE', parameters, 1, [str]) and self.check_char(parameters[0]):
-            return parameters[0].lower()
-
-    def UCASE(self, parameters):
-        # UCASE (x : CHAR) RETURNS CHAR
-        if self.check_function('UCASE', parameters, 1, [str]) and self.check_char(parameters[0]):
-            return parameters[0].upper()
-
-    def TONUM(self, parameters):
-        # TONUM(ThisDigit : CHAR) RETURNS INTEGER
-        if self.check_function('TONUM', parameters, 1, [str] and self.check_char(parameters[0])):
-            if parameters[0].isnum():
-                return int(parameters[0])
-            else:
-                raise ValueError('Cannot parse' +
-                                 str(parameters[0]) + ' to INTEGER')
-
-    def STR(self, parameters):
-        # STR(ThisNumber : INTEGER or REAL) RETURNS STRING
-        if self.check_function('STR', parameters, 1, [(int, float)]):
-            return str(parameters[0])
-
-    def ONECHAR(self, parameters):
-        # ONECHAR(ThisString : STRING, Position: INTEGER) RETURNS CHAR
-        if self.check_function('ONECHAR', parameters, 2, [str, int]):
-            return parameters[0][parameters[1] - 1]
-
-    def EOF(self, parameters):
-        if self.check_function('EOF', parameters, 1, [str]):
-            file = self.CURRENT_SCOPE.VALUES.get(parameters[0])
-            if file != None:
-                back = file.tell()
-                line = file.readline()
-                file.seek(back)
-                if len(line) > 0:
-                    return False
-                else:
-                    return True
-            else:
-                FileNotFoundError(parameters[0])
-
-    # ----------------------------------------
-    # LEGACY FUNCTIONS
-    # ----------------------------------------
-
-    def SUBSTR(self, parameters):
-        self.MID(parameters)
-
-    def CHARACTERCOUNT(self, parameters):
-        self.LENGTH(parameters)
+    """A built-in function, with its signature worked out once when it is registered"""
+
+    def __init__(self, name, function, parameters, return_type, variadic=False, interpreter=False):
+        """Initializes a built-in function
+
+        Arguments:
+            name {str} -- The name used to call the function in pseudocode
+            function {function} -- The python function, called with the value of every parameter
+            parameters {list{str/tuple{str}}} -- The data type(s) allowed for every parameter
+            return_type {str} -- The data type of the value returned
+
+        Keyword Arguments:
+            variadic {bool} -- Whether the last parameter can be repeated (default: {False})
+            interpreter {bool} -- Whether the Interpreter is passed in before the parameters (default: {False})
+        """
+        self.name = name
+        self.function = function
+        self.return_type = return_type
+        self.variadic = variadic
+        self.interpreter = interpreter
+        self.count = len(parameters)
+
+        self.types = []
+        self.chars = []
+        for i in range(0, len(parameters)):
+            data_types = parameters[i] if isinstance(parameters[i], tuple) else (parameters[i],)
+            self.types.append(tuple(PARAMETER_TYPES[data_type] for data_type in data_types))
+
+            if data_types == ('CHAR',):
+                self.chars.append(i)
+
+    def check_count(self, count):
+        """Checks the number of parameters passed into the function
+
+        Arguments:
+            count {int} -- The number of parameters
+
+        Returns:
+            str -- The error to show if the count is wrong, None otherwise
+        """
+        if self.variadic:
+            if count < self.count:
+                return 'Expected {} or more parameters. Got {} parameter(s)'.format(self.count, count)
+        elif count != self.count:
+            return 'Expected {} parameter(s). Got {} parameter(s)'.format(self.count, count)
+
+    def call(self, interpreter, parameters):
+        """Checks the parameters against the signature and calls the function
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter making the call
+            parameters {list} -- The value of every parameter
+
+        Returns:
+            int, str, float, bool -- The value returned by the function
+        """
+        types = self.types
+        if self.variadic and len(parameters) > self.count:
+            types = types + [types[-1]] * (len(parameters) - self.count)
+
+        for parameter, data_types in zip(parameters, types):
+            if not isinstance(parameter, data_types):
+                self.parameter_error(parameters, types)
+
+        for i in self.chars:
+            if len(parameters[i]) != 1:
+                Error().type_error(self.name + ': Parameter ' + str(i + 1) + ' must be a CHAR')
+
+        if self.interpreter:
+            return self.function(interpreter, *parameters)
+
+        return self.function(*parameters)
+
+    def parameter_error(self, parameters, types):
+        """Raises a type error for the first parameter that does not match the signature
+
+        Arguments:
+            parameters {list} -- The value of every parameter
+            types {list{tuple{type}}} -- The python types allowed for every parameter
+        """
+        for i in range(0, len(parameters)):
+            if not isinstance(parameters[i], types[i]):
+                Error().type_error(self.name + ': Parameter ' + str(i + 1))
+
+
+def register_builtin(name, parameters, return_type, function, variadic=False, interpreter=False):
+    """Registers a python function as a built-in function. The Lexer, Analyzer and Interpreter pick it up from
+    BUILTIN_FUNCTIONS, and it is called exactly like the built-in functions defined here
+
+    Arguments:
+        name {str} -- The name used to call the function in pseudocode
+        parameters {list{str/tuple{str}}} -- The data type(s) allowed for every parameter
+        return_type {str} -- The data type of the value returned
+        function {function} -- The python function, called with the value of every parameter
+
+    Keyword Arguments:
+        variadic {bool} -- Whether the last parameter can be repeated (default: {False})
+        interpreter {bool} -- Whether the Interpreter is passed in before the parameters (default: {False})
+
+    Returns:
+        BuiltInFunction -- The registered built-in function
+    """
+    if not name.isalnum() or not name[0].isalpha() or Lexer.is_reserved(name):
+        Error().name_error('{} cannot be used as the name of a built-in function'.format(name))
+
+    for parameter in parameters:
+        for data_type in (parameter if isinstance(parameter, tuple) else (parameter,)):
+            if data_type not in PARAMETER_TYPES:
+                Error().type_error('{}: {} is not a data type'.format(name, data_type))
+
+    BUILTIN_FUNCTIONS[name] = BuiltInFunction(name, function, parameters, return_type, variadic, interpreter)
+
+    if name not in Lexer.tokens['BUILTIN_FUNCTION']:
+        Lexer.tokens['BUILTIN_FUNCTION'].append(name)
+
+    return BUILTIN_FUNCTIONS[name]
+
+
+def builtin(name, parameters, return_type, variadic=False, interpreter=False):
+    """Registers the decorated python function as a built-in function (see register_builtin())
+
+    Arguments:
+        name {str} -- The name used to call the function in pseudocode
+        parameters {list{str/tuple{str}}} -- The data type(s) allowed for every parameter
+        return_type {str} -- The data type of the value returned
+
+    Keyword Arguments:
+        variadic {bool} -- Whether the last parameter can be repeated (default: {False})
+        interpreter {bool} -- Whether the Interpreter is passed in before the parameters (default: {False})
+    """
+    def register(function):
+        register_builtin(name, parameters, return_type, function, variadic, interpreter)
+        return function
+
+    return register
+
+
+def load_plugins(group=PLUGIN_GROUP):
+    """Loads the built-in functions of every installed package with an entry point in group
+
+    An entry point names either a module that registers its functions with @builtin when imported, or a
+    function that is called with no arguments and registers them with register_builtin()
+
+    Keyword Arguments:
+        group {str} -- The entry point group to load (default: {PLUGIN_GROUP})
+
+    Returns:
+        list{str} -- The names of the entry points loaded
+    """
+    try:
+        plugins = entry_points(group=group)
+    except TypeError:
+        # Python 3.9 and older return every group in a dict
+        plugins = entry_points().get(group, [])
+
+    loaded = []
+    for plugin in plugins:
+        register = plugin.load()
+        if callable(register):
+            register()
+
+        loaded.append(plugin.name)
+
+    return loaded
+
+
+@builtin('CHR', ['INTEGER'], 'CHAR')
+def CHR(x):
+    return chr(x)
+
+
+@builtin('ASC', ['CHAR'], 'INTEGER')
+def ASC(this_char):
+    return ord(this_char)
+
+
+@builtin('LENGTH', ['STRING'], 'INTEGER')
+def LENGTH(this_string):
+    return len(this_string)
+
+
+@builtin('LEFT', ['STRING', 'INTEGER'], 'STRING')
+def LEFT(this_string, x):
+    return this_string[0:x]
+
+
+@builtin('RIGHT', ['STRING', 'INTEGER'], 'STRING')
+def RIGHT(this_string, x):
+    return this_string[-x:]
+
+
+@builtin('MID', ['STRING', 'INTEGER', 'INTEGER'], 'STRING')
+def MID(this_string, x, y):
+    return this_string[x:x + y]
+
+
+@builtin('CONCAT', ['STRING', 'STRING'], 'STRING', variadic=True)
+def CONCAT(*strings):
+    return ''.join(strings)
+
+
+@builtin('INT', ['REAL'], 'INTEGER')
+def INT(x):
+    return int(x)
+
+# FIXME October 25, 2019: Causing problems with operations DIV and MOD
+
+# @builtin('MOD', ['INTEGER', 'INTEGER'], 'INTEGER')
+# def MOD(this_num, this_div):
+#     return this_num % this_div
+
+# @builtin('DIV', ['INTEGER', 'INTEGER'], 'INTEGER')
+# def DIV(this_num, this_div):
+#     return this_num // this_div
+
+
+@builtin('LCASE', ['CHAR'], 'CHAR')
+def LCASE(x):
+    return x.lower()
+
+
+@builtin('UCASE', ['CHAR'], 'CHAR')
+def UCASE(x):
+    return x.upper()
+
+
+@builtin('TONUM', ['CHAR'], 'INTEGER')
+def TONUM(this_digit):
+    if this_digit.isdigit():
+        return int(this_digit)
+    else:
+        raise ValueError('Cannot parse ' + this_digit + ' to INTEGER')
+
+
+@builtin('STR', [('INTEGER', 'REAL')], 'STRING')
+def STR(this_number):
+    return str(this_number)
+
+
+@builtin('ONECHAR', ['STRING', 'INTEGER'], 'CHAR')
+def ONECHAR(this_string, position):
+    return this_string[position - 1]
+
+
+@builtin('EOF', ['STRING'], 'BOOLEAN', interpreter=True)
+def EOF(interpreter, file_name):
+    return interpreter.FILES.get(file_name).eof()
+
+# ----------------------------------------
+# LEGACY FUNCTIONS
+# ----------------------------------------
+
+
+register_builtin('SUBSTR', ['STRING', 'INTEGER', 'INTEGER'], 'STRING', MID)
+register_builtin('CHARACTERCOUNT', ['STRING'], 'INTEGER', LENGTH)
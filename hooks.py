@@ -0,0 +1,399 @@
+from ast_module import ElementValue, TypeValue
+from error import Error
+from helperclass import ArrayAssignment, TypeAssignment
+from scope import Scope
+import sys
+
+# The events callbacks can be added for
+EVENTS = ('statement', 'call', 'return', 'write', 'input', 'output', 'file')
+
+
+class Hooks():
+    """Callbacks run by an Interpreter as a program runs. Pass them in as Interpreter(hooks=...)
+
+    The events, and what their callbacks are called with:
+        statement(line_number) -- before every statement runs
+        call(name, arguments) -- when a procedure or function is entered, with the value of every parameter
+        return(name, value) -- when a procedure or function returns, with the value returned (None for a procedure)
+        write(target, value) -- when a variable, element or field is assigned to, for example 'x', 'a[1, 2]' or
+            'p.x'. Declarations are not writes. Reading into a variable with INPUT or READFILE is a write, as is
+            every element READFILE reads into an array and every record read by GETRECORD
+        input(line) -- when INPUT reads a line
+        output(line) -- for every line written by OUTPUT (and by the prompts of INPUT when stdin is given)
+        file(operation, name, data) -- when a file is opened ('open', with the mode), closed ('close', None), read
+            ('read', the line or lines), written ('write', the line or lines), seeked ('seek', the address) or when
+            a record is read ('get_record', its values) or written ('put_record', the record)
+
+    The Interpreter only runs through the code of the events that have callbacks, so an Interpreter without Hooks,
+    or with Hooks for some events only, runs the rest of the program exactly as before. Callbacks must be added
+    before the Interpreter is made
+    """
+
+    def __init__(self):
+        """Initializes Hooks without any callbacks"""
+        self.callbacks = {event: [] for event in EVENTS}
+        self.writes = 0
+        self.outputs = []
+
+    def add(self, event, callback):
+        """Adds a callback for an event
+
+        Arguments:
+            event {str} -- One of EVENTS
+            callback {function} -- Called with the arguments of the event
+
+        Returns:
+            function -- The callback
+        """
+        if event not in self.callbacks:
+            Error().name_error('{} is not an event. The events are {}'.format(event, ', '.join(EVENTS)))
+
+        self.callbacks[event].append(callback)
+        return callback
+
+    def on(self, event):
+        """Adds the decorated function as a callback for an event (see add())
+
+        Arguments:
+            event {str} -- One of EVENTS
+        """
+        def add(callback):
+            return self.add(event, callback)
+
+        return add
+
+    def install(self, interpreter):
+        """Makes an Interpreter run the callbacks
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to hook into
+        """
+        if self.callbacks['statement']:
+            self.install_statements(interpreter)
+
+        if self.callbacks['call'] or self.callbacks['return']:
+            self.install_calls(interpreter)
+
+        if self.callbacks['write']:
+            self.install_writes(interpreter)
+
+        if self.callbacks['input']:
+            self.install_input(interpreter)
+
+        if self.callbacks['output']:
+            output = HookedOutput(interpreter.STDOUT, self.callbacks['output'])
+            self.outputs.append(output)
+            interpreter.STDOUT = output
+
+        if self.callbacks['file']:
+            self.install_files(interpreter)
+
+    def stop(self):
+        """Runs the output callbacks for the last line, if it was written without a line break"""
+        for output in self.outputs:
+            output.finish()
+
+    def install_statements(self, interpreter):
+        """Runs the statement callbacks before every statement
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to hook into
+        """
+        visit_statement = interpreter.visit_Statement
+        callbacks = self.callbacks['statement']
+
+        def visit_Statement(node):
+            for callback in callbacks:
+                callback(node.line_number)
+
+            return visit_statement(node)
+
+        # Found by Interpreter.visit() before the method of the class
+        interpreter.visit_Statement = visit_Statement
+
+    def install_calls(self, interpreter):
+        """Runs the call and return callbacks around the block of every procedure and function
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to hook into
+        """
+        visit_function = interpreter.visit_Function
+        visit_block = interpreter.visit_Block
+        calls = self.callbacks['call']
+        returns = self.callbacks['return']
+
+        # The name of every procedure and function, by its block
+        names = {}
+
+        def visit_Function(node):
+            visit_function(node)
+            names[node.block] = interpreter.visit(node.name)
+
+        def visit_Block(node):
+            name = names.get(node)
+            if name is None:
+                return visit_block(node)
+
+            # The parameters are bound by the time the block of the call is run
+            scope = interpreter.CURRENT_SCOPE
+            arguments = [scope.get(parameter) for _, parameter, _ in scope.parameters]
+            for callback in calls:
+                callback(name, arguments)
+
+            value = visit_block(node)
+            for callback in returns:
+                callback(name, value)
+
+            return value
+
+        interpreter.visit_Function = visit_Function
+        interpreter.visit_Block = visit_Block
+
+    def install_writes(self, interpreter):
+        """Runs the write callbacks for every assignment, by giving every Scope of the Interpreter an assign() that
+        runs them. The scopes of calls are copies, which keep it
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to hook into
+        """
+        callbacks = self.callbacks['write']
+        hooks = self
+
+        def assign(scope, variable_name, *data):
+            # Declaring a variable assigns its first instance, which is not a write
+            declaring = type(variable_name) is str and scope.VALUES.get(variable_name) is None
+            Scope.assign(scope, variable_name, *data)
+            if declaring:
+                return
+
+            hooks.writes += 1
+            target = target_name(variable_name)
+            for callback in callbacks:
+                callback(target, data[0])
+
+        hooked_scope = type('HookedScope', (Scope,), {'assign': assign})
+        for scope in interpreter.SCOPES.values():
+            scope.__class__ = hooked_scope
+
+        visit_function = interpreter.visit_Function
+        visit_string_append = interpreter.visit_StringAppend
+        read_array = interpreter.read_array
+        visit_get_record = interpreter.visit_GetRecord
+
+        def visit_Function(node):
+            visit_function(node)
+            interpreter.SCOPES[interpreter.visit(node.name)].__class__ = hooked_scope
+
+        def visit_StringAppend(node):
+            writes = hooks.writes
+            visit_string_append(node)
+
+            # Appending to a STRING does not go through assign(), unless it falls back to an Assignment
+            if hooks.writes == writes:
+                name = node.variable.value
+                value = interpreter.CURRENT_SCOPE.get(name)
+                for callback in callbacks:
+                    callback(name, value)
+
+        def hooked_read_array(file, name, metadata, node):
+            # The elements are stored in one go rather than assigned one by one
+            first, elements = read_array(file, name, metadata, node)
+            hooks.writes += len(elements)
+            for index, value in enumerate(elements, first):
+                target = '{}[{}]'.format(name, index)
+                for callback in callbacks:
+                    callback(target, value)
+
+            return first, elements
+
+        def visit_GetRecord(node):
+            writes = hooks.writes
+            visit_get_record(node)
+
+            # The record is assigned to in place, without going through assign()
+            if hooks.writes == writes:
+                hooks.writes += 1
+                target = reference_name(interpreter, node.variable)
+                value = interpreter.visit(node.variable)
+                for callback in callbacks:
+                    callback(target, value)
+
+        interpreter.visit_Function = visit_Function
+        interpreter.visit_StringAppend = visit_StringAppend
+        interpreter.read_array = hooked_read_array
+        interpreter.visit_GetRecord = visit_GetRecord
+
+    def install_input(self, interpreter):
+        """Runs the input callbacks for every line read by INPUT
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to hook into
+        """
+        read_input = interpreter.read_input
+        callbacks = self.callbacks['input']
+
+        def hooked_read_input(prompt):
+            line = read_input(prompt)
+            for callback in callbacks:
+                callback(line)
+
+            return line
+
+        interpreter.read_input = hooked_read_input
+
+    def install_files(self, interpreter):
+        """Runs the file callbacks for every file opened, closed, read or written
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to hook into
+        """
+        files = interpreter.FILES
+        open_file = files.open
+        close_file = files.close
+        get_file = files.get
+        callbacks = self.callbacks['file']
+
+        def open(name, mode):
+            handle = open_file(name, mode)
+            for callback in callbacks:
+                callback('open', name, mode)
+
+            return HookedFile(handle, name, callbacks)
+
+        def close(name):
+            close_file(name)
+            for callback in callbacks:
+                callback('close', name, None)
+
+        def get(name):
+            return HookedFile(get_file(name), name, callbacks)
+
+        files.open = open
+        files.close = close
+        files.get = get
+
+
+def reference_name(interpreter, node):
+    """Writes an instance passed by reference the way it is written in pseudocode
+
+    Arguments:
+        interpreter {Interpreter} -- The Interpreter running the statement
+        node {VariableValue/ElementValue/TypeValue} -- The instance
+
+    Returns:
+        str -- The name of the variable, with the indexes or field referred to
+    """
+    if isinstance(node, ElementValue):
+        return '{}[{}]'.format(node.value, ', '.join(str(interpreter.visit(index)) for index in node.indexes))
+    elif isinstance(node, TypeValue):
+        return '{}.{}'.format(reference_name(interpreter, node.object_name), interpreter.visit(node.field_name))
+
+    return node.value
+
+
+def target_name(target):
+    """Writes the target of an assignment the way it is written in pseudocode
+
+    Arguments:
+        target {str/ArrayAssignment/TypeAssignment} -- The target, as passed to Scope.assign()
+
+    Returns:
+        str -- The name of the variable, with the indexes or field assigned to
+    """
+    if isinstance(target, ArrayAssignment):
+        return '{}[{}]'.format(target.name, ', '.join(str(index) for index in target.indexes))
+    elif isinstance(target, TypeAssignment):
+        return '{}.{}'.format(target_name(target.name), target.field)
+
+    return target
+
+
+class HookedOutput():
+    """Writes to the stdout of an Interpreter, running the output callbacks for every line written"""
+
+    def __init__(self, stream, callbacks):
+        """Initializes the output of a hooked Interpreter
+
+        Arguments:
+            stream {file} -- Where the output is written, or None for the console
+            callbacks {list{function}} -- The output callbacks
+        """
+        self.stream = stream
+        self.callbacks = callbacks
+        self.line = ''
+
+    def write(self, text):
+        (self.stream if self.stream is not None else sys.stdout).write(text)
+
+        self.line += text
+        if '\n' in self.line:
+            lines = self.line.split('\n')
+            self.line = lines.pop()
+            for line in lines:
+                for callback in self.callbacks:
+                    callback(line)
+
+    def flush(self):
+        (self.stream if self.stream is not None else sys.stdout).flush()
+
+    def finish(self):
+        """Runs the output callbacks for the last line, if it was written without a line break"""
+        if self.line:
+            line = self.line
+            self.line = ''
+            for callback in self.callbacks:
+                callback(line)
+
+
+class HookedFile():
+    """An open file that runs the file callbacks for every read and write"""
+
+    def __init__(self, handle, name, callbacks):
+        """Initializes a hooked file
+
+        Arguments:
+            handle {FileHandle} -- The open file
+            name {str} -- The name of the file
+            callbacks {list{function}} -- The file callbacks
+        """
+        self.handle = handle
+        self.name = name
+        self.callbacks = callbacks
+
+    def __getattr__(self, name):
+        return getattr(self.handle, name)
+
+    def report(self, operation, data):
+        for callback in self.callbacks:
+            callback(operation, self.name, data)
+
+    def read_line(self):
+        line = self.handle.read_line()
+        self.report('read', line)
+        return line
+
+    def read_lines(self, count):
+        lines = self.handle.read_lines(count)
+        self.report('read', lines)
+        return lines
+
+    def write_line(self, line):
+        self.handle.write_line(line)
+        self.report('write', line)
+
+    def write_lines(self, lines):
+        self.handle.write_lines(lines)
+        self.report('write', lines)
+
+    def seek(self, address):
+        self.handle.seek(address)
+        self.report('seek', address)
+
+    def get_record(self, record_class):
+        values = self.handle.get_record(record_class)
+        self.report('get_record', values)
+        return values
+
+    def put_record(self, record):
+        self.handle.put_record(record)
+        self.report('put_record', record)
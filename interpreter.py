@@ -1,22 +1,105 @@
-from function import BuiltInFunction
 from scope import *
 from error import Error
 from data_types import *
 from copy import deepcopy
 from helperclass import *
+from ast_module import ElementValue, TypeValue, VariableValue
+from file_handler import BUFFER_SIZE, LINE_TYPES, FileTable
 
 
 class Interpreter():
     """After the code has been sent to AST classes by analyzer.py, it comes here to be interpreted into python
     """
 
-    def __init__(self, analyzer):
+    def __init__(self, analyzer=None, buffer_size=BUFFER_SIZE, memory_map=False, write_behind=False, stdin=None, stdout=None,
+                 limits=None, profiler=None, hooks=None, memory=None, debugger=None,
+                 checkpointer=None, directory=None):
+        """Initializes an Interpreter, running the code of analyzer straight away if it is given
+
+        Keyword Arguments:
+            analyzer {Analyzer} -- The Analyzer of the code to run, or None to run a tree later with execute() (default: {None})
+            buffer_size {int} -- The buffer size (in bytes) of every file opened (default: {BUFFER_SIZE})
+            memory_map {bool} -- Whether files opened for READ are read through mmap (default: {False})
+            write_behind {bool} -- Whether files opened for WRITE or APPEND are written by a thread (default: {False})
+            stdin {file} -- Where INPUT reads lines from, or None for the console (default: {None})
+            stdout {file} -- Where OUTPUT and the prompts of INPUT are written, or None for the console (default: {None})
+            limits {Limits} -- The limits the program is run with, or None to run it without limits (default: {None})
+            profiler {Profiler} -- The Profiler that times the program, or None to run it without one (default: {None})
+            hooks {Hooks} -- The callbacks run as the program runs, or None to run it without any (default: {None})
+            memory {MemoryReport} -- The MemoryReport that accounts for the declarations of the program, or None (default: {None})
+            debugger {Debugger} -- The Debugger the program is run under, or None to run it without one (default: {None})
+            checkpointer {Checkpointer} -- The Checkpointer that saves the state of the program, or None (default: {None})
+            directory {str} -- The directory files are opened in, or None for the working directory (default: {None})
+        """
         self.SCOPES = {}
         self.CURRENT_SCOPE = self.SCOPES['GLOBAL'] = Scope()
+        self.FILES = FileTable(buffer_size, memory_map, write_behind, directory)
+        self.STDIN = stdin
+        self.STDOUT = stdout
+        self.LIMITS = limits
+        self.PROFILER = profiler
+        self.HOOKS = hooks
+        self.MEMORY = memory
+        self.DEBUGGER = debugger
+        self.CHECKPOINTER = checkpointer
 
-        tree = analyzer.block(['EOF'])
-        self.visit(tree)
-        pass
+        if limits is not None:
+            limits.install(self)
+
+        if profiler is not None:
+            profiler.install(self)
+
+        if hooks is not None:
+            hooks.install(self)
+
+        if memory is not None:
+            memory.install(self)
+
+        if debugger is not None:
+            debugger.install(self)
+
+        if checkpointer is not None:
+            checkpointer.install(self)
+
+        if analyzer is not None:
+            self.execute(analyzer.block(['EOF']))
+
+    def execute(self, tree, close_files=True):
+        """Runs the tree made by Analyzer.block(). Can be called again with more trees, which see everything the
+        earlier trees declared
+
+        Arguments:
+            tree {Block} -- The statements of the program
+
+        Keyword Arguments:
+            close_files {bool} -- Whether the files left open are closed once the tree has run (default: {True})
+        """
+        if self.LIMITS is not None:
+            self.LIMITS.start()
+
+        if self.PROFILER is not None:
+            self.PROFILER.start()
+
+        try:
+            self.visit(tree)
+        except MemoryError:
+            if self.LIMITS is None:
+                raise
+
+            self.LIMITS.out_of_memory()
+        finally:
+            if self.LIMITS is not None:
+                self.LIMITS.stop()
+
+            if self.PROFILER is not None:
+                self.PROFILER.stop()
+
+            if self.HOOKS is not None:
+                self.HOOKS.stop()
+
+            # Files are closed even if the program stops with an error
+            if close_files:
+                self.FILES.close_all()
 
     def visit(self, node):
         method_name = 'visit_' + type(node).__name__
@@ -26,12 +109,6 @@ class Interpreter():
     def visit_error(self, node):
         Error().exception('No visit_{} method'.format(type(node).__name__))
 
-    def visit_function(self, node):
-        method_name = node.name.value
-        visitor = getattr(BuiltInFunction(self.CURRENT_SCOPE),
-                          method_name, self.visit_error)
-        return visitor(node.parsed_parameters)
-
     def visit_Block(self, node):
         for statement in node.block:
             node = self.visit(statement)
@@ -107,6 +184,9 @@ class Interpreter():
         name = self.visit(declaration.variable)
         metadata = self.visit(declaration.data_type)
 
+        if self.LIMITS is not None and isinstance(metadata, ArrayType):
+            self.LIMITS.check_array(name, metadata)
+
         self.CURRENT_SCOPE.declare(name, metadata)
         self.CURRENT_SCOPE.assign(name, metadata.declare())
 
@@ -114,9 +194,9 @@ class Interpreter():
         data_type = data_type.value
 
         if data_type in self.CURRENT_SCOPE.DATA_TYPES.keys():
-            return VariableType(data_type, default=Variable(None))
+            return VariableType(data_type)
         elif data_type in self.CURRENT_SCOPE.USER_DEFINED_DATA_TYPES.keys():
-            return TypeType(self.CURRENT_SCOPE.USER_DEFINED_DATA_TYPES[data_type].SYMBOL_TABLE.SYMBOL_TABLE, data_type)
+            return TypeType(self.CURRENT_SCOPE.USER_DEFINED_DATA_TYPES[data_type], data_type)
         else:
             Error().type_error('TYPE {} has not been initialized'.format(data_type))
 
@@ -128,6 +208,9 @@ class Interpreter():
         data_type = self.visit(node.data_type)
         dimensions = self.visit(node.dimensions)
 
+        if isinstance(data_type, TypeType):
+            return ArrayType(dimensions, data_type.data_type, record=data_type.record)
+
         return ArrayType(dimensions, data_type.data_type, default=data_type.default)
 
     def visit_Dimensions(self, dimensions):
@@ -157,25 +240,23 @@ class Interpreter():
     def visit_TypeDeclaration(self, node):
         type_name = self.visit(node.type_name)
 
-        # Creates a new scope with the TYPE name
-        self.SCOPES[type_name] = scope = Scope(self.CURRENT_SCOPE, node.block)
+        # Creates a new scope for the fields of TYPE
+        scope = Scope(self.CURRENT_SCOPE, node.block)
 
         # Scopes into TYPE
-        scope.PARENT_SCOPE = self.CURRENT_SCOPE
         self.CURRENT_SCOPE = scope
         self.PARENT_SCOPE = scope.PARENT_SCOPE
 
-        self.visit(scope.block)
-
-        # Gets all the declarations within TYPE
-        children = {'SYMBOL_TABLE': self.CURRENT_SCOPE.SYMBOL_TABLE}
-
-        # Scopes out of TYPE
-        self.CURRENT_SCOPE = self.CURRENT_SCOPE.PARENT_SCOPE
-        self.PARENT_SCOPE = self.CURRENT_SCOPE.PARENT_SCOPE
+        try:
+            self.visit(scope.block)
+        finally:
+            # Scopes out of TYPE, even if a field cannot be declared
+            self.CURRENT_SCOPE = scope.PARENT_SCOPE
+            self.PARENT_SCOPE = self.CURRENT_SCOPE.PARENT_SCOPE
 
-        self.CURRENT_SCOPE.USER_DEFINED_DATA_TYPES[type_name] = type(
-            type_name, (), children)
+        # Compiles the declarations within TYPE into a class with one slot per field
+        self.CURRENT_SCOPE.USER_DEFINED_DATA_TYPES[type_name] = make_record(
+            type_name, scope.SYMBOL_TABLE.SYMBOL_TABLE)
 
     # END: Type Declaration
 
@@ -187,6 +268,23 @@ class Interpreter():
 
         self.CURRENT_SCOPE.assign(name, value)
 
+    def visit_StringAppend(self, node):
+        variable = self.CURRENT_SCOPE.VALUES.get(node.variable.value)
+
+        # Anything other than an assigned STRING is assigned to as usual
+        if not isinstance(variable, StringVariable) or (variable.parts is None and type(variable.string) is not str):
+            return self.visit_Assignment(node)
+
+        parts = []
+        for part in node.parts:
+            parts.append(self.visit(part))
+
+        for i in range(0, len(parts)):
+            if type(parts[i]) is not str:
+                Error().type_error('Cannot append {} to STRING {}'.format(parts[i], node.variable.value))
+
+        variable.append(parts)
+
     def visit_VariableName(self, node):
         name = node.value
         return name
@@ -218,17 +316,9 @@ class Interpreter():
 
 
         if self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name) is None:
-            raise Error().name_error(name)
-        else:
-            try:
-                value = self.CURRENT_SCOPE.get(name)
-                for index in indexes:
-                    value = value.get(index)
-
-                return value
-            except:
-                raise Error().index_error(name)
+            Error().name_error(name)
 
+        return self.CURRENT_SCOPE.VALUES[name].get(indexes)
 
     def visit_Index(self, node):
         return self.visit(node.index)
@@ -252,13 +342,25 @@ class Interpreter():
         return TypeAssignment(name, field)
 
     def visit_TypeValue(self, node):
-        name = self.visit(node.object_name)
         field_name = self.visit(node.field_name)
 
-        try:
-            return self.CURRENT_SCOPE.get(name)[field_name].value
-        except:
-            Error().name_error('{}.{}'.format(name, field_name))
+        if isinstance(node.object_name, ElementValue):
+            array = self.CURRENT_SCOPE.VALUES.get(node.object_name.value)
+
+            if isinstance(array, RecordArray):
+                # Reads the column of the field directly
+                indexes = []
+                for index in node.object_name.indexes:
+                    indexes.append(self.visit(index))
+
+                return array.get_field(indexes, field_name)
+
+        record = self.visit(node.object_name)
+
+        if not isinstance(record, (Record, RecordView)):
+            Error().type_error('{} is not a TYPE'.format(node.object_name.value))
+
+        return record.get(field_name)
 
     # END: Type Assignment
 
@@ -266,19 +368,33 @@ class Interpreter():
 
     def visit_Input(self, node):
         name = self.visit(node.variable)
-        value = input(node.input_string)
+        value = self.read_input(node.input_string)
 
-        if type(name) is not list:
-            data_type = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name).data_type
-            value = self.try_type(data_type, value, name)
-            self.CURRENT_SCOPE.assign(name, value)
-        else:
-            data_type = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name[0]).data_type
-            value = self.try_type(data_type, value, name)
-            dimensions = name[1]
-            name = name[0]
+        metadata = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name.name if isinstance(name, ArrayAssignment) else name)
+        if metadata is None:
+            Error().name_error(name.name if isinstance(name, ArrayAssignment) else name)
+
+        value = self.try_type(metadata.data_type, value, name)
+        self.CURRENT_SCOPE.assign(name, value)
+
+    def read_input(self, prompt):
+        """Shows the prompt and reads a line from the console, or from stdin when one was given
+
+        Arguments:
+            prompt {str} -- The text shown before reading
 
-            self.CURRENT_SCOPE.assign(name, value, dimensions)
+        Returns:
+            str -- The line read, without its line break
+        """
+        if self.STDIN is None:
+            return input(prompt)
+
+        print(prompt, end='', file=self.STDOUT)
+        line = self.STDIN.readline()
+        if not line:
+            Error().eof_error('No input left to read')
+
+        return line[:-1] if line[-1] == '\n' else line
 
     # END: Input
 
@@ -288,8 +404,8 @@ class Interpreter():
         output = self.visit(node.output)
         if output is not None:
             if isinstance(output, Variable):
-                print(output.value)
-            print(output)
+                print(output.value, file=self.STDOUT)
+            print(output, file=self.STDOUT)
 
     # END: Output
 
@@ -410,68 +526,84 @@ class Interpreter():
         for parameter in node.parameters:
             parameters.append(self.visit(parameter))
 
-        node.parsed_parameters = parameters
-
-        return self.visit_function(node)
+        return node.function.call(self, parameters)
 
     # END: Built-in Function
 
     # START: Procedure/Function
 
     def visit_FunctionCall(self, node):
-        name = self.visit(node.name)
-        scope = deepcopy(self.SCOPES.get(name))
+        routine = self.visit(node.name)
+        scope = self.call_scope(routine)
 
         if scope != None:
-            parameters = []
-            for parameter in node.parameters:
-                parameters.append(self.visit(parameter))
+            if len(node.parameters) != len(scope.parameters):
+                raise SyntaxError('Expected ' + str(len(scope.parameters)) + ' parameter(s).' + ' Got ' + str(len(node.parameters)) + ' parameter(s)')
 
-            scope.PARENT_SCOPE = self.CURRENT_SCOPE
+            # BYVAL parameters are evaluated, BYREF parameters are bound to the instance itself
+            parameters = []
+            for i in range(0, len(node.parameters)):
+                reference_type, name, data_type = scope.parameters[i]
+                if reference_type == 'BYREF':
+                    parameters.append(self.reference(node.parameters[i]))
+
+                    # The instance is shared with the procedure/function, so it must be of the type it expects
+                    expected = self.instance_type(scope.SYMBOL_TABLE.lookup(name), data_type)
+                    passed = self.argument_type(node.parameters[i])
+                    if passed != expected:
+                        Error().type_error('{} cannot be passed into BYREF {} : {} of {}'.format(
+                            passed, name, expected, routine))
+                else:
+                    parameters.append(self.visit(node.parameters[i]))
+
+            caller = self.CURRENT_SCOPE
+            scope.PARENT_SCOPE = caller
             self.CURRENT_SCOPE = scope
             self.PARENT_SCOPE = self.CURRENT_SCOPE.PARENT_SCOPE
 
-            if len(parameters) == len(self.CURRENT_SCOPE.parameters):
+            return_value = None
+            try:
                 for i in range(0, len(parameters)):
-                    value = parameters[i]
-                    reference_type = self.CURRENT_SCOPE.parameters[i][0]
-                    name = self.CURRENT_SCOPE.parameters[i][1]
+                    reference_type, name, _ = self.CURRENT_SCOPE.parameters[i]
 
                     if reference_type == 'BYREF':
-                        try:
-                            referee_name = node.parameters[i].value
-                        except:
-                            Error().reference_error('A variable must be passed into BYREF')
-
-                        self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name).referee_name = referee_name
-
-                    metadata = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name)
-                    self.check_type(metadata.data_type, value, name)
-                    self.CURRENT_SCOPE.assign(name, parameters[i])
+                        # The parameter shares the instance, so every assignment to it is seen by the caller
+                        self.CURRENT_SCOPE.VALUES[name] = parameters[i]
+                    else:
+                        metadata = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name)
+                        self.check_type(metadata.data_type, parameters[i], name)
+                        self.CURRENT_SCOPE.assign(name, parameters[i])
 
                 return_value = self.visit(self.CURRENT_SCOPE.block)
+            finally:
+                # The caller is the current scope again even if the call stops with an error
+                self.CURRENT_SCOPE = caller
+                self.PARENT_SCOPE = caller.PARENT_SCOPE
 
-                for parameter in self.CURRENT_SCOPE.parameters:
-                    reference_type = parameter[0]
-                    name = parameter[1]
+                # Instances passed BYREF belong to the caller and must outlive this scope
+                for reference_type, name, _ in scope.parameters:
                     if reference_type == 'BYREF':
-                        current_value = self.CURRENT_SCOPE.VALUES.get(name).value
+                        scope.VALUES.pop(name, None)
 
-                        referee_name = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name).referee_name
+                # An array returned is still used by the caller, so it keeps its share of the data
+                scope.clear(keep=return_value)
 
-                        self.CURRENT_SCOPE.PARENT_SCOPE.assign(referee_name, current_value)
+            if scope.return_type != None:
+                self.check_type(scope.return_type, return_value, routine)
+                return return_value
+        else:
+            Error().name_error('{} does not exist'.format(routine))
 
-                self.CURRENT_SCOPE = self.CURRENT_SCOPE.PARENT_SCOPE
-                self.PARENT_SCOPE = self.CURRENT_SCOPE.PARENT_SCOPE
+    def call_scope(self, name):
+        """Copies the scope of a procedure or function for one call to it
 
-                if scope.return_type != None:
-                    self.check_type(scope.return_type, return_value, name)
-                    return return_value
+        Arguments:
+            name {str} -- The name of the procedure or function
 
-            else:
-                raise SyntaxError('Expected ' + str(len(self.CURRENT_SCOPE.parameters)) + ' parameter(s).' + ' Got ' + str(len(parameters)) + ' parameter(s)')
-        else:
-            Error().name_error('{} does not exist'.format(name))
+        Returns:
+            Scope -- The copy, or None if nothing called name has been declared
+        """
+        return deepcopy(self.SCOPES.get(name))
 
     def visit_Function(self, node):
         name = self.visit(node.name)
@@ -486,11 +618,17 @@ class Interpreter():
 
         for parameter in node.parameters:
             variable, data_type, reference_type = self.visit(parameter)
+            declared_type = data_type.data_type
             metadata = data_type
             metadata.data_type = data_type
+
+            # The array of a parameter is made here, and copied for every call
+            if self.LIMITS is not None and isinstance(metadata, ArrayType):
+                self.LIMITS.check_array(variable, metadata)
+
             self.SCOPES[name].declare(variable, metadata)
             self.SCOPES[name].assign(variable, metadata.declare())
-            self.SCOPES[name].parameters.append([reference_type, variable])
+            self.SCOPES[name].parameters.append([reference_type, variable, declared_type])
 
     def visit_Parameter(self, node):
         variable = self.visit(node.variable)
@@ -505,48 +643,149 @@ class Interpreter():
 
     def visit_File(self, node):
         file_name = self.visit(node.file_name)
-        self.CURRENT_SCOPE.SYMBOL_TABLE.add(file_name, Variable('FILE'))
-        self.CURRENT_SCOPE.add(file_name, open(file_name, self.visit(node.file_mode)))
+        self.FILES.open(file_name, self.visit(node.file_mode))
 
     def visit_FileMode(self, node):
-        file_mode = node.file_mode.value
-        if file_mode == 'READ':
-            return 'r'
-        elif file_mode == 'WRITE':
-            return 'w'
-        elif file_mode == 'APPEND':
-            return 'a'
+        return node.file_mode.value
 
     def visit_ReadFile(self, node):
-        file = self.visit(node.file_name)
+        file = self.FILES.get(self.visit(node.file_name))
         variable = self.visit(node.variable)
-        type = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(variable)
-        if type != None:
-            if type == 'STRING':
-                try:
-                    self.CURRENT_SCOPE.add(variable, file.readline())
-                except:
-                    Error().exception(file.name)
-            else:
-                Error().type_error(variable)
-        else:
+        metadata = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(variable)
+        if metadata is None:
             Error().name_error(variable)
 
+        if isinstance(metadata, ArrayType):
+            self.read_array(file, variable, metadata, node)
+            return
+
+        if not isinstance(metadata, VariableType) or metadata.data_type != 'STRING' or node.first is not None:
+            Error().type_error(variable)
+
+        self.CURRENT_SCOPE.assign(variable, file.read_line())
+
+    def read_array(self, file, name, metadata, node):
+        """Reads lines of a file into a range of a one-dimensional array, stopping early at the end of the file
+
+        Arguments:
+            file {FileHandle} -- The file opened for READ
+            name {str} -- The name of the array
+            metadata {ArrayType} -- The metadata of the array
+            node {ReadFile} -- The READFILE statement, with the range of the array (or None for all of it)
+
+        Returns:
+            tuple{int, list} -- The index of the first element read into, and the elements read
+        """
+        parse = LINE_TYPES.get(metadata.data_type)
+        if parse is None:
+            Error().type_error('Cannot READFILE into an ARRAY OF {}'.format(metadata.data_type))
+
+        array = self.CURRENT_SCOPE.VALUES[name]
+        first, last = self.array_range(array, node)
+        array.check_range(first, last)
+
+        lines = file.read_lines(last - first + 1)
+        try:
+            elements = list(map(parse, lines))
+        except ValueError:
+            for line in lines:
+                try:
+                    parse(line)
+                except ValueError:
+                    Error().type_error('Cannot parse {} to {}'.format(repr(line), metadata.data_type))
+
+        array.set_range(first, elements)
+
+        return first, elements
+
     def visit_WriteFile(self, node):
-        file = self.visit(node.file_name)
+        file = self.FILES.get(self.visit(node.file_name))
         line = self.visit(node.line)
-        try:
-            file.write(line + '\n')
-        except:
-            Error().exception(file.name)
+
+        if isinstance(line, Array):
+            return self.write_array(file, line, node)
+
+        if type(line) is not str or node.first is not None:
+            Error().type_error('Cannot write {} to {}'.format(line, file.name))
+
+        file.write_line(line)
+
+    def write_array(self, file, array, node):
+        """Writes a range of a one-dimensional array to a file, one element per line
+
+        Arguments:
+            file {FileHandle} -- The file opened for WRITE or APPEND
+            array {Array} -- The array
+            node {WriteFile} -- The WRITEFILE statement, with the range of the array (or None for all of it)
+        """
+        first, last = self.array_range(array, node)
+        elements = array.get_range(first, last)
+
+        lines = []
+        for i in range(0, len(elements)):
+            if type(elements[i]) is str:
+                lines.append(elements[i])
+            elif type(elements[i]) in (int, float):
+                lines.append(str(elements[i]))
+            elif elements[i] is None:
+                Error().unbound_local_error('{}[{}]'.format(node.line.value, first + i))
+            else:
+                Error().type_error('Cannot write {} to {}'.format(elements[i], file.name))
+
+        file.write_lines(lines)
+
+    def array_range(self, array, node):
+        """Works out the range of an array read from or written to a file
+
+        Arguments:
+            array {Array} -- The array
+            node {ReadFile/WriteFile} -- The statement, with the first and last index (or None for the whole array)
+
+        Returns:
+            tuple{int} -- The first and last index
+        """
+        if type(array) is not Array:
+            Error().type_error('Only an ARRAY OF STRING, INTEGER or REAL can be read from or written to a file')
+
+        if node.first is None:
+            return array.dimensions[0]
+
+        first = self.visit(node.first)
+        last = self.visit(node.last)
+        if type(first) is not int or type(last) is not int:
+            Error().type_error('The first and last index must be INTEGER')
+
+        return first, last
 
     def visit_CloseFile(self, node):
-        file = self.visit(node.file_name)
-        try:
-            file.close()
-            del self.CURRENT_SCOPE.VALUES[file.name]
-        except:
-            Error().exception(file.name)
+        self.FILES.close(self.visit(node.file_name))
+
+    def visit_Seek(self, node):
+        file = self.FILES.get(self.visit(node.file_name))
+        file.seek(self.visit(node.address))
+
+    def visit_GetRecord(self, node):
+        file = self.FILES.get(self.visit(node.file_name))
+        instance = self.reference(node.variable)
+        record = instance.value
+
+        if isinstance(record, Record):
+            record_type = type(record)
+        elif isinstance(record, RecordView):
+            record_type = record.array.record
+        else:
+            Error().type_error('{} is not a TYPE'.format(node.variable.value))
+
+        instance.assign((record_type(*file.get_record(record_type)),))
+
+    def visit_PutRecord(self, node):
+        file = self.FILES.get(self.visit(node.file_name))
+        record = self.visit(node.variable)
+
+        if not isinstance(record, (Record, RecordView)):
+            Error().type_error('{} is not a TYPE'.format(node.variable.value))
+
+        file.put_record(record)
 
     # END: File
 
@@ -567,6 +806,104 @@ class Interpreter():
             except:
                 Error().type_error(repr(name))
 
+    def reference(self, node):
+        """Fetches the instance a BYREF parameter will be bound to
+
+        Arguments:
+            node {VariableValue/ElementValue/TypeValue} -- The instance passed into the BYREF parameter
+
+        Returns:
+            Variable/Array/Type/ElementReference -- The instance, which is assigned to in place
+        """
+        if isinstance(node, ElementValue):
+            name = node.value
+            if self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name) is None:
+                Error().name_error(name)
+
+            indexes = []
+            for index in node.indexes:
+                indexes.append(self.visit(index))
+
+            array = self.CURRENT_SCOPE.VALUES[name]
+
+            # Checks the indexes now rather than on first use inside the procedure/function
+            array.get(indexes)
+
+            return ElementReference(array, indexes)
+        elif isinstance(node, TypeValue):
+            record = self.visit(node.object_name)
+            field_name = self.visit(node.field_name)
+
+            if not isinstance(record, (Record, RecordView)):
+                Error().type_error('{} is not a TYPE'.format(node.object_name.value))
+
+            # Checks the field now rather than on first use inside the procedure/function
+            record.get(field_name)
+
+            return FieldReference(record, field_name)
+        elif isinstance(node, VariableValue):
+            name = node.value
+            metadata = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name)
+
+            if metadata is None:
+                Error().name_error(name)
+            elif isinstance(metadata, ConstantType):
+                Error().reference_error('A CONSTANT cannot be passed into BYREF')
+
+            return self.CURRENT_SCOPE.VALUES[name]
+        else:
+            Error().reference_error('A variable must be passed into BYREF')
+
+    def instance_type(self, metadata, data_type):
+        """Describes the data type of an instance, so that a BYREF parameter is only bound to an instance of its type
+
+        Arguments:
+            metadata {DataType} -- The metadata the instance was declared with
+            data_type {str} -- The name of its data type, or of the data type of its elements if it is an array
+
+        Returns:
+            str -- The data type, like INTEGER, a TYPE name or 2D ARRAY OF INTEGER
+        """
+        if isinstance(metadata, ArrayType):
+            return '{}D ARRAY OF {}'.format(len(metadata.dimensions), data_type)
+
+        return data_type
+
+    def declared_type(self, name):
+        """Fetches the metadata of an instance of the current scope and the name of its data type
+
+        Arguments:
+            name {str} -- The name of the instance
+
+        Returns:
+            tuple{DataType, str} -- The metadata, and the name of the data type (of the elements, for an array)
+        """
+        metadata = self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name)
+
+        # The metadata of parameters does not keep the name of their data type
+        for _, parameter, data_type in self.CURRENT_SCOPE.parameters:
+            if parameter == name:
+                return metadata, data_type
+
+        return metadata, metadata.data_type
+
+    def argument_type(self, node):
+        """Describes the data type of the instance passed into a BYREF parameter, as instance_type() does
+
+        Arguments:
+            node {VariableValue/ElementValue/TypeValue} -- The instance, already fetched by reference()
+
+        Returns:
+            str -- The data type
+        """
+        if isinstance(node, ElementValue):
+            return self.declared_type(node.value)[1]
+        elif isinstance(node, TypeValue):
+            metadata = self.visit(node.object_name).FIELDS[self.visit(node.field_name)]
+            return self.instance_type(metadata, metadata.data_type)
+
+        return self.instance_type(*self.declared_type(node.value))
+
     def check_declaration(self, name):
         if self.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name) is None:
             Error().name_error(name)
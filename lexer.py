@@ -6,6 +6,28 @@ class Token():
         self.value = value
 
 class Lexer():
+    # Contains all words(tokens) recognized by this language
+    # BUILTIN_FUNCTION is added to by function.register_builtin()
+    tokens = {
+        'KEYWORD': ['INPUT', 'OUTPUT', 'DECLARE', 'OF', 'IF', 'THEN', 'ELSEIF',
+                    'ELSE', 'ENDIF', 'FOR', 'TO', 'STEP', 'ENDFOR', 'REPEAT',
+                    'UNTIL', 'WHILE', 'ENDWHILE', 'CASE', 'OF', 'OTHERWISE', 'ENDCASE', 'PROCEDURE', 'ENDPROCEDURE', 'FUNCTION', 'ENDFUNCTION', 'RETURN', 'CALL', 'BYVAL', 'BYREF', 'OPENFILE', 'READFILE', 'WRITEFILE', 'CLOSEFILE', 'SEEK', 'GETRECORD', 'PUTRECORD', 'TYPE', 'ENDTYPE', 'CONSTANT'
+                    ],
+        'BUILTIN_FUNCTION': [],
+        'OPERATION': ['+', '-', '/', '*', 'DIV', 'MOD', '^'
+                      ],
+        'PARENTHESIS': ['(', ')', '{', '}', '[', ']'
+                        ],
+        'COMPARISON': ['>', '<', '='
+                       ],
+        'BOOLEAN': ['TRUE', 'FALSE'
+                    ],
+        'LOGICAL': ['AND', 'OR', 'NOT'
+                    ],
+        'FILE_MODE': ['READ', 'WRITE', 'APPEND', 'RANDOM'
+                      ]
+    }
+
     def __init__(self, code):
         """Initializes an instance of Lexer
 
@@ -17,28 +39,21 @@ class Lexer():
         self.position = 0
         self.current_char = code[self.position]
 
-        # Contains all words(tokens) recognized by this language
-        self.tokens = {
-            'KEYWORD': ['INPUT', 'OUTPUT', 'DECLARE', 'OF', 'IF', 'THEN', 'ELSEIF',
-                        'ELSE', 'ENDIF', 'FOR', 'TO', 'STEP', 'ENDFOR', 'REPEAT',
-                        'UNTIL', 'WHILE', 'ENDWHILE', 'CASE', 'OF', 'OTHERWISE', 'ENDCASE', 'PROCEDURE', 'ENDPROCEDURE', 'FUNCTION', 'ENDFUNCTION', 'RETURN', 'CALL', 'BYVAL', 'BYREF', 'OPENFILE', 'READFILE', 'WRITEFILE', 'CLOSEFILE', 'TYPE', 'ENDTYPE', 'CONSTANT'
-                        ],
-            'BUILTIN_FUNCTION': ['CHR', 'ASC', 'LENGTH', 'LEFT', 'RIGHT', 'MID',
-                                 'CONCAT', 'INT', 'LCASE', 'UCASE', 'TONUM', 'STR', 'SUBSTR', 'ONECHAR', 'CHARACTERCOUNT', 'EOF'
-                                 ],
-            'OPERATION': ['+', '-', '/', '*', 'DIV', 'MOD', '^'
-                          ],
-            'PARENTHESIS': ['(', ')', '{', '}', '[', ']'
-                            ],
-            'COMPARISON': ['>', '<', '='
-                           ],
-            'BOOLEAN': ['TRUE', 'FALSE'
-                        ],
-            'LOGICAL': ['AND', 'OR', 'NOT'
-                        ],
-            'FILE_MODE': ['READ', 'WRITE', 'APPEND'
-                          ]
-        }
+    @classmethod
+    def is_reserved(cls, word):
+        """Checks whether a word has a meaning of its own in the language
+
+        Arguments:
+            word {str} -- The word to check
+
+        Returns:
+            bool -- Whether word is a keyword, operator, boolean, logical operator or file mode
+        """
+        for token_type, words in cls.tokens.items():
+            if token_type != 'BUILTIN_FUNCTION' and word in words:
+                return True
+
+        return word == 'EOL'
 
     def next_token(self):
         """Returns the next token in the text
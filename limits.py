@@ -0,0 +1,153 @@
+from data_types import ArrayType, TypeType
+from error import Error
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# The number of steps between checks of the time, so that the clock is not read on every step
+CHECK_INTERVAL = 1024
+
+
+def array_elements(metadata):
+    """Returns the number of values stored by an array: its elements, times the values of every record when its
+    elements are of a TYPE
+
+    Arguments:
+        metadata {ArrayType} -- The metadata of the array
+
+    Returns:
+        int -- The number of values
+    """
+    elements = record_elements(metadata.record) if metadata.record is not None else 1
+    for lower_bound, upper_bound in metadata.dimensions:
+        elements *= upper_bound - lower_bound + 1
+
+    return elements
+
+
+def record_elements(record):
+    """Returns the number of values stored by a record, counting every element of its ARRAY fields and every field of
+    its TYPE fields
+
+    Arguments:
+        record {type(Record)} -- The class made from the TYPE declaration
+
+    Returns:
+        int -- The number of values
+    """
+    elements = 0
+    for metadata in record.FIELDS.values():
+        if isinstance(metadata, ArrayType):
+            elements += array_elements(metadata)
+        elif isinstance(metadata, TypeType):
+            elements += record_elements(metadata.record)
+        else:
+            elements += 1
+
+    return elements
+
+
+class Limits():
+    """The limits a program is run with. A limit of None is not checked
+
+    A step is one statement, or one entry into a block (so every iteration of a loop is a step even if it is empty).
+    Going over a limit raises a LimitError, which stops the program like any other error
+    """
+
+    def __init__(self, steps=None, seconds=None, elements=None, memory=None):
+        """Initializes the limits of a run
+
+        Keyword Arguments:
+            steps {int} -- The most steps the program may take (default: {None})
+            seconds {float} -- The most seconds the program may run for (default: {None})
+            elements {int} -- The most elements a single array may be declared with (default: {None})
+            memory {int} -- The most memory (in MB) the process may use while the program runs. The limit is set for
+                the whole process, so only one run at a time may have one (default: {None})
+        """
+        self.steps = steps
+        self.seconds = seconds
+        self.elements = elements
+        self.memory = memory
+
+        self.count = 0
+        self.check_at = 0
+        self.deadline = None
+        self.previous_memory = None
+
+    def install(self, interpreter):
+        """Makes an Interpreter count its steps. Without limits on steps or time, nothing is changed
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to limit
+        """
+        if self.steps is None and self.seconds is None:
+            return
+
+        visit_block = interpreter.visit_Block
+
+        def visit_Block(node):
+            self.count += len(node.block) + 1
+            if self.count >= self.check_at:
+                self.check()
+
+            return visit_block(node)
+
+        # Found by Interpreter.visit() before the method of the class
+        interpreter.visit_Block = visit_Block
+
+    def start(self):
+        """Starts the clock and sets the memory limit of the process"""
+        self.count = 0
+        self.deadline = time.perf_counter() + self.seconds if self.seconds is not None else None
+        self.check_at = min(CHECK_INTERVAL, self.steps) if self.steps is not None else CHECK_INTERVAL
+
+        if self.memory is not None and resource is not None:
+            self.previous_memory = resource.getrlimit(resource.RLIMIT_AS)
+            limit = self.memory * (1 << 20)
+            if self.previous_memory[1] != resource.RLIM_INFINITY:
+                limit = min(limit, self.previous_memory[1])
+
+            resource.setrlimit(resource.RLIMIT_AS, (limit, self.previous_memory[1]))
+
+    def stop(self):
+        """Gives the process back its memory limit"""
+        if self.previous_memory is not None:
+            resource.setrlimit(resource.RLIMIT_AS, self.previous_memory)
+            self.previous_memory = None
+
+    def check(self):
+        """Checks the step budget and the clock, and works out the step count of the next check"""
+        if self.steps is not None and self.count > self.steps:
+            Error().limit_error('Went over the limit of {} steps'.format(self.steps))
+
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            Error().limit_error('Went over the limit of {} seconds'.format(self.seconds))
+
+        self.check_at = self.count + CHECK_INTERVAL
+        if self.steps is not None:
+            self.check_at = min(self.check_at, self.steps + 1)
+
+    def check_array(self, name, metadata):
+        """Checks the number of elements of an array before it is declared
+
+        Arguments:
+            name {str} -- The name of the array
+            metadata {ArrayType} -- The metadata the array is declared with
+        """
+        if self.elements is None:
+            return
+
+        elements = array_elements(metadata)
+        if elements > self.elements:
+            Error().limit_error('{} would have {} elements. The limit is {}'.format(name, elements, self.elements))
+
+    def out_of_memory(self):
+        """Raises the LimitError of running out of memory"""
+        if self.memory is not None:
+            Error().limit_error('Went over the limit of {} MB of memory'.format(self.memory))
+
+        Error().limit_error('Ran out of memory')
@@ -1,24 +1,423 @@
 from analyzer import Analyzer
-from error import Error
+from checkpoint import CHECKPOINT_SIGNAL, Checkpointer, read_checkpoint
+from error import LimitError
+from file_handler import BUFFER_SIZE
+from function import load_plugins
 from interpreter import Interpreter
+from lexer import Lexer
+from limits import Limits
+from memory import MemoryReport
+from profiler import Profiler
+import argparse
+import signal
 import sys
+import time
+import traceback
 
-# Comment to view call stacks
-sys.tracebacklimit = 0
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
 
+# The exit codes of the runner. When several files are run, the highest one is returned
+EXIT_OK = 0
+EXIT_RUNTIME_ERROR = 1
+EXIT_USAGE_ERROR = 2
+EXIT_SYNTAX_ERROR = 3
+EXIT_FILE_ERROR = 4
+EXIT_LIMIT_ERROR = 5
+EXIT_INTERRUPTED = 130
 
-def main():
-    file = open('console.psc', 'r')
 
-    line = file.readline()
-    code = line
-    while len(line) > 0:
+def read_source(path):
+    """Reads a pseudocode file in one go and joins its lines the way Lexer expects them
 
-        line = file.readline()
-        code += ' EOL ' + line
+    Arguments:
+        path {str} -- The path of the .psc file
 
-    analyzer = Analyzer(code)
-    interpreter = Interpreter(analyzer)
+    Returns:
+        str -- The code, with EOL between every line
+    """
+    with open(path, 'r') as file:
+        source = file.read()
 
+    return join_lines(source)
 
-main()
+
+def join_lines(source):
+    """Joins the lines of pseudocode the way Lexer expects them
+
+    Arguments:
+        source {str} -- The text of a .psc file
+
+    Returns:
+        str -- The code, with EOL between every line
+    """
+    return ' EOL '.join(source.split('\n'))
+
+
+def count_tokens(code):
+    """Runs the Lexer over the code on its own
+
+    Arguments:
+        code {str} -- The code, with EOL between every line
+
+    Returns:
+        int -- The number of tokens in the code
+    """
+    if not code:
+        return 0
+
+    lexer = Lexer(code)
+    count = 0
+    while lexer.next_token().type != 'EOF':
+        count += 1
+
+    return count
+
+
+def peak_memory():
+    """Returns the most memory the process has used so far, in MB, or None if it cannot be found"""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+def run(path, arguments):
+    """Runs one pseudocode file, reporting errors and statistics to stderr
+
+    Arguments:
+        path {str} -- The path of the .psc file
+        arguments {argparse.Namespace} -- The parsed command-line arguments
+
+    Returns:
+        int -- The exit code of the file
+    """
+    timings = {}
+    tokens = None
+    phase = 'read'
+    profiler = Profiler() if arguments.profile or arguments.profile_stacks else None
+    memory = MemoryReport() if arguments.memory else None
+    interpreter = None
+
+    if memory is not None:
+        memory.start()
+        memory.phase(phase)
+
+    try:
+        start = time.perf_counter()
+        code = read_source(path)
+        timings['read'] = time.perf_counter() - start
+
+        if arguments.time or arguments.stats:
+            # Parsing lexes as it goes, so the Lexer is timed in a pass of its own and taken away from parsing
+            phase = 'lex'
+            if memory is not None:
+                memory.phase(phase)
+
+            start = time.perf_counter()
+            tokens = count_tokens(code)
+            timings['lex'] = time.perf_counter() - start
+
+        phase = 'parse'
+        if memory is not None:
+            memory.phase(phase)
+
+        start = time.perf_counter()
+        tree = Analyzer(code).block(['EOF']) if code else None
+        timings['parse'] = max(time.perf_counter() - start - timings.get('lex', 0), 0)
+
+        phase = 'execute'
+        if memory is not None:
+            memory.phase(phase)
+
+        start = time.perf_counter()
+        checkpointer = make_checkpointer(arguments, tree, code)
+        interpreter = Interpreter(
+            buffer_size=arguments.buffer_size,
+            memory_map=arguments.mmap,
+            write_behind=arguments.write_behind,
+            limits=make_limits(arguments),
+            profiler=profiler,
+            memory=memory,
+            checkpointer=checkpointer
+        )
+        if tree is not None:
+            if arguments.resume:
+                checkpointer.restore(interpreter, read_checkpoint(arguments.resume, tree, code))
+
+            handler = handle_checkpoint_signal(checkpointer)
+            try:
+                interpreter.execute(tree)
+            finally:
+                if handler is not None:
+                    signal.signal(CHECKPOINT_SIGNAL, handler)
+        timings['execute'] = time.perf_counter() - start
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except Exception as error:
+        sys.stdout.flush()
+        if arguments.traceback:
+            traceback.print_exc()
+        else:
+            print('{}: {}: {}'.format(path, type(error).__name__, error), file=sys.stderr)
+
+        return error_code(phase, error)
+    finally:
+        sys.stdout.flush()
+        report(path, timings, arguments, tokens)
+        if profiler is not None and phase == 'execute':
+            report_profile(path, profiler, arguments)
+
+        if memory is not None:
+            memory.stop()
+            if interpreter is not None:
+                # Reported even if the program stopped with an error, which is when it is needed most
+                memory.measure(interpreter)
+                print('{}: memory'.format(path), file=sys.stderr)
+                memory.report(sys.stderr, arguments.memory_top)
+
+    return EXIT_OK
+
+
+def error_code(phase, error):
+    """Works out the exit code of an error
+
+    Arguments:
+        phase {str} -- The phase the error was raised in: read, lex, parse or execute
+        error {Exception} -- The error
+
+    Returns:
+        int -- The exit code
+    """
+    if phase == 'read':
+        return EXIT_FILE_ERROR
+    elif isinstance(error, LimitError):
+        return EXIT_LIMIT_ERROR
+    elif phase in ('lex', 'parse'):
+        return EXIT_SYNTAX_ERROR
+
+    return EXIT_RUNTIME_ERROR
+
+
+def report(path, timings, arguments, tokens):
+    """Prints the timings and statistics of a file to stderr
+
+    Arguments:
+        path {str} -- The path of the .psc file
+        timings {dict} -- The seconds taken by every phase that finished
+        arguments {argparse.Namespace} -- The parsed command-line arguments
+        tokens {int} -- The number of tokens in the file, or None if it was not lexed
+    """
+    if arguments.time and timings:
+        phases = ', '.join('{} {:.3f}s'.format(phase, seconds) for phase, seconds in timings.items())
+        print('{}: {} (total {:.3f}s)'.format(path, phases, sum(timings.values())), file=sys.stderr)
+
+    if arguments.stats:
+        peak = peak_memory()
+        print('{}: {} tokens, peak memory {}'.format(
+            path, tokens if tokens is not None else '?', '{:.1f} MB'.format(peak) if peak is not None else 'unknown'),
+            file=sys.stderr)
+
+
+def report_profile(path, profiler, arguments):
+    """Prints the profile of a file to stderr and adds its stacks to the file given by --profile-stacks
+
+    Arguments:
+        path {str} -- The path of the .psc file
+        profiler {Profiler} -- The Profiler the file was run with
+        arguments {argparse.Namespace} -- The parsed command-line arguments
+    """
+    if arguments.profile:
+        with open(path, 'r') as file:
+            source = file.read()
+
+        print('{}: profile'.format(path), file=sys.stderr)
+        profiler.report(sys.stderr, source, arguments.profile_lines)
+
+    if arguments.profile_stacks:
+        with open(arguments.profile_stacks, 'a') as file:
+            profiler.write_stacks(file)
+
+
+def add_limit_arguments(parser):
+    """Adds the options of the limits programs are run with
+
+    Arguments:
+        parser {argparse.ArgumentParser} -- The parser to add the options to
+    """
+    limits = parser.add_argument_group('limits', 'A program that goes over a limit stops with a LimitError')
+    limits.add_argument('--max-steps', type=int, default=None, metavar='STEPS',
+                        help='the most statements and loop iterations a program may run')
+    limits.add_argument('--max-seconds', type=float, default=None, metavar='SECONDS',
+                        help='the most seconds a program may run for')
+    limits.add_argument('--max-elements', type=int, default=None, metavar='ELEMENTS',
+                        help='the most elements a single array may be declared with')
+    limits.add_argument('--max-memory', type=int, default=None, metavar='MB',
+                        help='the most memory (address space) the process may use while a program runs')
+
+
+def make_limits(arguments):
+    """Makes the limits given on the command line
+
+    Arguments:
+        arguments {argparse.Namespace} -- The parsed command-line arguments
+
+    Returns:
+        Limits -- The limits, or None if no limit was given
+    """
+    limits = (arguments.max_steps, arguments.max_seconds, arguments.max_elements, arguments.max_memory)
+    if all(limit is None for limit in limits):
+        return None
+
+    return Limits(*limits)
+
+
+def make_checkpointer(arguments, tree, code):
+    """Makes the Checkpointer given on the command line
+
+    Arguments:
+        arguments {argparse.Namespace} -- The parsed command-line arguments
+        tree {Block} -- The tree of the program, or None if it is empty
+        code {str} -- The code of the program, with EOL between every line
+
+    Returns:
+        Checkpointer -- The Checkpointer, or None if checkpoints are neither saved nor resumed
+    """
+    if tree is None or (arguments.checkpoint is None and arguments.resume is None):
+        return None
+
+    return Checkpointer(arguments.checkpoint, tree, code, arguments.checkpoint_every, sys.stderr)
+
+
+def handle_checkpoint_signal(checkpointer):
+    """Makes CHECKPOINT_SIGNAL save a checkpoint while a program runs, where there is such a signal
+
+    Arguments:
+        checkpointer {Checkpointer} -- The Checkpointer of the program, or None to leave the signal alone
+
+    Returns:
+        object -- The handler the signal had, to be put back once the program has run, or None
+    """
+    if checkpointer is None or checkpointer.path is None or CHECKPOINT_SIGNAL is None:
+        return None
+
+    return signal.signal(CHECKPOINT_SIGNAL, checkpointer.request)
+
+
+def parse_arguments(argv):
+    """Parses the command-line arguments
+
+    Arguments:
+        argv {list{str}} -- The arguments, without the name of the program
+
+    Returns:
+        argparse.Namespace -- The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog='pseudocode',
+        description='Runs CAIE pseudocode files',
+        epilog='Exit codes: 0 success, 1 runtime error, 2 usage error, 3 syntax error, 4 file cannot be read, '
+               '5 a limit was reached. '
+               'When several files are run, the highest code is returned')
+    parser.add_argument('paths', nargs='*', default=['console.psc'], metavar='FILE',
+                        help='the .psc files to run, in order (default: console.psc)')
+    parser.add_argument('--time', action='store_true',
+                        help='print the time taken to read, lex, parse and execute every file to stderr')
+    parser.add_argument('--stats', action='store_true',
+                        help='print the number of tokens and the peak memory of every file to stderr')
+    parser.add_argument('--traceback', action='store_true',
+                        help='print the full python traceback of errors')
+    parser.add_argument('--stop-on-error', action='store_true',
+                        help='do not run the remaining files after a file fails')
+
+    profile = parser.add_argument_group('profiling', 'Times every line and every procedure and function. '
+                                        'Programs run at full speed without these options')
+    profile.add_argument('--profile', action='store_true',
+                         help='print the time of every procedure, function and line to stderr, sorted by self time')
+    profile.add_argument('--profile-lines', type=int, default=None, metavar='LINES',
+                         help='only print the LINES lines with the most self time')
+    profile.add_argument('--profile-stacks', default=None, metavar='FILE',
+                         help='write the self time (in microseconds) of every stack of calls to FILE in the '
+                              'collapsed-stack format of flame graph tools')
+
+    memory = parser.add_argument_group('memory', 'Accounts for the memory of every variable, array and record. '
+                                       'Programs run slower with these options, as every allocation is traced')
+    memory.add_argument('--memory', action='store_true',
+                        help='print the size of every instance left when the program ends, the memory allocated by '
+                             'every DECLARE and the peak memory of every phase to stderr')
+    memory.add_argument('--memory-top', type=int, default=None, metavar='COUNT',
+                        help='only print the COUNT largest instances and declarations')
+
+    checkpoints = parser.add_argument_group('checkpoints', 'Saves the state of a running program, so that it can be '
+                                            'resumed where it was. Checkpoints are saved at the start of statements '
+                                            'outside every procedure and function')
+    checkpoints.add_argument('--checkpoint', default=None, metavar='FILE',
+                             help='save a checkpoint to FILE whenever the process gets SIGUSR1, and every '
+                                  '--checkpoint-every statements if it is given. Checkpoints are only saved between '
+                                  'statements outside procedures and functions: one due while a call runs is put off '
+                                  'until it returns, with a warning on stderr')
+    checkpoints.add_argument('--checkpoint-every', type=int, default=None, metavar='STATEMENTS',
+                             help='save a checkpoint after every STATEMENTS statements run')
+    checkpoints.add_argument('--resume', default=None, metavar='FILE',
+                             help='resume the program from the checkpoint in FILE, which must have been saved by '
+                                  'the same program')
+
+    files = parser.add_argument_group('file modes')
+    files.add_argument('--buffer-size', type=int, default=BUFFER_SIZE, metavar='BYTES',
+                       help='the buffer size of every file opened (default: %(default)s)')
+    files.add_argument('--mmap', action='store_true',
+                       help='read files opened for READ through mmap')
+    files.add_argument('--write-behind', action='store_true',
+                       help='write files opened for WRITE or APPEND from a background thread')
+
+    add_limit_arguments(parser)
+
+    arguments = parser.parse_args(argv)
+    if arguments.buffer_size < 1:
+        parser.error('--buffer-size must be at least 1')
+    if arguments.checkpoint_every is not None:
+        if arguments.checkpoint_every < 1:
+            parser.error('--checkpoint-every must be at least 1')
+        if arguments.checkpoint is None:
+            parser.error('--checkpoint-every needs --checkpoint')
+    if arguments.resume is not None and len(arguments.paths) > 1:
+        parser.error('--resume can only resume one file')
+
+    return arguments
+
+
+def main(argv=None):
+    """Runs every file given on the command line
+
+    Keyword Arguments:
+        argv {list{str}} -- The arguments, or None to use sys.argv (default: {None})
+
+    Returns:
+        int -- The exit code
+    """
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    load_plugins()
+
+    if arguments.profile_stacks:
+        # Every file run adds its stacks to the file
+        open(arguments.profile_stacks, 'w').close()
+
+    exit_code = EXIT_OK
+    for path in arguments.paths:
+        code = run(path, arguments)
+        exit_code = max(exit_code, code)
+
+        if code == EXIT_INTERRUPTED or (code != EXIT_OK and arguments.stop_on_error):
+            break
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
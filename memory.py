@@ -0,0 +1,241 @@
+from data_types import ArrayType, ConstantType
+import sys
+import tracemalloc
+import types
+
+# The name of the scope of the statements outside every procedure and function
+GLOBAL_SCOPE = 'GLOBAL'
+
+# Values that are shared by every instance, such as the class of a TYPE or the metadata of a field, and are not
+# counted as part of any variable
+SHARED_TYPES = (type, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_size(value, seen):
+    """Measures a value and everything it holds with sys.getsizeof(), counting every object once
+
+    Arguments:
+        value {object} -- The value of a variable, array or record
+        seen {set{int}} -- The ids of the objects already counted, which are not counted again
+
+    Returns:
+        int -- The size in bytes
+    """
+    if id(value) in seen or isinstance(value, SHARED_TYPES):
+        return 0
+
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += deep_size(key, seen) + deep_size(item, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += deep_size(item, seen)
+    elif not isinstance(value, (str, bytes, bytearray, int, float, bool)):
+        if hasattr(value, '__dict__'):
+            size += deep_size(vars(value), seen)
+
+        for slot in getattr(type(value), '__slots__', ()):
+            if hasattr(value, slot):
+                size += deep_size(getattr(value, slot), seen)
+
+    return size
+
+
+def describe(metadata):
+    """Writes the declared type of an instance the way it is written in pseudocode
+
+    Arguments:
+        metadata {DataType} -- The metadata of the instance, from its SYMBOL_TABLE
+
+    Returns:
+        str -- The type, with the bounds of arrays
+    """
+    if metadata is None:
+        return '?'
+
+    # The metadata of a parameter is its own data_type, so the name of its type is gone
+    data_type = metadata.data_type if isinstance(metadata.data_type, str) else '?'
+
+    if isinstance(metadata, ArrayType):
+        bounds = ', '.join('{}:{}'.format(lower_bound, upper_bound) for lower_bound, upper_bound in metadata.dimensions)
+        return 'ARRAY[{}] OF {}'.format(bounds, data_type)
+    elif isinstance(metadata, ConstantType):
+        return 'CONSTANT'
+
+    return data_type
+
+
+class MemoryReport():
+    """Accounts for the memory of a program: the size of every variable, array and record left in its scopes when
+    it ends, the memory allocated by every DECLARE as it runs (including the locals of procedures and functions,
+    which are gone by the end) and the peak memory of every phase
+
+    Sizes are measured with sys.getsizeof() over everything a value holds. Allocations and peaks are measured with
+    tracemalloc, which is started by start() and slows the program down while it runs
+    """
+
+    def __init__(self):
+        """Initializes an empty report"""
+        # (scope, name, line number): [times declared, bytes allocated by the largest, type]
+        self.declarations = {}
+
+        # [scope, name, line number, type, bytes] for every instance left in a scope, filled in by measure()
+        self.instances = []
+
+        # [phase, peak bytes] in the order the phases ran
+        self.phases = []
+
+        self.phase_name = None
+        self.traced = False
+        self.started_tracing = False
+        self.line_number = None
+
+    def start(self):
+        """Starts tracing allocations, if nothing else has"""
+        self.traced = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def phase(self, name):
+        """Ends the current phase, recording its peak, and starts another
+
+        Arguments:
+            name {str} -- The name of the phase that starts, such as 'parse' or 'execute'
+        """
+        self.end_phase()
+        self.phase_name = name
+        tracemalloc.reset_peak()
+
+    def end_phase(self):
+        """Records the peak of the current phase, if there is one"""
+        if self.phase_name is not None and tracemalloc.is_tracing():
+            self.phases.append([self.phase_name, tracemalloc.get_traced_memory()[1]])
+
+        self.phase_name = None
+
+    def stop(self):
+        """Ends the current phase and stops tracing allocations, if start() started it"""
+        self.end_phase()
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def install(self, interpreter):
+        """Makes an Interpreter record the line and the allocations of every DECLARE. An Interpreter without a
+        MemoryReport runs exactly as before
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to account for
+        """
+        visit_statement = interpreter.visit_Statement
+        visit_declaration = interpreter.visit_Declaration
+        declarations = self.declarations
+
+        def visit_Statement(node):
+            self.line_number = node.line_number
+            return visit_statement(node)
+
+        def visit_Declaration(node):
+            before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+            visit_declaration(node)
+            allocated = tracemalloc.get_traced_memory()[0] - before if tracemalloc.is_tracing() else 0
+
+            scope = scope_name(interpreter, interpreter.CURRENT_SCOPE)
+            if scope is None:
+                # The fields of a TYPE are not instances
+                return
+
+            name = interpreter.visit(node.variable)
+            key = (scope, name, self.line_number)
+            declaration = declarations.get(key)
+            if declaration is None:
+                metadata = interpreter.CURRENT_SCOPE.SYMBOL_TABLE.lookup(name)
+                declaration = declarations[key] = [0, 0, describe(metadata)]
+
+            declaration[0] += 1
+            declaration[1] = max(declaration[1], allocated)
+
+        # Found by Interpreter.visit() before the methods of the class
+        interpreter.visit_Statement = visit_Statement
+        interpreter.visit_Declaration = visit_Declaration
+
+    def measure(self, interpreter):
+        """Measures every instance left in the scopes of an Interpreter. Data shared between instances, such as
+        arrays passed BYVAL that have not been written to, is counted for the first instance that holds it
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter whose program has ended
+        """
+        lines = {(scope, name): line_number for scope, name, line_number in self.declarations}
+        seen = set()
+        self.instances = []
+
+        for owner, scope in interpreter.SCOPES.items():
+            if scope.VALUES is None:
+                continue
+
+            for name, value in scope.VALUES.items():
+                metadata = scope.SYMBOL_TABLE.lookup(name)
+                if metadata is None:
+                    # Copied from the scope the procedure or function was declared in, and counted there
+                    continue
+
+                self.instances.append([owner, name, lines.get((owner, name)), describe(metadata),
+                                       deep_size(value, seen)])
+
+        self.instances.sort(key=lambda instance: -instance[4])
+
+    def report(self, file, limit=None):
+        """Writes the instances by size, the declarations by the memory they allocated and the peak of every phase
+
+        Arguments:
+            file {file} -- Where the tables are written
+
+        Keyword Arguments:
+            limit {int} -- The most instances and declarations shown, or None for all of them (default: {None})
+        """
+        print('{:>12}  {:>6}  {:<16} {:<20} {}'.format('Size (KB)', 'Line', 'Scope', 'Name', 'Type'), file=file)
+        for scope, name, line_number, data_type, size in self.instances[:limit]:
+            print('{:>12.1f}  {:>6}  {:<16} {:<20} {}'.format(
+                size / 1024, line_number if line_number is not None else '?', scope, name, data_type), file=file)
+
+        if self.traced:
+            print(file=file)
+            print('{:>12}  {:>6}  {:>8}  {:<16} {:<20} {}'.format(
+                'Declared (KB)', 'Line', 'Times', 'Scope', 'Name', 'Type'), file=file)
+            declarations = sorted(self.declarations.items(), key=lambda item: -item[1][1])
+            for (scope, name, line_number), (times, allocated, data_type) in declarations[:limit]:
+                print('{:>12.1f}  {:>6}  {:>8}  {:<16} {:<20} {}'.format(
+                    allocated / 1024, line_number if line_number is not None else '?', times, scope, name,
+                    data_type), file=file)
+
+        if self.phases:
+            print(file=file)
+            print('{:<10} {:>12}'.format('Phase', 'Peak (KB)'), file=file)
+            for phase, peak in self.phases:
+                print('{:<10} {:>12.1f}'.format(phase, peak / 1024), file=file)
+
+
+def scope_name(interpreter, scope):
+    """Finds the name of a scope. The scope of a call is a copy of the scope of its procedure or function, which
+    shares its block
+
+    Arguments:
+        interpreter {Interpreter} -- The Interpreter the scope belongs to
+        scope {Scope} -- The scope
+
+    Returns:
+        str -- GLOBAL_SCOPE, the name of the procedure or function, or None for the fields of a TYPE
+    """
+    if scope is interpreter.SCOPES[GLOBAL_SCOPE]:
+        return GLOBAL_SCOPE
+
+    for name, declared in interpreter.SCOPES.items():
+        if declared is scope or (declared.block is not None and declared.block is scope.block):
+            return name
+
+    return None
@@ -0,0 +1,187 @@
+import sys
+import time
+
+# The name of the outermost frame, which holds the statements outside every procedure and function
+MAIN_FRAME = '(main)'
+
+# How much the recursion limit is raised while profiling, to make room for the frames the Profiler adds to every
+# statement and call, so that programs that run without the Profiler also run with it
+RECURSION_FACTOR = 2
+
+
+class Profiler():
+    """Records where the time of a program goes, by source line and by procedure or function
+
+    For every line: how many times its statement ran, the total time it took and its self time (without the
+    statements nested in it, such as the body of a loop). For every procedure and function: how many times it was
+    called, its total time and its self time (without the calls it made). Total times count the time of recursive
+    calls once.
+    Self times are also kept for every stack of calls, for flame graphs
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        """Initializes an empty profile
+
+        Keyword Arguments:
+            clock {function} -- Returns the current time in seconds (default: {time.perf_counter})
+        """
+        self.clock = clock
+
+        # Line number: [hits, total, self]
+        self.lines = {}
+
+        # Name: [calls, total, self]
+        self.functions = {MAIN_FRAME: [1, 0.0, 0.0]}
+
+        # Tuple of names, outermost first: self time
+        self.stacks = {}
+
+        self.stack = [MAIN_FRAME]
+        self.started = None
+        self.previous_recursion_limit = None
+
+        # The time taken by the statements or calls nested in every statement or call still running
+        self.statement_children = [0.0]
+        self.call_children = [0.0]
+
+    def install(self, interpreter):
+        """Makes an Interpreter time its statements and calls. An Interpreter without a Profiler runs exactly as
+        before
+
+        Arguments:
+            interpreter {Interpreter} -- The Interpreter to profile
+        """
+        visit_statement = interpreter.visit_Statement
+        visit_function_call = interpreter.visit_FunctionCall
+        clock = self.clock
+        lines = self.lines
+        statement_children = self.statement_children
+
+        # The number of times every line is running, above 1 in recursive calls
+        running = {}
+
+        def visit_Statement(node):
+            line_number = node.line_number
+            running[line_number] = running.get(line_number, 0) + 1
+            statement_children.append(0.0)
+            start = clock()
+            try:
+                return visit_statement(node)
+            finally:
+                elapsed = clock() - start
+                own = elapsed - statement_children.pop()
+                statement_children[-1] += elapsed
+                running[line_number] -= 1
+
+                line = lines.get(line_number)
+                if line is None:
+                    line = lines[line_number] = [0, 0.0, 0.0]
+
+                line[0] += 1
+                if running[line_number] == 0:
+                    line[1] += elapsed
+                line[2] += own
+
+        def visit_FunctionCall(node):
+            name = interpreter.visit(node.name)
+            recursive = name in self.stack
+            self.stack.append(name)
+            self.call_children.append(0.0)
+            start = clock()
+            try:
+                return visit_function_call(node)
+            finally:
+                elapsed = clock() - start
+                self.record_call(name, elapsed, recursive)
+
+        # Found by Interpreter.visit() before the methods of the class
+        interpreter.visit_Statement = visit_Statement
+        interpreter.visit_FunctionCall = visit_FunctionCall
+
+    def record_call(self, name, elapsed, recursive):
+        """Adds a finished call to the profile
+
+        Arguments:
+            name {str} -- The name of the procedure or function
+            elapsed {float} -- The seconds the call took
+            recursive {bool} -- Whether the procedure or function was already running when it was called
+        """
+        own = elapsed - self.call_children.pop()
+        self.call_children[-1] += elapsed
+
+        stack = tuple(self.stack)
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + own
+        self.stack.pop()
+
+        function = self.functions.get(name)
+        if function is None:
+            function = self.functions[name] = [0, 0.0, 0.0]
+
+        function[0] += 1
+        if not recursive:
+            function[1] += elapsed
+        function[2] += own
+
+    def start(self):
+        """Starts timing the statements outside every procedure and function, and raises the recursion limit"""
+        self.previous_recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(self.previous_recursion_limit * RECURSION_FACTOR)
+        self.started = self.clock()
+
+    def stop(self):
+        """Stops timing the statements outside every procedure and function, and gives back the recursion limit"""
+        if self.previous_recursion_limit is not None:
+            sys.setrecursionlimit(self.previous_recursion_limit)
+            self.previous_recursion_limit = None
+
+        elapsed = self.clock() - self.started
+        own = elapsed - self.call_children[0]
+
+        self.functions[MAIN_FRAME][1] += elapsed
+        self.functions[MAIN_FRAME][2] += own
+        self.stacks[(MAIN_FRAME,)] = self.stacks.get((MAIN_FRAME,), 0.0) + own
+        self.call_children[0] = 0.0
+
+    def report(self, file, source=None, limit=None):
+        """Writes the profile as two tables sorted by self time: procedures and functions, then lines
+
+        Arguments:
+            file {file} -- Where the tables are written
+
+        Keyword Arguments:
+            source {str} -- The text of the program, to show every line next to its times (default: {None})
+            limit {int} -- The most lines shown, or None for all of them (default: {None})
+        """
+        total = self.functions[MAIN_FRAME][1] or 1e-12
+        source_lines = source.split('\n') if source is not None else []
+
+        print('{:>8} {:>10} {:>10} {:>7}  {}'.format('Calls', 'Total (s)', 'Self (s)', 'Self %', 'Procedure'),
+              file=file)
+        for name, (calls, function_total, own) in sorted(self.functions.items(), key=lambda item: -item[1][2]):
+            print('{:>8} {:>10.6f} {:>10.6f} {:>6.1f}%  {}'.format(
+                calls, function_total, own, own / total * 100, name), file=file)
+
+        print(file=file)
+        print('{:>8} {:>10} {:>10} {:>10} {:>7}  {}'.format('Line', 'Hits', 'Total (s)', 'Self (s)', 'Self %', 'Source'),
+              file=file)
+        lines = sorted(self.lines.items(), key=lambda item: -item[1][2])
+        for line_number, (hits, line_total, own) in lines[:limit]:
+            text = ''
+            if line_number is not None and 0 < line_number <= len(source_lines):
+                text = source_lines[line_number - 1].strip()
+
+            print('{:>8} {:>10} {:>10.6f} {:>10.6f} {:>6.1f}%  {}'.format(
+                line_number if line_number is not None else '?', hits, line_total, own, own / total * 100, text),
+                file=file)
+
+    def write_stacks(self, file):
+        """Writes the self time of every stack of calls in the collapsed-stack format read by flame graph tools:
+        the names of the stack from the outermost, separated by semicolons, then the time in microseconds
+
+        Arguments:
+            file {file} -- Where the stacks are written
+        """
+        for stack, own in sorted(self.stacks.items()):
+            microseconds = int(round(own * 1e6))
+            if microseconds > 0:
+                file.write('{} {}\n'.format(';'.join(stack), microseconds))
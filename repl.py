@@ -0,0 +1,185 @@
+from analyzer import Analyzer
+from function import load_plugins
+from interpreter import Interpreter
+from lexer import Lexer
+from main import join_lines, read_source
+import argparse
+import sys
+
+try:
+    # Gives input() line editing and history where it is available
+    import readline
+except ImportError:
+    readline = None
+
+# The prompts shown for the first line of an entry and for the lines of a block that is still open
+PROMPT = '>>> '
+CONTINUATION_PROMPT = '... '
+
+# The keywords that open a block when they start a line (FOR is also part of OPENFILE), and the keywords that close
+# one. CASE only opens a block when followed by OF
+BLOCK_STARTS = {'IF', 'FOR', 'REPEAT', 'WHILE', 'PROCEDURE', 'FUNCTION', 'TYPE'}
+BLOCK_ENDS = {'ENDIF', 'ENDFOR', 'UNTIL', 'ENDWHILE', 'ENDCASE', 'ENDPROCEDURE', 'ENDFUNCTION', 'ENDTYPE'}
+
+
+def open_blocks(code):
+    """Counts the blocks the code opens and does not close
+
+    Arguments:
+        code {str} -- The code, with EOL between every line
+
+    Returns:
+        int -- The number of blocks still open. 0 if the code cannot be lexed, so that the Analyzer reports the error
+    """
+    lexer = Lexer(code)
+    depth = 0
+    previous = None
+    line_number = 0
+
+    try:
+        token = lexer.next_token()
+        while token.type != 'EOF':
+            starts_line = lexer.line_number != line_number
+            if token.type == 'KEYWORD':
+                if (token.value in BLOCK_STARTS and starts_line) or (token.value == 'OF' and previous == 'CASE'):
+                    depth += 1
+                elif token.value in BLOCK_ENDS:
+                    depth -= 1
+
+            previous = token.value
+            line_number = lexer.line_number
+            token = lexer.next_token()
+    except Exception:
+        return 0
+
+    return depth
+
+
+class Repl():
+    """Reads pseudocode an entry at a time and runs every entry in the same Interpreter, so that what one entry
+    declares (variables, arrays, constants, procedures, functions and types) can be used by the entries after it"""
+
+    def __init__(self, interpreter=None):
+        """Initializes a REPL
+
+        Keyword Arguments:
+            interpreter {Interpreter} -- The Interpreter entries are run in, or None for a new one (default: {None})
+        """
+        self.interpreter = interpreter if interpreter is not None else Interpreter()
+
+    def run(self, source):
+        """Parses and runs one entry. Only the entry is parsed, nothing entered before it is run again
+
+        Arguments:
+            source {str} -- The lines of the entry
+        """
+        code = join_lines(source)
+        tree = Analyzer(code).block(['EOF'])
+        try:
+            self.interpreter.execute(tree, close_files=False)
+        except BaseException:
+            # The next entry runs in the global scope, whichever procedure or function the error stopped in
+            self.reset_scope()
+            raise
+
+    def reset_scope(self):
+        """Makes the global scope the current scope of the Interpreter again"""
+        self.interpreter.CURRENT_SCOPE = self.interpreter.SCOPES['GLOBAL']
+        self.interpreter.PARENT_SCOPE = None
+
+    def read_entry(self):
+        """Reads lines until every block they open is closed
+
+        Returns:
+            str -- The lines of the entry, or None at the end of input
+        """
+        lines = []
+        while True:
+            try:
+                line = input(CONTINUATION_PROMPT if lines else PROMPT)
+            except EOFError:
+                if lines:
+                    # Runs what there is, so that the Analyzer reports the unclosed block
+                    return '\n'.join(lines)
+
+                return None
+
+            lines.append(line)
+            source = '\n'.join(lines)
+            if source.strip() and open_blocks(join_lines(source)) <= 0:
+                return source
+
+            if not source.strip():
+                lines = []
+
+    def loop(self):
+        """Runs entries until the end of input. Errors are shown and the REPL carries on with what was declared
+        before them"""
+        while True:
+            try:
+                source = self.read_entry()
+                if source is None:
+                    break
+
+                self.run(source)
+            except KeyboardInterrupt:
+                self.reset_scope()
+                print('KeyboardInterrupt', file=sys.stderr)
+            except Exception as error:
+                self.reset_scope()
+                sys.stdout.flush()
+                print('{}: {}'.format(type(error).__name__, error), file=sys.stderr)
+
+        print()
+        self.interpreter.FILES.close_all()
+
+
+def parse_arguments(argv):
+    """Parses the command-line arguments
+
+    Arguments:
+        argv {list{str}} -- The arguments, without the name of the program
+
+    Returns:
+        argparse.Namespace -- The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog='pseudocode-repl',
+        description='Runs CAIE pseudocode interactively, keeping everything declared between entries',
+        epilog='An entry ends at the end of a line once every block it opens (IF, CASE, FOR, REPEAT, WHILE, '
+               'PROCEDURE, FUNCTION, TYPE) is closed. Ctrl-C stops the running entry, Ctrl-D exits')
+    parser.add_argument('paths', nargs='*', metavar='FILE',
+                        help='.psc files to run before the first entry, so that their declarations can be used')
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Runs the REPL given on the command line
+
+    Keyword Arguments:
+        argv {list{str}} -- The arguments, or None to use sys.argv (default: {None})
+
+    Returns:
+        int -- The exit code
+    """
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    load_plugins()
+
+    repl = Repl()
+    for path in arguments.paths:
+        try:
+            code = read_source(path)
+            if code:
+                repl.interpreter.execute(Analyzer(code).block(['EOF']), close_files=False)
+        except Exception as error:
+            print('{}: {}: {}'.format(path, type(error).__name__, error), file=sys.stderr)
+            return 1
+
+    repl.loop()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,9 @@
 from copy import deepcopy
 from helperclass import *
+from data_types import Array
 
 class Scope():
-    def __init__(self, PARENT_SCOPE=None, block=None, parameters=[], return_type=[]):
+    def __init__(self, PARENT_SCOPE=None, block=None, parameters=None, return_type=[]):
         """Initializes a Scope object
 
         Keyword Arguments:
@@ -13,7 +14,7 @@ class Scope():
         """
         self.SYMBOL_TABLE = SymbolTable()
         self.PARENT_SCOPE = PARENT_SCOPE
-        self.parameters = parameters
+        self.parameters = parameters if parameters is not None else []
         self.block = block
         self.return_type = return_type
         self.DATA_TYPES = {}
@@ -47,16 +48,16 @@ class Scope():
         # # Sends the data to the respective data_types.py class
         # self.VALUES[variable_name].assign(data)
         if isinstance(variable_name, ArrayAssignment):
-            print(variable_name.name)
-            if self.VALUES.get(variable_name.name) is None:
-                # Set the instance of variable_name in VALUES to None
-                # This will only be accessed when declaring the variable
-                print('its none')
-                self.VALUES[variable_name.name] = data[0]  # always None
+            # Sends the value and indexes to the Array
+            self.VALUES[variable_name.name].assign((data[0], variable_name.indexes))
+        elif isinstance(variable_name, TypeAssignment):
+            record = variable_name.name
+            if isinstance(record, ArrayAssignment):
+                # Sends the value, indexes and field to the Array of records
+                self.VALUES[record.name].assign((data[0], record.indexes, variable_name.field))
             else:
-                # Set the instance of variable_name in VALUES to data[0]
-                print(data[0])
-                self.VALUES[variable_name.name].assign(data)
+                # Sends the value and field to the record
+                self.VALUES[record].assign((data[0], variable_name.field))
         else:
             if self.VALUES.get(variable_name) is None:
                 # Set the instance of variable_name in VALUES to None
@@ -66,8 +67,6 @@ class Scope():
                 # Set the instance of variable_name in VALUES to data[0]
                 self.VALUES[variable_name].assign(data)
 
-        
-
     def get(self, variable_name):
         """Fetches the value of an instance stored inside VALUES
 
@@ -82,6 +81,41 @@ class Scope():
         else:
             return None
 
+    def __deepcopy__(self, memo):
+        """Copies the SYMBOL_TABLE and VALUES of a Scope, sharing everything that is never changed once declared
+
+        Returns:
+            Scope -- The copy of the Scope
+        """
+        scope = type(self).__new__(type(self))
+        scope.__dict__.update(self.__dict__)
+        scope.SYMBOL_TABLE = deepcopy(self.SYMBOL_TABLE, memo)
+        scope.VALUES = deepcopy(self.VALUES, memo)
+
+        return scope
+
+    def call_copy(self, shared):
+        """Copies a Scope the way deepcopy() does, except that the instances named in shared are shared rather than
+        copied. Only instances that a call never writes to, and that are not arrays, can be shared
+
+        Arguments:
+            shared {set{str}} -- The names of the instances to share
+
+        Returns:
+            Scope -- The copy of the Scope
+        """
+        scope = type(self).__new__(type(self))
+        scope.__dict__.update(self.__dict__)
+
+        # Calls only add to the symbol table, so the metadata in it is shared
+        scope.SYMBOL_TABLE = SymbolTable()
+        scope.SYMBOL_TABLE.SYMBOL_TABLE = dict(self.SYMBOL_TABLE.SYMBOL_TABLE)
+
+        memo = {}
+        scope.VALUES = {name: value if name in shared else deepcopy(value, memo) for name, value in self.VALUES.items()}
+
+        return scope
+
     def init_data_types(self):
         self.DATA_TYPES['INTEGER'] = int
         self.DATA_TYPES['STRING'] = str
@@ -89,7 +123,17 @@ class Scope():
         self.DATA_TYPES['BOOLEAN'] = bool
         self.DATA_TYPES['CHAR'] = str
 
-    def clear(self):
+    def clear(self, keep=None):
+        """Lets go of the instances of a call once it has returned
+
+        Keyword Arguments:
+            keep {object} -- The value returned by the call, which outlives the scope and so is not released
+                (default: {None})
+        """
+        for value in self.VALUES.values():
+            if isinstance(value, Array) and value is not keep:
+                value.release()
+
         self.VALUES = None
         self.parameters = None
 
@@ -0,0 +1,379 @@
+from analyzer import Analyzer
+from file_handler import BUFFER_SIZE
+from function import load_plugins
+from interpreter import Interpreter
+from limits import Limits
+from main import EXIT_OK, add_limit_arguments, count_tokens, error_code, join_lines, peak_memory
+import argparse
+import hashlib
+import io
+import json
+import os
+import select
+import signal
+import socket
+import stat
+import sys
+import tempfile
+import time
+import traceback
+
+# The socket the server listens on unless --socket is given. One per user, so that servers are not shared
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'pseudocode-{}.sock'.format(os.getuid()))
+
+# The number of parsed programs every worker keeps, so that runs of the same program are only parsed once
+CACHE_SIZE = 256
+
+# The number of runs a worker serves before it is replaced, so that anything a run leaves behind is let go
+MAX_RUNS = 1000
+
+# The connections waiting to be accepted by a worker
+BACKLOG = 128
+
+# The limits of a run, in the order Limits takes them
+LIMIT_NAMES = ('steps', 'seconds', 'elements', 'memory')
+
+# The most seconds a run may take unless --max-seconds is given, so that a program that never ends does not hold a
+# worker forever
+SECONDS = 60
+
+
+def send_message(file, message):
+    """Writes a message as one line of JSON
+
+    Arguments:
+        file {file} -- The binary file of a socket
+        message {dict} -- The message
+    """
+    file.write(json.dumps(message).encode('utf-8') + b'\n')
+    file.flush()
+
+
+def receive_message(file):
+    """Reads a message written by send_message()
+
+    Arguments:
+        file {file} -- The binary file of a socket
+
+    Returns:
+        dict -- The message, or None if the other side closed the socket first
+    """
+    line = file.readline()
+    if not line:
+        return None
+
+    return json.loads(line.decode('utf-8'))
+
+
+def parse(source, trees):
+    """Parses a program, reusing the tree if this worker has already parsed the same source
+
+    Arguments:
+        source {str} -- The text of the .psc file
+        trees {dict} -- The parsed programs of this worker, by hash of their source
+
+    Returns:
+        tuple{Block, bool} -- The tree of the program (None if it is empty), and whether it came from trees
+    """
+    key = hashlib.sha1(source.encode('utf-8')).hexdigest()
+    if key in trees:
+        return trees[key], True
+
+    if len(trees) >= CACHE_SIZE:
+        del trees[next(iter(trees))]
+
+    code = join_lines(source)
+    trees[key] = Analyzer(code).block(['EOF']) if code else None
+
+    return trees[key], False
+
+
+def run_request(request, trees, default_limits):
+    """Runs the program of a request. Runs in a worker
+
+    A request has the "source" of the program and optionally its "stdin", the "cwd" files are opened from, the
+    "limits" and "options" of the run, and whether the "traceback" and "stats" of an error are wanted
+
+    Arguments:
+        request {dict} -- The request
+        trees {dict} -- The parsed programs of this worker, by hash of their source
+        default_limits {dict} -- The limits of runs that do not set their own. A request cannot take one away by
+            setting it to null, or raise one by setting it higher
+
+    Returns:
+        dict -- The "stdout" of the run, the "error" if it failed, its "exit_code" and the "timings" of every phase
+    """
+    response = {'stdout': '', 'error': None, 'exit_code': EXIT_OK, 'timings': {}}
+    stdout = io.StringIO()
+    phase = 'read'
+
+    # The worker serves the next run from where it started, whichever directory this run was in
+    cwd = os.getcwd()
+    try:
+        source = request['source']
+        if request.get('cwd'):
+            os.chdir(request['cwd'])
+
+        if request.get('stats'):
+            phase = 'lex'
+            response['tokens'] = count_tokens(join_lines(source))
+
+        phase = 'parse'
+        start = time.perf_counter()
+        tree, response['cached'] = parse(source, trees)
+        response['timings']['parse'] = time.perf_counter() - start
+
+        # A request can lower a server limit but not raise it
+        limits = dict(default_limits)
+        for name, limit in (request.get('limits') or {}).items():
+            if limit is not None:
+                limits[name] = limit if limits.get(name) is None else min(limit, limits[name])
+        limits = [limits.get(name) for name in LIMIT_NAMES]
+
+        phase = 'execute'
+        start = time.perf_counter()
+        options = request.get('options') or {}
+        interpreter = Interpreter(
+            buffer_size=options.get('buffer_size', BUFFER_SIZE),
+            memory_map=options.get('mmap', False),
+            write_behind=options.get('write_behind', False),
+            stdin=io.StringIO(request.get('stdin') or ''),
+            stdout=stdout,
+            limits=Limits(*limits) if any(limit is not None for limit in limits) else None
+        )
+        if tree is not None:
+            interpreter.execute(tree)
+        response['timings']['execute'] = time.perf_counter() - start
+    except Exception as error:
+        response['error'] = '{}: {}'.format(type(error).__name__, error)
+        response['exit_code'] = error_code(phase, error)
+        if request.get('traceback'):
+            response['traceback'] = traceback.format_exc()
+    finally:
+        os.chdir(cwd)
+
+    response['stdout'] = stdout.getvalue()
+    if request.get('stats'):
+        response['peak_memory'] = peak_memory()
+
+    return response
+
+
+def work(listener, parent, default_limits, max_runs):
+    """Serves runs from the listening socket until max_runs have been served or the server stops. Runs in a worker
+
+    Arguments:
+        listener {socket.socket} -- The listening socket, shared by every worker. Does not block
+        parent {int} -- The end of a pipe that is only closed when the server exits
+        default_limits {dict} -- The limits of runs that do not set their own
+        max_runs {int} -- The number of runs to serve before exiting
+    """
+    trees = {}
+    runs = 0
+
+    while runs < max_runs:
+        ready, _, _ = select.select([listener, parent], [], [])
+        if parent in ready:
+            # The server died without stopping its workers
+            return
+
+        try:
+            connection, _ = listener.accept()
+        except BlockingIOError:
+            # Another worker took the connection
+            continue
+
+        runs += 1
+        connection.setblocking(True)
+        with connection, connection.makefile('rwb') as file:
+            try:
+                request = receive_message(file)
+                if request is None:
+                    continue
+
+                send_message(file, run_request(request, trees, default_limits))
+            except (OSError, ValueError):
+                # The client went away or did not send JSON. Either way there is no one to answer
+                continue
+
+
+def start_worker(listener, parent, default_limits, max_runs):
+    """Forks a worker process, which has every module already imported
+
+    Arguments:
+        listener {socket.socket} -- The listening socket, shared by every worker
+        parent {tuple{int}} -- The read and write ends of the pipe that tells workers the server has exited
+        default_limits {dict} -- The limits of runs that do not set their own
+        max_runs {int} -- The number of runs the worker serves before exiting
+
+    Returns:
+        int -- The process ID of the worker
+    """
+    pid = os.fork()
+    if pid != 0:
+        return pid
+
+    # Interrupting the server only stops the parent, which stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    exit_code = 0
+    try:
+        os.close(parent[1])
+        work(listener, parent[0], default_limits, max_runs)
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+
+def listen(path):
+    """Opens the listening socket, replacing the socket of a server that is no longer running
+
+    Arguments:
+        path {str} -- The path of the socket
+
+    Returns:
+        socket.socket -- The listening socket
+    """
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise OSError('{} exists and is not a socket'.format(path))
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            raise OSError('A server is already listening on {}'.format(path))
+        finally:
+            probe.close()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    # Only the user who started the server can run programs with it
+    os.chmod(path, 0o600)
+    listener.listen(BACKLOG)
+
+    return listener
+
+
+def stop_server(signum, frame):
+    """Stops the server on SIGTERM the same way as on Ctrl-C"""
+    raise KeyboardInterrupt()
+
+
+def serve(path, workers, default_limits=None, max_runs=MAX_RUNS):
+    """Listens on a Unix socket and hands every run to one of a set of pre-forked workers until interrupted
+
+    Workers that exit, whether they served max_runs or crashed, are replaced
+
+    Arguments:
+        path {str} -- The path of the socket
+        workers {int} -- The number of worker processes
+
+    Keyword Arguments:
+        default_limits {dict} -- The limits of runs that do not set their own (default: {None})
+        max_runs {int} -- The number of runs every worker serves before it is replaced (default: {MAX_RUNS})
+    """
+    default_limits = default_limits or {}
+    listener = listen(path)
+    listener.setblocking(False)
+    parent = os.pipe()
+    print('Listening on {} with {} worker(s)'.format(path, workers), file=sys.stderr)
+    pids = set()
+    signal.signal(signal.SIGTERM, stop_server)
+
+    try:
+        for _ in range(0, workers):
+            pids.add(start_worker(listener, parent, default_limits, max_runs))
+
+        while True:
+            pid, _ = os.wait()
+            if pid in pids:
+                pids.remove(pid)
+                pids.add(start_worker(listener, parent, default_limits, max_runs))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+
+        listener.close()
+        os.close(parent[0])
+        os.close(parent[1])
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def parse_arguments(argv):
+    """Parses the command-line arguments
+
+    Arguments:
+        argv {list{str}} -- The arguments, without the name of the program
+
+    Returns:
+        argparse.Namespace -- The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog='pseudocode-server',
+        description='Keeps the interpreter loaded and runs programs sent by client.py over a Unix socket',
+        epilog='Every run is handed to a worker forked once at startup, which keeps the trees of the programs it '
+               'has parsed. Runs are stopped after {} seconds unless --max-seconds is given. Stop the server with '
+               'Ctrl-C or SIGTERM'.format(SECONDS))
+    parser.add_argument('--socket', default=SOCKET_PATH, metavar='PATH',
+                        help='the socket to listen on (default: %(default)s)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='the number of worker processes (default: the number of cores, %(default)s)')
+    parser.add_argument('--max-runs', type=int, default=MAX_RUNS, metavar='RUNS',
+                        help='the number of runs a worker serves before it is replaced (default: %(default)s)')
+
+    add_limit_arguments(parser)
+    parser.set_defaults(max_seconds=SECONDS)
+
+    arguments = parser.parse_args(argv)
+    if arguments.workers < 1:
+        parser.error('--workers must be at least 1')
+    if arguments.max_runs < 1:
+        parser.error('--max-runs must be at least 1')
+
+    return arguments
+
+
+def main(argv=None):
+    """Runs the server given on the command line
+
+    Keyword Arguments:
+        argv {list{str}} -- The arguments, or None to use sys.argv (default: {None})
+
+    Returns:
+        int -- The exit code
+    """
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    load_plugins()
+
+    default_limits = {
+        'steps': arguments.max_steps,
+        'seconds': arguments.max_seconds,
+        'elements': arguments.max_elements,
+        'memory': arguments.max_memory
+    }
+
+    try:
+        serve(arguments.socket, arguments.workers,
+              {name: limit for name, limit in default_limits.items() if limit is not None}, arguments.max_runs)
+    except OSError as error:
+        print('{}: {}'.format(type(error).__name__, error), file=sys.stderr)
+        return 4
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
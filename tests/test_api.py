@@ -0,0 +1,98 @@
+from api import compile
+import api
+import os
+import pytest
+import time
+
+
+PROGRAM = '''DECLARE line : STRING
+OPENFILE "{}" FOR READ
+READFILE "{}", line
+CLOSEFILE "{}"
+OUTPUT line'''
+
+
+def read_program(name):
+    return compile(PROGRAM.format(name, name, name))
+
+
+def test_run_reads_given_files():
+    result = read_program('input.txt').run(files={'input.txt': 'hello\n'})
+
+    assert result.ok
+    assert result.output == 'hello\n'
+
+
+@pytest.mark.parametrize('name', ['../secret.txt', 'sub/../../secret.txt'])
+def test_openfile_cannot_leave_the_directory_through_parent(tmp_path, name):
+    run = tmp_path / 'run'
+    run.mkdir()
+    (tmp_path / 'secret.txt').write_text('secret\n')
+
+    result = read_program(name).run(directory=str(run))
+
+    assert not result.ok
+    assert isinstance(result.error.exception, IOError)
+    assert 'secret' not in result.output
+
+
+def test_openfile_cannot_leave_the_directory_through_absolute_path(tmp_path):
+    run = tmp_path / 'run'
+    run.mkdir()
+    secret = tmp_path / 'secret.txt'
+    secret.write_text('secret\n')
+
+    result = read_program(str(secret)).run(directory=str(run))
+
+    assert not result.ok
+    assert isinstance(result.error.exception, IOError)
+
+
+def test_openfile_cannot_leave_the_directory_through_link(tmp_path):
+    run = tmp_path / 'run'
+    run.mkdir()
+    secret = tmp_path / 'secret.txt'
+    secret.write_text('secret\n')
+    os.symlink(str(secret), str(run / 'link.txt'))
+
+    result = read_program('link.txt').run(directory=str(run))
+
+    assert not result.ok
+    assert isinstance(result.error.exception, IOError)
+
+
+@pytest.mark.parametrize('name', ['../escaped.txt', '/tmp/escaped.txt'])
+def test_given_files_cannot_leave_the_directory(tmp_path, name):
+    run = tmp_path / 'run'
+    run.mkdir()
+
+    with pytest.raises(ValueError):
+        read_program('input.txt').run(files={name: 'x\n'}, directory=str(run))
+
+    with pytest.raises(ValueError):
+        read_program('input.txt').run(files={name: 'x\n'})
+
+    assert not (tmp_path / 'escaped.txt').exists()
+
+
+def test_run_refuses_a_memory_limit():
+    program = compile('OUTPUT 1')
+
+    with pytest.raises(ValueError):
+        program.run(limits={'memory': 512})
+
+    assert program.run(limits={'steps': 100}).output == '1\n'
+
+
+def test_run_only_times_the_program(monkeypatch):
+    interpreter = api.Interpreter
+
+    def slow_interpreter(*arguments, **keywords):
+        time.sleep(0.5)
+        return interpreter(*arguments, **keywords)
+
+    monkeypatch.setattr(api, 'Interpreter', slow_interpreter)
+    result = compile('OUTPUT 1').run(files={'input.txt': 'x' * 10 ** 6})
+
+    assert result.output == '1\n'
+    assert 0 < result.seconds < 0.25
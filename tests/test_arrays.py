@@ -0,0 +1,84 @@
+from api import compile
+
+
+def run(code):
+    result = compile(code).run()
+    assert result.ok, result.error
+    return result.output.splitlines()
+
+
+def test_returned_byval_array_is_a_copy():
+    assert run('''FUNCTION Same(BYVAL a : ARRAY[1:3] OF INTEGER) : ARRAY[1:3] OF INTEGER
+    RETURN a
+ENDFUNCTION
+DECLARE x : ARRAY[1:3] OF INTEGER
+DECLARE y : ARRAY[1:3] OF INTEGER
+x[1] <- 1
+x[2] <- 0
+y <- CALL Same(x)
+x[1] <- 100
+OUTPUT y[1]
+y[2] <- 7
+OUTPUT x[2]
+x[1] <- 5
+OUTPUT y[1]''') == ['1', '0', '1']
+
+
+def test_assigned_array_is_a_copy():
+    assert run('''DECLARE x : ARRAY[1:3] OF INTEGER
+DECLARE y : ARRAY[1:3] OF INTEGER
+x[1] <- 1
+x[2] <- 0
+y <- x
+x[1] <- 2
+y[2] <- 3
+OUTPUT y[1]
+OUTPUT x[1]
+OUTPUT x[2]''') == ['1', '2', '0']
+
+
+def test_byval_array_is_a_copy():
+    assert run('''PROCEDURE Change(BYVAL a : ARRAY[1:3] OF INTEGER)
+    a[1] <- 100
+    OUTPUT a[1]
+ENDPROCEDURE
+DECLARE x : ARRAY[1:3] OF INTEGER
+x[1] <- 1
+CALL Change(x)
+CALL Change(x)
+OUTPUT x[1]''') == ['100', '100', '1']
+
+
+def test_two_dimensional_array_is_copied_in_every_dimension():
+    assert run('''PROCEDURE Change(BYVAL a : ARRAY[1:2, 1:2] OF INTEGER)
+    a[2, 2] <- 100
+ENDPROCEDURE
+DECLARE x : ARRAY[1:2, 1:2] OF INTEGER
+DECLARE y : ARRAY[1:2, 1:2] OF INTEGER
+x[2, 2] <- 1
+x[2, 1] <- 0
+y <- x
+y[2, 1] <- 5
+CALL Change(x)
+OUTPUT x[2, 2]
+OUTPUT x[2, 1]
+OUTPUT y[2, 2]''') == ['1', '0', '1']
+
+
+def test_recursion_gives_every_call_its_own_copy():
+    assert run('''FUNCTION Sum(BYVAL a : ARRAY[1:4] OF INTEGER, BYVAL n : INTEGER) : INTEGER
+    DECLARE first : INTEGER
+    first <- a[n]
+    a[n] <- 0
+    IF n = 1 THEN
+        RETURN first
+    ENDIF
+    RETURN first + CALL Sum(a, n - 1) + a[n]
+ENDFUNCTION
+DECLARE x : ARRAY[1:4] OF INTEGER
+DECLARE i : INTEGER
+FOR i <- 1 TO 4
+    x[i] <- i
+ENDFOR
+OUTPUT CALL Sum(x, 4)
+OUTPUT x[4]''') == ['10', '4']
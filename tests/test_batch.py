@@ -0,0 +1,65 @@
+from batch import run_batch
+from function import BUILTIN_FUNCTIONS, register_builtin
+from lexer import Lexer
+import io
+import json
+import os
+import pytest
+
+
+def crash(code):
+    os._exit(code)
+
+
+@pytest.fixture
+def crashing_function():
+    # Workers are forked from the test, so they have the function too
+    register_builtin('CRASHWORKER', ['INTEGER'], 'INTEGER', crash)
+    yield
+    del BUILTIN_FUNCTIONS['CRASHWORKER']
+    Lexer.tokens['BUILTIN_FUNCTION'].remove('CRASHWORKER')
+
+
+def write_job(directory, name, code, expected):
+    program = directory / (name + '.psc')
+    program.write_text(code)
+    output = directory / (name + '.out')
+    output.write_text(expected)
+    return {'id': name, 'program': str(program), 'input': None, 'expected': str(output)}
+
+
+def run(jobs, workers):
+    results = io.StringIO()
+    counts = run_batch(jobs, workers, 10, None, results)
+    return counts, {result['id']: result for result in map(json.loads, results.getvalue().splitlines())}
+
+
+def test_only_the_job_that_kills_its_worker_is_blamed(tmp_path, crashing_function):
+    jobs = [write_job(tmp_path, 'ok{}'.format(number), 'OUTPUT {}'.format(number), '{}\n'.format(number))
+            for number in range(6)]
+    jobs.insert(3, write_job(tmp_path, 'crash', 'OUTPUT CRASHWORKER(1)', ''))
+
+    counts, results = run(jobs, 2)
+
+    assert counts == {'pass': 6, 'crashed': 1}
+    assert results['crash']['status'] == 'crashed'
+
+
+def test_every_job_has_a_directory_of_its_own(tmp_path):
+    code = '''DECLARE line : STRING
+OPENFILE "shared.txt" FOR APPEND
+WRITEFILE "shared.txt", "{}"
+CLOSEFILE "shared.txt"
+OPENFILE "shared.txt" FOR READ
+WHILE NOT EOF("shared.txt")
+    READFILE "shared.txt", line
+    OUTPUT line
+ENDWHILE
+CLOSEFILE "shared.txt"'''
+    jobs = [write_job(tmp_path, 'job{}'.format(number), code.format(number), '{}\n'.format(number))
+            for number in range(4)]
+
+    counts, results = run(jobs, 2)
+
+    assert counts == {'pass': 4}
+    assert not os.path.exists('shared.txt')
@@ -0,0 +1,26 @@
+from benchmark import PHASES, compare
+
+
+def make_results(seconds):
+    return {'benchmarks': {'loops': dict({phase: {'min': seconds[phase]} for phase in PHASES}, output='1\n')}}
+
+
+def regressions(baseline, current, **options):
+    comparisons = compare(make_results(current), make_results(baseline), **options)
+    return {comparison['phase'] for comparison in comparisons if comparison['regression']}
+
+
+def test_short_phases_are_not_regressions_from_noise():
+    baseline = {'lex': 0.0002, 'parse': 0.0004, 'execute': 0.5}
+    current = {'lex': 0.0004, 'parse': 0.0009, 'execute': 0.5}
+
+    assert regressions(baseline, current) == set()
+    assert regressions(baseline, current, min_difference=0) == {'lex', 'parse'}
+
+
+def test_long_phases_are_regressions_past_the_threshold():
+    baseline = {'lex': 0.001, 'parse': 0.002, 'execute': 0.5}
+    current = {'lex': 0.001, 'parse': 0.002, 'execute': 0.6}
+
+    assert regressions(baseline, current) == {'execute'}
+    assert regressions(baseline, current, threshold=0.25) == set()
@@ -0,0 +1,112 @@
+from api import compile
+from function import BUILTIN_FUNCTIONS, builtin, load_plugins, register_builtin
+from lexer import Lexer
+import function
+import pytest
+
+
+@pytest.fixture
+def registered():
+    """Takes the built-in functions a test registers out of the registry again"""
+    names = []
+    yield names
+
+    for name in names:
+        BUILTIN_FUNCTIONS.pop(name, None)
+        if name in Lexer.tokens['BUILTIN_FUNCTION']:
+            Lexer.tokens['BUILTIN_FUNCTION'].remove(name)
+
+
+def test_builtin_functions_are_called_with_their_parameters():
+    program = compile('''OUTPUT LENGTH("hello")
+OUTPUT UCASE("a")
+OUTPUT TONUM("7") + 1
+OUTPUT CONCAT("a", "b", "c")
+OUTPUT STR(2.5)
+OUTPUT CHARACTERCOUNT("abc")''')
+
+    # The parsed tree is not changed by running it
+    for i in range(0, 2):
+        result = program.run()
+        assert result.ok, result.error
+        assert result.output == '5\nA\n8\nabc\n2.5\n3\n'
+
+
+@pytest.mark.parametrize('call', ['LENGTH("a", "b")', 'MID("abc", 1)', 'CONCAT("a")'])
+def test_wrong_number_of_parameters_is_found_before_the_program_runs(call):
+    with pytest.raises(SyntaxError, match='line 2'):
+        compile('OUTPUT "never"\nOUTPUT {}'.format(call))
+
+
+@pytest.mark.parametrize('call, message', [
+    ('LENGTH(5)', 'LENGTH: Parameter 1'),
+    ('UCASE("ab")', 'UCASE: Parameter 1 must be a CHAR'),
+    ('CONCAT("a", "b", 3)', 'CONCAT: Parameter 3'),
+])
+def test_parameters_are_checked_against_the_signature(call, message):
+    result = compile('OUTPUT {}'.format(call)).run()
+
+    assert isinstance(result.error.exception, TypeError)
+    assert message in result.error.message
+
+
+def test_registered_function_is_called_like_a_core_one(registered):
+    registered.append('TWICE')
+    register_builtin('TWICE', [('INTEGER', 'REAL')], 'REAL', lambda x: x * 2)
+
+    assert compile('OUTPUT TWICE(21)').run().output == '42\n'
+    assert 'TWICE: Parameter 1' in compile('OUTPUT TWICE("x")').run().error.message
+    with pytest.raises(SyntaxError):
+        compile('OUTPUT TWICE(1, 2)')
+
+
+def test_decorated_function_is_registered(registered):
+    registered.append('SHOUT')
+
+    @builtin('SHOUT', ['STRING'], 'STRING', variadic=True)
+    def shout(*words):
+        return ' '.join(words).upper() + '!'
+
+    assert compile('OUTPUT SHOUT("a", "b")').run().output == 'A B!\n'
+
+
+@pytest.mark.parametrize('name', ['OUTPUT', 'TRUE', 'AND', 'READ', 'MY_NAME', '2X', ''])
+def test_reserved_or_invalid_names_are_refused(name, registered):
+    registered.append(name)
+
+    with pytest.raises(NameError):
+        register_builtin(name, [], 'INTEGER', lambda: 1)
+
+
+def test_unknown_data_type_is_refused(registered):
+    registered.append('WRONG')
+
+    with pytest.raises(TypeError):
+        register_builtin('WRONG', ['FLOAT'], 'INTEGER', lambda x: 1)
+
+
+class EntryPoint():
+    """Stands in for an installed entry point"""
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def load(self):
+        return self.value
+
+
+def test_plugins_register_when_loaded(monkeypatch, registered):
+    registered.extend(['PLUGGED', 'IMPORTED'])
+
+    def register():
+        register_builtin('PLUGGED', ['INTEGER'], 'INTEGER', lambda x: x + 1)
+
+    # A module registers its functions when it is imported, before load() returns it
+    register_builtin('IMPORTED', [], 'STRING', lambda: 'module')
+    plugins = [EntryPoint('callable', register), EntryPoint('module', function)]
+    monkeypatch.setattr(function, 'entry_points', lambda group: plugins if group == 'test.group' else [])
+
+    assert load_plugins('test.group') == ['callable', 'module']
+    assert load_plugins() == []
+    assert compile('OUTPUT PLUGGED(1)\nOUTPUT IMPORTED()').run().output == '2\nmodule\n'
@@ -0,0 +1,64 @@
+from api import compile
+import pytest
+
+
+def run(code):
+    return compile(code).run()
+
+
+def test_byref_binds_instances_of_the_parameter_type():
+    result = run('''TYPE Point
+    DECLARE X : REAL
+ENDTYPE
+PROCEDURE Bump(BYREF n : INTEGER)
+    n <- n + 1
+ENDPROCEDURE
+PROCEDURE Move(BYREF p : Point)
+    p.X <- p.X + 0.5
+ENDPROCEDURE
+PROCEDURE BumpAll(BYREF a : ARRAY[1:3] OF INTEGER)
+    CALL Bump(a[2])
+ENDPROCEDURE
+DECLARE i : INTEGER
+DECLARE Data : ARRAY[1:3] OF INTEGER
+DECLARE Points : ARRAY[1:2] OF Point
+i <- 1
+Data[2] <- 5
+Points[1].X <- 1.0
+CALL Bump(i)
+CALL BumpAll(Data)
+CALL Move(Points[1])
+OUTPUT i
+OUTPUT Data[2]
+OUTPUT Points[1].X''')
+
+    assert result.ok, result.error
+    assert result.output == '2\n6\n1.5\n'
+
+
+@pytest.mark.parametrize('declaration, argument, passed', [
+    ('DECLARE s : STRING\ns <- "abc"', 's', 'STRING'),
+    ('DECLARE r : REAL\nr <- 1.5', 'r', 'REAL'),
+    ('DECLARE a : ARRAY[1:3] OF INTEGER', 'a', '1D ARRAY OF INTEGER'),
+    ('DECLARE a : ARRAY[1:3] OF STRING', 'a[1]', 'STRING'),
+])
+def test_byref_refuses_instances_of_another_type(declaration, argument, passed):
+    result = run('''PROCEDURE Bump(BYREF n : INTEGER)
+    n <- n + 1
+ENDPROCEDURE
+{}
+CALL Bump({})'''.format(declaration, argument))
+
+    assert isinstance(result.error.exception, TypeError)
+    assert '{} cannot be passed into BYREF n : INTEGER of Bump'.format(passed) in result.error.message
+
+
+def test_byref_refuses_arrays_of_another_element_type():
+    result = run('''PROCEDURE Fill(BYREF a : ARRAY[1:3] OF INTEGER)
+    a[1] <- 1
+ENDPROCEDURE
+DECLARE Data : ARRAY[1:3] OF REAL
+CALL Fill(Data)''')
+
+    assert isinstance(result.error.exception, TypeError)
+
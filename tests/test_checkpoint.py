@@ -0,0 +1,47 @@
+from analyzer import Analyzer
+from checkpoint import Checkpointer
+from interpreter import Interpreter
+from main import join_lines
+import io
+
+
+def run(source, path, every):
+    code = join_lines(source)
+    tree = Analyzer(code).block(['EOF'])
+    log = io.StringIO()
+    checkpointer = Checkpointer(str(path), tree, code, every, log)
+    interpreter = Interpreter(stdin=io.StringIO(), stdout=io.StringIO(), checkpointer=checkpointer)
+    interpreter.execute(tree)
+    return checkpointer, log.getvalue()
+
+
+def test_checkpoint_due_inside_a_call_is_put_off_with_a_warning(tmp_path):
+    source = '''PROCEDURE Main()
+    DECLARE i : INTEGER
+    DECLARE total : INTEGER
+    total <- 0
+    FOR i <- 1 TO 100
+        total <- total + i
+    ENDFOR
+    OUTPUT total
+ENDPROCEDURE
+CALL Main()
+OUTPUT "done"'''
+
+    checkpointer, log = run(source, tmp_path / 'state.chk', 10)
+
+    assert log.count('put off') == 1
+    # Saved once the call has returned
+    assert [line for line, _, _ in checkpointer.checkpoints] == [11]
+
+
+def test_checkpoint_outside_calls_is_saved_without_a_warning(tmp_path):
+    source = '''DECLARE i : INTEGER
+FOR i <- 1 TO 20
+    OUTPUT i
+ENDFOR'''
+
+    checkpointer, log = run(source, tmp_path / 'state.chk', 10)
+
+    assert 'put off' not in log
+    assert len(checkpointer.checkpoints) > 0
@@ -0,0 +1,23 @@
+from analyzer import Analyzer
+from debugger import Debugger
+from interpreter import Interpreter
+from main import join_lines
+import io
+
+
+def test_vars_shows_declared_variables_without_a_value():
+    source = '''DECLARE x : INTEGER
+DECLARE y : INTEGER
+DECLARE s : STRING
+x <- 3
+OUTPUT x'''
+    output = io.StringIO()
+    debugger = Debugger(commands=io.StringIO('break 5\ncontinue\nvars\ncontinue\n'), output=output, source=source)
+    interpreter = Interpreter(stdin=io.StringIO(), stdout=io.StringIO(), debugger=debugger)
+
+    interpreter.execute(Analyzer(join_lines(source)).block(['EOF']))
+
+    lines = [line.replace('(debug) ', '') for line in output.getvalue().splitlines()]
+    assert 'x = 3' in lines
+    assert 'y = (not assigned)' in lines
+    assert 's = (not assigned)' in lines
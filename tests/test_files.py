@@ -0,0 +1,223 @@
+from api import compile
+import errno
+from file_handler import BATCH_SIZE, BUFFER_SIZE, FileReader, FileTable, MappedFileReader
+import file_handler
+import pytest
+
+# Copies in.txt to out.txt a line at a time, appends to it and outputs the number of lines
+COPY = compile('''DECLARE line : STRING
+DECLARE count : INTEGER
+count <- 0
+OPENFILE "in.txt" FOR READ
+OPENFILE "out.txt" FOR WRITE
+WHILE NOT EOF("in.txt")
+    READFILE "in.txt", line
+    WRITEFILE "out.txt", line
+    count <- count + 1
+ENDWHILE
+CLOSEFILE "in.txt"
+CLOSEFILE "out.txt"
+OPENFILE "out.txt" FOR APPEND
+WRITEFILE "out.txt", "end"
+CLOSEFILE "out.txt"
+OUTPUT count''')
+
+TEXTS = ['', 'a', 'a\n', '\n\n', 'one\r\ntwo\r\n', 'é€\nlast', 'z' * 100000 + '\nshort\n',
+         ''.join('{}\n'.format(i) for i in range(0, 20000))]
+
+
+def lines_of(text):
+    """The lines READFILE reads from text, worked out without going through a file"""
+    lines = text.replace('\r\n', '\n').split('\n')
+    return lines[:-1] if lines[-1] == '' else lines
+
+
+def copied(text, **options):
+    result = COPY.run(files={'in.txt': text}, **options)
+    assert result.ok, result.error
+
+    return result.output, result.files['out.txt']
+
+
+class FullFile():
+    """Stands in for a file on a full disk"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, text):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def fail_writes(table, name):
+    """Opens name for WRITE through a thread whose writes fail, and waits for the first of them to fail"""
+    handle = table.open(name, 'WRITE')
+    handle.file = FullFile(handle.file)
+    handle.write_lines(['line'] * BATCH_SIZE)
+    handle.queue.join()
+
+    return handle
+
+
+def test_write_error_is_raised_by_the_next_operation_on_another_file(tmp_path):
+    table = FileTable(write_behind=True, directory=str(tmp_path))
+    fail_writes(table, 'full.txt')
+    (tmp_path / 'other.txt').write_text('x\n')
+
+    with pytest.raises(IOError, match='full.txt'):
+        table.open('other.txt', 'READ')
+
+    # The error is raised once
+    table.open('other.txt', 'READ')
+    table.close_all()
+
+
+def test_write_error_is_raised_when_the_files_are_closed_at_the_end(tmp_path):
+    table = FileTable(write_behind=True, directory=str(tmp_path))
+    table.open('other.txt', 'WRITE').write_line('fine')
+    fail_writes(table, 'full.txt')
+
+    # Nothing is done with any file after the write fails, and the other file is still written
+    with pytest.raises(IOError, match='full.txt'):
+        table.close_all()
+
+    assert table.handles == {}
+    assert (tmp_path / 'other.txt').read_text() == 'fine\n'
+
+
+@pytest.mark.parametrize('text', TEXTS)
+@pytest.mark.parametrize('buffer_size', [1, 7, BUFFER_SIZE])
+def test_buffered_files_read_and_write_every_line_as_it_is(text, buffer_size):
+    lines = lines_of(text)
+
+    assert copied(text, buffer_size=buffer_size) == (
+        '{}\n'.format(len(lines)), ''.join(line + '\n' for line in lines + ['end']))
+
+
+@pytest.mark.parametrize('source, error', [
+    ('OPENFILE "in.txt" FOR READ\nOPENFILE "in.txt" FOR READ', IOError),
+    ('READFILE "in.txt", line', IOError),
+    ('OPENFILE "in.txt" FOR READ\nWRITEFILE "in.txt", "x"', IOError),
+    ('OPENFILE "out.txt" FOR WRITE\nREADFILE "out.txt", line', IOError),
+    ('OPENFILE "in.txt" FOR READ\nREADFILE "in.txt", line\nREADFILE "in.txt", line', EOFError),
+])
+def test_misused_files_are_refused(source, error):
+    result = compile('DECLARE line : STRING\n' + source).run(files={'in.txt': 'only\n'})
+
+    assert isinstance(result.error.exception, error)
+
+
+def test_files_are_written_when_the_program_stops_with_an_error():
+    result = compile('''OPENFILE "out.txt" FOR WRITE
+WRITEFILE "out.txt", "before"
+OUTPUT 1 / 0''').run(buffer_size=BUFFER_SIZE)
+
+    assert isinstance(result.error.exception, ZeroDivisionError)
+    assert result.files['out.txt'] == 'before\n'
+
+
+@pytest.fixture(params=[file_handler.CHUNK_SIZE, 8])
+def chunk_size(request, monkeypatch):
+    """Also splits files a few bytes at a time, so that lines cross chunks and pages are released as they go"""
+    monkeypatch.setattr(file_handler, 'CHUNK_SIZE', request.param)
+    if request.param < file_handler.RELEASE_SIZE:
+        monkeypatch.setattr(file_handler, 'RELEASE_SIZE', 64)
+
+    return request.param
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_mapped_files_are_read_like_buffered_ones(text, chunk_size):
+    assert copied(text, memory_map=True) == copied(text)
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_mapped_reader_reads_the_lines_of_the_buffered_reader(tmp_path, text, chunk_size):
+    path = tmp_path / 'in.txt'
+    path.write_bytes(text.encode('utf-8'))
+
+    buffered = FileReader(str(path))
+    mapped = MappedFileReader(str(path))
+    while not buffered.eof():
+        assert not mapped.eof()
+        assert mapped.read_line() == buffered.read_line()
+        assert mapped.read_lines(3) == buffered.read_lines(3)
+    assert mapped.eof()
+
+    with pytest.raises(EOFError):
+        mapped.read_line()
+    buffered.close()
+    mapped.close()
+
+
+# Copies in.txt to bulk.txt through an array, and to lines.txt a line at a time
+ARRAY_COPY = '''DECLARE values : ARRAY[1:{size}] OF {data_type}
+DECLARE line : STRING
+OPENFILE "in.txt" FOR READ
+READFILE "in.txt", values
+CLOSEFILE "in.txt"
+OPENFILE "bulk.txt" FOR WRITE
+WRITEFILE "bulk.txt", values
+CLOSEFILE "bulk.txt"
+OPENFILE "in.txt" FOR READ
+OPENFILE "lines.txt" FOR WRITE
+WHILE NOT EOF("in.txt")
+    READFILE "in.txt", line
+    WRITEFILE "lines.txt", line
+ENDWHILE
+CLOSEFILE "in.txt"
+CLOSEFILE "lines.txt"'''
+
+OPTIONS = [{}, {'buffer_size': 1}, {'memory_map': True}, {'write_behind': True}]
+
+
+@pytest.mark.parametrize('data_type, values', [
+    ('INTEGER', [str(i * 7919 - 10 ** 6) for i in range(0, 10000)]),
+    ('REAL', ['2.5', '-0.125', '3.0', '1e-05', '12345.678']),
+    ('STRING', ['a', '', 'é€', 'two words', 'x' * 5000]),
+])
+@pytest.mark.parametrize('options', OPTIONS)
+def test_arrays_are_read_and_written_like_single_lines(data_type, values, options):
+    text = ''.join(value + '\n' for value in values)
+    program = compile(ARRAY_COPY.format(size=len(values), data_type=data_type))
+
+    result = program.run(files={'in.txt': text}, **options)
+
+    assert result.ok, result.error
+    assert result.files['bulk.txt'] == result.files['lines.txt'] == text
+
+
+@pytest.mark.parametrize('options', OPTIONS)
+def test_part_of_an_array_is_read_and_written(options):
+    result = compile('''DECLARE values : ARRAY[1:6] OF INTEGER
+DECLARE i : INTEGER
+FOR i <- 1 TO 6
+    values[i] <- 0
+ENDFOR
+OPENFILE "in.txt" FOR READ
+READFILE "in.txt", values, 2, 3
+READFILE "in.txt", values, 5, 6
+CLOSEFILE "in.txt"
+OPENFILE "out.txt" FOR WRITE
+WRITEFILE "out.txt", values
+WRITEFILE "out.txt", values, 2, 3
+CLOSEFILE "out.txt"''').run(files={'in.txt': '7\n8\n9\n'}, **options)
+
+    # Reading stops at the end of the file, leaving the rest of the range as it was
+    assert result.ok, result.error
+    assert result.files['out.txt'] == '0\n7\n8\n0\n9\n0\n7\n8\n'
+
+
+@pytest.mark.parametrize('source, error', [
+    ('READFILE "in.txt", values', TypeError),
+    ('READFILE "in.txt", values, 0, 2', IndexError),
+])
+def test_lines_that_do_not_fit_the_array_are_refused(source, error):
+    result = compile('''DECLARE values : ARRAY[1:3] OF INTEGER
+OPENFILE "in.txt" FOR READ
+''' + source).run(files={'in.txt': '1\ntwo\n'})
+
+    assert isinstance(result.error.exception, error)
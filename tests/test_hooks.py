@@ -0,0 +1,48 @@
+from analyzer import Analyzer
+from hooks import Hooks
+from interpreter import Interpreter
+from main import join_lines
+import io
+
+
+def run_with_writes(source, directory):
+    hooks = Hooks()
+    writes = []
+    hooks.add('write', lambda target, value: writes.append((target, value)))
+
+    tree = Analyzer(join_lines(source)).block(['EOF'])
+    interpreter = Interpreter(stdin=io.StringIO(), stdout=io.StringIO(), hooks=hooks, directory=str(directory))
+    interpreter.execute(tree)
+    return hooks, writes
+
+
+def test_readfile_into_an_array_writes_every_element(tmp_path):
+    (tmp_path / 'numbers.txt').write_text('4\n5\n6\n')
+
+    hooks, writes = run_with_writes('''DECLARE Numbers : ARRAY[1:5] OF INTEGER
+OPENFILE "numbers.txt" FOR READ
+READFILE "numbers.txt", Numbers
+CLOSEFILE "numbers.txt"''', tmp_path)
+
+    assert writes == [('Numbers[1]', 4), ('Numbers[2]', 5), ('Numbers[3]', 6)]
+    assert hooks.writes == 3
+
+
+def test_getrecord_writes_the_record(tmp_path):
+    hooks, writes = run_with_writes('''TYPE Item
+    DECLARE Code : INTEGER
+ENDTYPE
+DECLARE Stock : Item
+DECLARE Items : ARRAY[1:2] OF Item
+Stock.Code <- 7
+OPENFILE "items.dat" FOR RANDOM
+PUTRECORD "items.dat", Stock
+SEEK "items.dat", 1
+GETRECORD "items.dat", Stock
+SEEK "items.dat", 1
+GETRECORD "items.dat", Items[2]
+CLOSEFILE "items.dat"''', tmp_path)
+
+    targets = [target for target, _ in writes]
+    assert targets == ['Stock.Code', 'Stock', 'Items[2]']
+    assert writes[2][1].get('Code') == 7
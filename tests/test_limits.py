@@ -0,0 +1,48 @@
+from api import compile
+from error import LimitError
+
+
+def run(code, elements):
+    return compile(code).run(limits={'elements': elements})
+
+
+def test_array_of_records_counts_array_fields():
+    code = '''TYPE Row
+    DECLARE Cells : ARRAY[1:100] OF INTEGER
+    DECLARE Total : INTEGER
+ENDTYPE
+DECLARE Rows : ARRAY[1:100] OF Row
+OUTPUT "declared"'''
+
+    assert run(code, 10100).ok
+
+    result = run(code, 10099)
+    assert isinstance(result.error.exception, LimitError)
+    assert result.output == ''
+
+
+def test_array_of_records_counts_nested_records():
+    code = '''TYPE Cell
+    DECLARE Values : ARRAY[1:10] OF INTEGER
+ENDTYPE
+TYPE Row
+    DECLARE First : Cell
+    DECLARE Second : Cell
+ENDTYPE
+DECLARE Rows : ARRAY[1:50] OF Row'''
+
+    assert run(code, 1000).ok
+    assert isinstance(run(code, 999).error.exception, LimitError)
+
+
+def test_array_parameters_are_checked():
+    code = '''PROCEDURE Fill(BYVAL Data : ARRAY[1:5000] OF INTEGER)
+    OUTPUT "called"
+ENDPROCEDURE
+OUTPUT "before"'''
+
+    assert run(code, 5000).ok
+
+    result = run(code, 4999)
+    assert isinstance(result.error.exception, LimitError)
+    assert result.output == ''
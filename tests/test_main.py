@@ -0,0 +1,76 @@
+from main import (EXIT_FILE_ERROR, EXIT_OK, EXIT_RUNTIME_ERROR, EXIT_SYNTAX_ERROR, EXIT_USAGE_ERROR, join_lines,
+                  main, read_source)
+import pytest
+
+
+@pytest.fixture
+def programs(tmp_path):
+    """Writes pseudocode files and returns their paths, by name"""
+    sources = {
+        'hello.psc': 'OUTPUT "hello"\nOUTPUT 1 + 2',
+        'second.psc': 'OUTPUT "second"',
+        'divide.psc': 'OUTPUT "before"\nOUTPUT 1 / 0',
+        'syntax.psc': 'DECLARE x INTEGER',
+    }
+
+    paths = {}
+    for name, source in sources.items():
+        (tmp_path / name).write_text(source)
+        paths[name] = str(tmp_path / name)
+
+    paths['missing.psc'] = str(tmp_path / 'missing.psc')
+    return paths
+
+
+def test_read_source_joins_the_lines_of_the_file(programs):
+    assert read_source(programs['hello.psc']) == join_lines('OUTPUT "hello"\nOUTPUT 1 + 2')
+    assert read_source(programs['hello.psc']) == 'OUTPUT "hello" EOL OUTPUT 1 + 2'
+
+
+def test_file_runs(programs, capsys):
+    assert main([programs['hello.psc']]) == EXIT_OK
+
+    captured = capsys.readouterr()
+    assert captured.out == 'hello\n3\n'
+    assert captured.err == ''
+
+
+@pytest.mark.parametrize('name, exit_code, error', [
+    ('divide.psc', EXIT_RUNTIME_ERROR, 'ZeroDivisionError'),
+    ('syntax.psc', EXIT_SYNTAX_ERROR, 'SyntaxError'),
+    ('missing.psc', EXIT_FILE_ERROR, 'FileNotFoundError'),
+])
+def test_errors_are_reported_with_the_path_and_an_exit_code(programs, capsys, name, exit_code, error):
+    assert main([programs[name]]) == exit_code
+
+    assert capsys.readouterr().err.startswith('{}: {}: '.format(programs[name], error))
+
+
+def test_every_file_runs_and_the_worst_exit_code_wins(programs, capsys):
+    paths = [programs['divide.psc'], programs['syntax.psc'], programs['second.psc']]
+
+    assert main(paths) == EXIT_SYNTAX_ERROR
+    assert capsys.readouterr().out == 'before\nsecond\n'
+
+
+def test_stop_on_error_skips_the_files_after_an_error(programs, capsys):
+    paths = [programs['hello.psc'], programs['divide.psc'], programs['second.psc']]
+
+    assert main(['--stop-on-error'] + paths) == EXIT_RUNTIME_ERROR
+    assert capsys.readouterr().out == 'hello\n3\nbefore\n'
+
+
+def test_time_reports_every_phase(programs, capsys):
+    assert main(['--time', programs['hello.psc']]) == EXIT_OK
+
+    err = capsys.readouterr().err
+    assert err.startswith(programs['hello.psc'] + ': read ')
+    for phase in ('lex', 'parse', 'execute', 'total'):
+        assert ' {} '.format(phase) in err or '({} '.format(phase) in err
+
+
+def test_unknown_option_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as exit:
+        main(['--no-such-option'])
+
+    assert exit.value.code == EXIT_USAGE_ERROR
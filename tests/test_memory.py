@@ -0,0 +1,81 @@
+from analyzer import Analyzer
+from interpreter import Interpreter
+from main import EXIT_LIMIT_ERROR, join_lines
+from memory import MemoryReport
+import io
+import os
+import pytest
+import subprocess
+import sys
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+def report(source):
+    memory = MemoryReport()
+    memory.start()
+    memory.phase('execute')
+    interpreter = Interpreter(stdin=io.StringIO(), stdout=io.StringIO(), memory=memory)
+    try:
+        interpreter.execute(Analyzer(join_lines(source)).block(['EOF']))
+    finally:
+        memory.stop()
+
+    memory.measure(interpreter)
+    return memory
+
+
+def test_instances_are_measured_by_size():
+    memory = report('''DECLARE small : ARRAY[1:10] OF INTEGER
+DECLARE big : ARRAY[1:100000] OF INTEGER
+DECLARE name : STRING
+name <- "x"''')
+
+    assert [instance[1] for instance in memory.instances[:2]] == ['big', 'small']
+    big = memory.instances[0]
+    assert big[0] == 'GLOBAL' and big[2] == 2 and big[3] == 'ARRAY[1:100000] OF INTEGER'
+    assert big[4] > 100000 * 8 > memory.instances[1][4]
+
+
+def test_declarations_of_calls_are_counted_every_time_they_run():
+    memory = report('''PROCEDURE Work()
+    DECLARE scratch : ARRAY[1:50000] OF INTEGER
+ENDPROCEDURE
+DECLARE i : INTEGER
+FOR i <- 1 TO 3
+    CALL Work()
+ENDFOR''')
+
+    times, allocated, data_type = memory.declarations[('Work', 'scratch', 2)]
+    assert times == 3
+    assert allocated > 50000 * 8
+    # The locals of a call are gone once the program has ended
+    assert 'scratch' not in [instance[1] for instance in memory.instances]
+
+
+def test_report_shows_every_table():
+    memory = report('DECLARE n : INTEGER\nn <- 1')
+    file = io.StringIO()
+    memory.report(file)
+
+    instances, declarations, phases = file.getvalue().split('\n\n')
+    assert 'GLOBAL' in instances and ' n ' in instances
+    assert 'INTEGER' in declarations
+    assert phases.splitlines()[1].startswith('execute')
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='the memory limit is set with RLIMIT_AS')
+def test_memory_limit_stops_the_program_and_the_report_is_still_shown(tmp_path):
+    path = tmp_path / 'big.psc'
+    path.write_text('''DECLARE small : ARRAY[1:10] OF INTEGER
+DECLARE big : ARRAY[1:100000000] OF INTEGER
+OUTPUT "never"''')
+
+    # The limit is set for the whole process, so the program runs in one of its own
+    result = subprocess.run([sys.executable, MAIN, '--max-memory', '300', '--memory', str(path)],
+                            capture_output=True, text=True, cwd=str(tmp_path), timeout=120)
+
+    assert result.returncode == EXIT_LIMIT_ERROR
+    assert result.stdout == ''
+    assert 'LimitError' in result.stderr and '300 MB' in result.stderr
+    assert 'small' in result.stderr
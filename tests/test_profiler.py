@@ -0,0 +1,94 @@
+from analyzer import Analyzer
+from interpreter import Interpreter
+from main import join_lines
+from profiler import MAIN_FRAME, Profiler
+import io
+import itertools
+import sys
+
+SOURCE = '''FUNCTION Fact(BYVAL n : INTEGER) : INTEGER
+    IF n <= 1 THEN
+        RETURN 1
+    ENDIF
+    RETURN n * CALL Fact(n - 1)
+ENDFUNCTION
+PROCEDURE Shout(BYVAL word : STRING)
+    OUTPUT word
+ENDPROCEDURE
+DECLARE i : INTEGER
+DECLARE total : INTEGER
+total <- 0
+FOR i <- 1 TO 3
+    CALL Shout("hi")
+ENDFOR
+total <- CALL Fact(4)
+OUTPUT total'''
+
+
+def profile(source):
+    # Every reading of the clock is a second later, so the times only depend on what ran
+    ticks = itertools.count()
+    profiler = Profiler(clock=lambda: float(next(ticks)))
+    stdout = io.StringIO()
+
+    interpreter = Interpreter(stdin=io.StringIO(), stdout=stdout, profiler=profiler)
+    interpreter.execute(Analyzer(join_lines(source)).block(['EOF']))
+    return profiler, stdout.getvalue()
+
+
+def test_program_runs_the_same_with_the_profiler():
+    limit = sys.getrecursionlimit()
+    profiler, output = profile(SOURCE)
+
+    assert output == 'hi\nhi\nhi\n24\n'
+    assert sys.getrecursionlimit() == limit
+
+
+def test_lines_are_counted_every_time_they_run():
+    profiler, output = profile(SOURCE)
+    hits = {line_number: line[0] for line_number, line in profiler.lines.items()}
+
+    assert hits[8] == 3
+    assert hits[13] == 1
+    assert hits[14] == 3
+    assert hits[2] == 4
+    assert hits[3] == 1
+    assert hits[5] == 3
+    assert hits[16] == hits[17] == 1
+
+
+def test_calls_are_counted_and_recursion_is_timed_once():
+    profiler, output = profile(SOURCE)
+    calls, fact_total, fact_self = profiler.functions['Fact']
+
+    assert calls == 4
+    assert profiler.functions['Shout'][0] == 3
+
+    # The outermost call takes as long as every call of it together, since they are nested in it
+    assert fact_total == fact_self
+    assert fact_self == sum(own for stack, own in profiler.stacks.items() if stack[-1] == 'Fact')
+
+    # Every second of the run is the self time of exactly one procedure or function
+    assert profiler.functions[MAIN_FRAME][1] == sum(function[2] for function in profiler.functions.values())
+
+
+def test_stacks_are_written_for_flame_graphs():
+    profiler, output = profile(SOURCE)
+    file = io.StringIO()
+    profiler.write_stacks(file)
+
+    stacks = dict(line.rsplit(' ', 1) for line in file.getvalue().splitlines())
+    assert set(stacks) == {MAIN_FRAME, MAIN_FRAME + ';Shout'} | {
+        ';'.join([MAIN_FRAME] + ['Fact'] * depth) for depth in range(1, 5)}
+    assert sum(int(microseconds) for microseconds in stacks.values()) == profiler.functions[MAIN_FRAME][1] * 1e6
+
+
+def test_report_shows_every_procedure_and_the_source_of_lines():
+    profiler, output = profile(SOURCE)
+    file = io.StringIO()
+    profiler.report(file, SOURCE, limit=3)
+
+    procedures, lines = file.getvalue().split('\n\n')
+    assert [row.split()[-1] for row in procedures.splitlines()[1:]] == [MAIN_FRAME, 'Fact', 'Shout']
+    assert len(lines.splitlines()) == 1 + 3
+    assert 'RETURN n * CALL Fact(n - 1)' in lines
@@ -0,0 +1,176 @@
+from api import compile
+from data_types import VariableType, make_record
+from file_handler import RECORD_HEADER, STRING_SIZE, RecordFile, RecordLayout
+import pytest
+
+FIELDS = ['INTEGER', 'REAL', 'BOOLEAN', 'CHAR', 'STRING']
+
+
+@pytest.fixture
+def Row():
+    return make_record('Row', {data_type.lower(): VariableType(data_type) for data_type in FIELDS})
+
+
+def make_row(Row, number):
+    return Row(-number * 1000003, number / 7, number % 2 == 0, 'é' if number % 3 else 'x',
+               'Row {} '.format(number) * (number % 5))
+
+
+def test_every_field_type_round_trips(tmp_path, Row):
+    path = str(tmp_path / 'rows.dat')
+    rows = [make_row(Row, number) for number in range(1, 51)]
+    rows.append(Row(2 ** 63 - 1, -0.0, True, '€', 'ü' * (STRING_SIZE // 2)))
+
+    file = RecordFile(path)
+    for row in rows:
+        file.put_record(row)
+    file.close()
+
+    file = RecordFile(path)
+    assert not file.eof()
+    read = []
+    while not file.eof():
+        read.append(file.get_record(Row))
+
+    assert read == [[row.get(data_type.lower()) for data_type in FIELDS] for row in rows]
+
+    # Every record can be read again, and rewritten in place, by its address
+    file.seek(7)
+    assert file.get_record(Row) == read[6]
+    file.seek(7)
+    file.put_record(make_row(Row, 1000))
+    file.seek(7)
+    assert file.get_record(Row)[0] == -1000 * 1000003
+    assert file.get_record(Row) == read[7]
+
+    file.seek(len(rows) + 1)
+    assert file.eof()
+    with pytest.raises(EOFError):
+        file.get_record(Row)
+    file.close()
+
+
+def test_eof_before_any_record_is_read(tmp_path, Row):
+    path = str(tmp_path / 'rows.dat')
+    file = RecordFile(path)
+    assert file.eof()
+    file.put_record(make_row(Row, 1))
+    file.put_record(make_row(Row, 2))
+    file.close()
+
+    # The size of the records is known from the header before one has been read
+    file = RecordFile(path)
+    read = 0
+    while not file.eof():
+        file.get_record(Row)
+        read += 1
+    assert read == 2
+
+    file.seek(2)
+    assert not file.eof()
+    file.seek(3)
+    assert file.eof()
+    file.close()
+
+
+def test_records_are_only_read_into_the_type_they_were_written_from(tmp_path, Row):
+    path = str(tmp_path / 'rows.dat')
+    file = RecordFile(path)
+    file.put_record(make_row(Row, 1))
+    file.close()
+
+    # The same size as Row, with the fields in another order
+    Other = make_record('Other', {data_type.lower(): VariableType(data_type) for data_type in reversed(FIELDS)})
+    Same = make_record('Same', {data_type.lower(): VariableType(data_type) for data_type in FIELDS})
+
+    file = RecordFile(path)
+    with pytest.raises(IOError):
+        file.get_record(Other)
+    assert file.get_record(Same) == [make_row(Row, 1).get(data_type.lower()) for data_type in FIELDS]
+    file.close()
+
+
+def test_file_that_is_not_a_random_file_is_refused(tmp_path):
+    path = tmp_path / 'lines.txt'
+    path.write_text('not records\n')
+
+    with pytest.raises(IOError):
+        RecordFile(str(path))
+
+
+@pytest.mark.slow
+def test_million_records_round_trip(tmp_path, Row):
+    path = str(tmp_path / 'rows.dat')
+    count = 10 ** 6
+
+    file = RecordFile(path)
+    for number in range(1, count + 1):
+        file.put_record(make_row(Row, number))
+    file.close()
+
+    file = RecordFile(path)
+    number = 0
+    while not file.eof():
+        number += 1
+        assert file.get_record(Row) == [make_row(Row, number).get(data_type.lower()) for data_type in FIELDS]
+    assert number == count
+
+    for address in (count, 1, count // 2):
+        file.seek(address)
+        assert file.get_record(Row)[0] == -address * 1000003
+    assert file.eof() == (address == count)
+    file.close()
+
+
+def test_string_longer_than_its_field_is_refused(tmp_path, Row):
+    file = RecordFile(str(tmp_path / 'rows.dat'))
+    with pytest.raises(TypeError):
+        file.put_record(Row(1, 1.0, True, 'a', 'x' * (STRING_SIZE + 1)))
+    file.close()
+
+
+def test_random_file_from_a_program():
+    result = compile('''TYPE Item
+    DECLARE Code : INTEGER
+    DECLARE Price : REAL
+    DECLARE Stocked : BOOLEAN
+    DECLARE Grade : CHAR
+    DECLARE Name : STRING
+ENDTYPE
+DECLARE Stock : Item
+DECLARE i : INTEGER
+OPENFILE "items.dat" FOR RANDOM
+FOR i <- 1 TO 5
+    Stock.Code <- i
+    Stock.Price <- i * 1.5
+    IF i MOD 2 = 0 THEN
+        Stock.Stocked <- TRUE
+    ELSE
+        Stock.Stocked <- FALSE
+    ENDIF
+    Stock.Grade <- "A"
+    Stock.Name <- "Item"
+    PUTRECORD "items.dat", Stock
+ENDFOR
+SEEK "items.dat", 4
+GETRECORD "items.dat", Stock
+OUTPUT Stock.Code
+OUTPUT Stock.Price
+OUTPUT Stock.Stocked
+OUTPUT Stock.Grade
+OUTPUT Stock.Name
+SEEK "items.dat", 1
+i <- 0
+WHILE NOT EOF("items.dat")
+    GETRECORD "items.dat", Stock
+    i <- i + 1
+ENDWHILE
+OUTPUT i
+CLOSEFILE "items.dat"''').run()
+
+    assert result.ok, result.error
+    assert result.output == '4\n6.0\nTrue\nA\nItem\n5\n'
+    header = RECORD_HEADER.size + len(RecordLayout(make_record('Item', {
+        'Code': VariableType('INTEGER'), 'Price': VariableType('REAL'), 'Stocked': VariableType('BOOLEAN'),
+        'Grade': VariableType('CHAR'), 'Name': VariableType('STRING')})).signature)
+    assert len(result.files['items.dat']) == header + 5 * (8 + 8 + 1 + 4 + STRING_SIZE)
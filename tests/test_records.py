@@ -0,0 +1,74 @@
+from api import compile
+from array import array
+from data_types import ArrayType, Record, RecordArray, VariableType, make_record
+import pytest
+
+
+@pytest.mark.parametrize('field', ['self', 'value', 'get', 'assign', 'FIELDS', 'SLOTS', 'class', 'None', 'print'])
+def test_any_identifier_can_be_a_field(field):
+    result = compile('''TYPE Thing
+    DECLARE {0} : INTEGER
+    DECLARE Other : STRING
+ENDTYPE
+DECLARE t : Thing
+t.{0} <- 5
+t.Other <- "x"
+OUTPUT t.{0}
+OUTPUT t.Other'''.format(field)).run()
+
+    assert result.ok, result.error
+    assert result.output == '5\nx\n'
+
+
+def test_array_field_next_to_a_field_with_a_leading_underscore():
+    Pair = make_record('Pair', {'x': ArrayType([[1, 2]], 'INTEGER'), '_x': VariableType('INTEGER')})
+    first = Pair()
+    second = Pair()
+
+    first.assign((3, '_x'))
+    first.get('x').assign((4, [1]))
+
+    assert first.get('_x') == 3
+    assert first.get('x').get([1]) == 4
+    assert second.get('x') is not first.get('x')
+    assert second.get('_x') is None
+
+
+def test_record_methods_work_with_clashing_field_names():
+    Thing = make_record('Thing', {'get': VariableType('INTEGER'), 'value': VariableType('STRING')})
+    thing = Thing(1, 'a')
+
+    assert isinstance(thing, Record)
+    assert thing.value is thing
+    assert thing.get('get') == 1
+    thing.assign(('b', 'value'))
+    assert thing.get('value') == 'b'
+    assert str(thing) == 'Thing(get: 1, value: b)'
+
+
+def test_integer_assigned_to_a_real_field_keeps_the_column_packed():
+    Point = make_record('Point', {'x': VariableType('REAL'), 'n': VariableType('INTEGER')})
+    points = RecordArray(Point, [[1, 3]])
+
+    points.data['x'].set(0, 3)
+    points.data['x'].set(1, 2.5)
+    points.data['n'].set(0, 4)
+
+    assert isinstance(points.data['x'].values, array)
+    assert isinstance(points.data['n'].values, array)
+    assert [points.data['x'].get(offset) for offset in range(3)] == [3.0, 2.5, None]
+    assert type(points.data['x'].get(0)) is float
+
+
+def test_integer_assigned_to_a_real_field_of_an_array_of_records():
+    result = compile('''TYPE Point
+    DECLARE x : REAL
+ENDTYPE
+DECLARE points : ARRAY[1:3] OF Point
+points[1].x <- 3
+points[2].x <- points[1].x / 2
+OUTPUT points[1].x
+OUTPUT points[2].x''').run()
+
+    assert result.ok, result.error
+    assert result.output == '3.0\n1.5\n'
@@ -0,0 +1,44 @@
+from repl import Repl
+from interpreter import Interpreter
+import io
+import pytest
+
+
+def make_repl():
+    stdout = io.StringIO()
+    return Repl(Interpreter(stdin=io.StringIO(), stdout=stdout)), stdout
+
+
+def test_entries_share_declarations():
+    repl, stdout = make_repl()
+    repl.run('DECLARE x : INTEGER\nx <- 2')
+    repl.run('OUTPUT x * 3')
+
+    assert stdout.getvalue() == '6\n'
+
+
+def test_error_inside_procedure_returns_to_global_scope():
+    repl, stdout = make_repl()
+    repl.run('PROCEDURE Fail()\n    DECLARE y : INTEGER\n    y <- 1 / 0\nENDPROCEDURE')
+
+    with pytest.raises(ZeroDivisionError):
+        repl.run('CALL Fail()')
+
+    interpreter = repl.interpreter
+    assert interpreter.CURRENT_SCOPE is interpreter.SCOPES['GLOBAL']
+
+    repl.run('DECLARE z : INTEGER\nz <- 5')
+    repl.run('OUTPUT z')
+    assert interpreter.SCOPES['GLOBAL'].SYMBOL_TABLE.lookup('z') is not None
+    assert stdout.getvalue() == '5\n'
+
+
+def test_error_inside_nested_function_returns_to_global_scope():
+    repl, stdout = make_repl()
+    repl.run('FUNCTION Inner(BYVAL n : INTEGER) : INTEGER\n    RETURN n / 0\nENDFUNCTION')
+    repl.run('FUNCTION Outer(BYVAL n : INTEGER) : INTEGER\n    RETURN CALL Inner(n)\nENDFUNCTION')
+
+    with pytest.raises(ZeroDivisionError):
+        repl.run('OUTPUT CALL Outer(1)')
+
+    assert repl.interpreter.CURRENT_SCOPE is repl.interpreter.SCOPES['GLOBAL']
@@ -0,0 +1,118 @@
+from api import compile
+from error import LimitError
+import pytest
+
+SOURCE = '''TYPE Point
+    DECLARE X : INTEGER
+    DECLARE Y : REAL
+ENDTYPE
+DECLARE Calls : INTEGER
+Calls <- 0
+FUNCTION Square(BYVAL n : INTEGER) : INTEGER
+    RETURN n * n
+ENDFUNCTION
+FUNCTION Half(BYVAL x : REAL) : REAL
+    RETURN x / 2
+ENDFUNCTION
+FUNCTION Initial(BYVAL c : CHAR) : STRING
+    RETURN c + "."
+ENDFUNCTION
+FUNCTION Total(BYVAL numbers : ARRAY[1:3] OF INTEGER) : INTEGER
+    DECLARE i : INTEGER
+    DECLARE sum : INTEGER
+    sum <- 0
+    FOR i <- 1 TO 3
+        sum <- sum + numbers[i]
+    ENDFOR
+    RETURN sum
+ENDFUNCTION
+FUNCTION Moved(BYVAL p : Point) : Point
+    p.X <- p.X + 1
+    RETURN p
+ENDFUNCTION
+PROCEDURE Swap(BYREF a : INTEGER, BYREF b : INTEGER)
+    DECLARE t : INTEGER
+    t <- a
+    a <- b
+    b <- t
+ENDPROCEDURE
+FUNCTION Divide(BYVAL n : INTEGER, BYVAL d : INTEGER, BYREF rest : INTEGER) : INTEGER
+    rest <- n MOD d
+    RETURN n DIV d
+ENDFUNCTION
+PROCEDURE Fill(BYREF numbers : ARRAY[1:3] OF INTEGER)
+    DECLARE i : INTEGER
+    FOR i <- 1 TO 3
+        numbers[i] <- i * 10
+    ENDFOR
+ENDPROCEDURE
+PROCEDURE Forever()
+    DECLARE i : INTEGER
+    i <- 0
+    WHILE i >= 0
+        i <- i + 1
+    ENDWHILE
+ENDPROCEDURE'''
+
+
+@pytest.fixture(scope='module')
+def module():
+    return compile(SOURCE).load(steps=10000)
+
+
+def test_arguments_and_results_are_converted(module):
+    assert module.Square(7) == 49
+    assert module['Square'](3) == 9
+    assert module.Half(3) == 1.5
+    assert type(module.Half(4)) is float
+    assert module.Initial('J') == 'J.'
+    assert module.Total([1, 2, 3]) == 6
+    assert module.Moved({'X': 1, 'Y': 2.5}) == {'X': 2, 'Y': 2.5}
+
+
+@pytest.mark.parametrize('name, arguments, error', [
+    ('Square', ('7',), TypeError),
+    ('Square', (True,), TypeError),
+    ('Square', (1, 2), TypeError),
+    ('Initial', ('JK',), TypeError),
+    ('Total', ([1, 2],), IndexError),
+    ('Total', ([1, 2, 'x'],), TypeError),
+    ('Moved', ({'X': 'one'},), TypeError),
+    ('Moved', ({'Z': 1},), NameError),
+])
+def test_arguments_of_the_wrong_type_are_refused(module, name, arguments, error):
+    with pytest.raises(error):
+        module[name](*arguments)
+
+    # The module carries on after the error
+    assert module.Square(2) == 4
+
+
+def test_byref_parameters_come_back_as_a_tuple(module):
+    assert module.Swap(1, 2) == (2, 1)
+    assert module.Divide(17, 5, 0) == (3, 2)
+    assert module.Fill([0, 0, 0]) == ([10, 20, 30],)
+
+
+def test_only_declarations_run_unless_main_is_asked_for(module):
+    # Calls <- 0 is a statement of the program, not a declaration
+    assert getattr(module.interpreter.SCOPES['GLOBAL'].VALUES['Calls'], 'value', None) is None
+
+    main = compile(SOURCE).load(main=True)
+    assert main.interpreter.SCOPES['GLOBAL'].VALUES['Calls'].value == 0
+    assert main.Square(5) == 25
+
+
+def test_every_call_has_its_own_step_limit(module):
+    with pytest.raises(LimitError):
+        module.Forever()
+
+    for i in range(0, 100):
+        assert module.Square(i) == i * i
+
+
+def test_missing_routine_is_refused(module):
+    with pytest.raises(AttributeError):
+        module.Missing(1)
+    with pytest.raises(KeyError):
+        module['Missing']
@@ -0,0 +1,65 @@
+from server import SECONDS, parse_arguments, run_request
+import os
+
+WRITE = '''OPENFILE "out.txt" FOR WRITE
+WRITEFILE "out.txt", "written"
+CLOSEFILE "out.txt"'''
+
+
+def test_run_in_another_directory_leaves_the_worker_where_it_was(tmp_path):
+    cwd = os.getcwd()
+
+    response = run_request({'source': WRITE, 'cwd': str(tmp_path)}, {}, {})
+
+    assert response['error'] is None
+    assert (tmp_path / 'out.txt').read_text() == 'written\n'
+    assert os.getcwd() == cwd
+
+
+def test_failed_run_in_another_directory_leaves_the_worker_where_it_was(tmp_path):
+    cwd = os.getcwd()
+
+    response = run_request({'source': 'OUTPUT 1 / 0', 'cwd': str(tmp_path)}, {}, {})
+
+    assert response['error'].startswith('ZeroDivisionError')
+    assert os.getcwd() == cwd
+
+
+def test_runs_have_a_time_limit_by_default():
+    assert parse_arguments([]).max_seconds == SECONDS
+    assert parse_arguments(['--max-seconds', '5']).max_seconds == 5
+
+
+def test_request_cannot_take_away_a_server_limit():
+    source = '''DECLARE i : INTEGER
+i <- 0
+WHILE i >= 0
+    i <- i + 1
+ENDWHILE'''
+
+    response = run_request({'source': source, 'limits': {'steps': None}}, {}, {'steps': 1000})
+
+    assert response['error'].startswith('LimitError')
+
+
+def test_request_cannot_raise_a_server_limit():
+    source = '''DECLARE i : INTEGER
+i <- 0
+WHILE i >= 0
+    i <- i + 1
+ENDWHILE'''
+
+    response = run_request({'source': source, 'limits': {'steps': 10 ** 9}}, {}, {'steps': 1000})
+
+    assert response['error'].startswith('LimitError')
+
+
+def test_request_can_lower_a_server_limit():
+    source = '''DECLARE i : INTEGER
+FOR i <- 1 TO 100
+    OUTPUT i
+ENDFOR'''
+
+    assert run_request({'source': source}, {}, {'steps': 10 ** 6})['error'] is None
+    assert run_request({'source': source, 'limits': {'steps': 50}}, {}, {'steps': 10 ** 6})['error'].startswith(
+        'LimitError')
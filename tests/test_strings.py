@@ -0,0 +1,90 @@
+from api import compile
+import pytest
+
+
+def run(source):
+    result = compile(source).run()
+    assert result.ok, result.error
+    return result.output
+
+
+def test_appending_gives_the_same_string_as_concatenating():
+    # s is appended to in place, t is built by an ordinary assignment every time
+    output = run('''DECLARE s : STRING
+DECLARE t : STRING
+DECLARE i : INTEGER
+s <- ""
+t <- ""
+FOR i <- 1 TO 200
+    s <- s + STR(i) + ","
+    t <- "" + t + STR(i) + ","
+    IF i MOD 3 = 0 THEN
+        s <- CONCAT(s, "x", "y")
+        t <- CONCAT("", t, "x", "y")
+    ENDIF
+    IF i MOD 50 = 0 THEN
+        IF s = t THEN
+            OUTPUT "same"
+        ENDIF
+    ENDIF
+ENDFOR
+OUTPUT s
+OUTPUT t''')
+
+    expected = ''.join(str(i) + ',' + ('xy' if i % 3 == 0 else '') for i in range(1, 201))
+    assert output == 'same\n' * 4 + expected + '\n' + expected + '\n'
+
+
+def test_appended_string_is_read_by_every_kind_of_use():
+    output = run('''DECLARE s : STRING
+s <- "ab"
+s <- s + "cd"
+OUTPUT s
+OUTPUT LENGTH(s)
+IF s = "abcd" THEN
+    OUTPUT "same"
+ENDIF
+s <- s + s
+OUTPUT s
+s <- "new"
+s <- CONCAT(s, "er")
+OUTPUT s''')
+
+    assert output == 'abcd\n4\nsame\nabcdabcd\nnewer\n'
+
+
+def test_append_through_a_byref_parameter():
+    output = run('''PROCEDURE Add(BYREF text : STRING, BYVAL word : STRING)
+    text <- text + word + " "
+ENDPROCEDURE
+DECLARE s : STRING
+s <- ""
+CALL Add(s, "one")
+CALL Add(s, "two")
+OUTPUT s''')
+
+    assert output == 'one two \n'
+
+
+def test_numbers_are_still_added():
+    assert run('''DECLARE x : INTEGER
+x <- 1
+x <- x + 2 + 3
+OUTPUT x''') == '6\n'
+
+
+def test_appending_a_number_to_a_string_is_refused():
+    result = compile('''DECLARE s : STRING
+s <- "a"
+s <- s + 1''').run()
+
+    assert isinstance(result.error.exception, TypeError)
+
+
+@pytest.mark.parametrize('append', ['s <- s + "a"', 's <- CONCAT(s, "a")'])
+def test_appending_to_an_unassigned_string_fails_as_before(append):
+    appended = compile('DECLARE s : STRING\n' + append).run()
+    assigned = compile('DECLARE s : STRING\nDECLARE t : STRING\nt <- "x"\nt <- "" + s + "a"').run()
+
+    assert not appended.ok
+    assert type(appended.error.exception) is type(assigned.error.exception)